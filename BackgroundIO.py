@@ -0,0 +1,116 @@
+# This file runs the slow file work (loading and saving students) on a separate 'thread',
+# so the window never freezes while the disk is busy.
+#
+# A thread is a second line of work inside the same program. Tkinter windows may only be touched by the
+# main thread, so the background thread never changes the window or the classroom itself. Instead:
+#   - the app hands it jobs through a queue ('load', 'save', 'compact', ...), and
+#   - it hands results back through a second queue, which the app checks regularly with 'root.after'
+#     (see 'StudentManagerApp.poll_io' in main.py).
+# Jobs are done one at a time, in the order they were given, so changes always reach the disk in the right order.
+
+import queue  # Thread-safe queues for sending jobs and results between the threads.
+import threading  # Lets us run work in the background.
+import time  # Used to wait a moment for more changes before writing.
+
+
+class BackgroundIO:
+    # This defines the background worker for one StudentFile.
+
+    # After the first change arrives, wait this long (in seconds) for more changes before writing,
+    # so quick edits in a row are written together with one trip to the disk.
+    COALESCE_SECONDS = 0.05
+
+    def __init__(self, store):
+        self.store = store  # The StudentFile to read and write. Only the background thread uses it.
+        self._jobs = queue.Queue()  # Jobs for the background thread: (kind, value).
+        self.results = queue.Queue()  # Results for the main thread: (kind, value).
+        self._cancel_load = threading.Event()  # Set when loading should stop early (e.g., the window is closing).
+        # 'daemon=True' means a stuck thread can't keep the program alive; 'close' waits for it properly.
+        self._thread = threading.Thread(target=self._run, name="student-file-io", daemon=True)
+        self._thread.start()
+
+    # --- Called from the main thread ---
+
+    def load(self, workers=None):
+        # Start loading the students. Results arrive as:
+        #   ("batch", (students, problems))  for every batch of students read from the snapshot,
+        #   ("journal", records)             with the journal lines (see 'StudentFile.read_journal'),
+        #   ("loaded", None)                 when everything was read.
+        self._jobs.put(("load", workers))
+
+    def save(self, record):
+        # Write one journal line (see 'StudentFile.save_record' and 'delete_record').
+        self._jobs.put(("record", [record]))
+
+    def save_all(self, records):
+        # Write many journal lines together (e.g., for a batch of changes), with one trip to the disk.
+        self._jobs.put(("record", list(records)))
+
+    def compact(self, students):
+        # Write 'students' as a fresh snapshot and empty the journal. Gives back ("compacted", None) when done.
+        # 'students' must be a list that the main thread won't change (e.g., a copy).
+        # If a student's grades change while the snapshot is being written, the snapshot may already hold
+        # the new grades; the journal line for that change is written right after it, so nothing is lost.
+        self._jobs.put(("compact", students))
+
+    def busy(self):
+        # True while there are jobs that aren't finished or results that haven't been picked up yet.
+        return self._jobs.unfinished_tasks > 0 or not self.results.empty()
+
+    def close(self):
+        # Stop loading, write every change that is still waiting, and wait for the thread to finish.
+        self._cancel_load.set()
+        self._jobs.put(("stop", None))
+        self._thread.join()
+
+    # --- Runs on the background thread ---
+
+    def _run(self):
+        job = None
+        while True:
+            if job is None:
+                job = self._jobs.get()
+            kind, value = job
+            job = None
+            try:
+                if kind == "record":
+                    # Collect every change that arrives shortly after this one and write them all at once.
+                    records = list(value)
+                    done = 1
+                    deadline = time.monotonic() + self.COALESCE_SECONDS
+                    while True:
+                        try:
+                            job = self._jobs.get(timeout=max(0.0, deadline - time.monotonic()))
+                        except queue.Empty:
+                            break
+                        if job[0] != "record":
+                            break  # A different job: write what we have first, then do that one.
+                        records.extend(job[1])
+                        done += 1
+                        job = None
+                    try:
+                        self.store.append_records(records)
+                        self.results.put(("saved", len(records)))
+                    finally:
+                        for _ in range(done - 1):
+                            self._jobs.task_done()
+                elif kind == "load":
+                    self._load(value)
+                elif kind == "compact":
+                    self.store.compact(value)
+                    self.results.put(("compacted", None))
+                elif kind == "stop":
+                    return
+            except Exception as e:
+                # Problems are reported to the main thread, which shows them to the user.
+                self.results.put(("error", (kind, e)))
+            finally:
+                self._jobs.task_done()
+
+    def _load(self, workers):
+        for batch in self.store.read_batches(workers):
+            if self._cancel_load.is_set():
+                return
+            self.results.put(("batch", batch))
+        self.results.put(("journal", self.store.read_journal()))
+        self.results.put(("loaded", None))
@@ -0,0 +1,206 @@
+# This file reads and writes the optional *binary* snapshot format for student data.
+#
+# Reading 'students.txt' means splitting every line and turning text like "88.0" into numbers,
+# which is slow for very big rosters. A binary snapshot stores the numbers exactly as the computer keeps them,
+# so they can be used straight away without converting anything.
+#
+# The file is laid out like this (all numbers little-endian):
+#   header      : magic b"STDB", format version (2 bytes), 2 unused bytes, row count (8 bytes), name bytes (8 bytes)
+#   midterm     : one 8-byte float per student
+#   final       : one 8-byte float per student
+#   attendance  : one 8-byte float per student
+#   project     : one 8-byte float per student
+#   name offsets: 2 * rows + 1 four-byte numbers; student i's first name is names[offsets[2i]:offsets[2i+1]]
+#                 and their last name is names[offsets[2i+1]:offsets[2i+2]]
+#   status      : one byte per student (1 = Passed, 0 = Failed); only for other programs reading the file,
+#                 because a Student always works out its status from the grades
+#   names       : every first and last name, one after the other, as UTF-8 text (the 'string table')
+#
+# The file is opened with 'mmap' (memory mapping): the operating system only reads the parts we actually use,
+# so the first screen of students can be shown without reading the whole file.
+#
+# It can also be used from the command line to convert between the two formats:
+#   python BinarySnapshot.py to-binary students.txt students.bin
+#   python BinarySnapshot.py to-text students.bin students.txt
+
+import mmap  # Lets us treat a file as if it were a block of memory.
+import os  # Used for safely replacing files and forcing data onto the disk.
+import struct  # Packs numbers into bytes (and back) in a fixed layout.
+import sys  # Used to read the command-line arguments.
+from array import array  # A compact list of numbers that can be written to a file in one go.
+
+from Student import *  # The Student blueprint.
+
+MAGIC = b"STDB"  # The first 4 bytes of every binary snapshot, so we can recognize one.
+VERSION = 1
+HEADER = struct.Struct("<4sH2xQQ")  # magic, version, (2 unused bytes), row count, size of the names block.
+MAX_NAME_BYTES = 2 ** 32 - 1  # Name offsets are 4-byte numbers, so the names block can't be bigger than this.
+
+
+def is_binary_snapshot(path):
+    # Gives back True if 'path' is an existing file that starts like a binary snapshot.
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except FileNotFoundError:
+        return False
+
+
+def write_snapshot(path, students):
+    # This function writes 'students' to 'path' as a binary snapshot.
+    # Like 'StudentFile.compact', it writes a temporary file first and then renames it over the old one,
+    # so a crash can never leave a half-written snapshot behind.
+    midterm, final, attendance, project = array("d"), array("d"), array("d"), array("d")
+    status = bytearray()
+    offsets = array("I", [0])
+    names = bytearray()
+    for student in students:
+        midterm.append(student.midterm)
+        final.append(student.final)
+        attendance.append(student.attendance)
+        project.append(student.project)
+        status.append(1 if student.status == "Passed" else 0)
+        names += student.first_name.encode("utf-8")
+        offsets.append(len(names))
+        names += student.last_name.encode("utf-8")
+        if len(names) > MAX_NAME_BYTES:
+            raise ValueError("Too many names for one binary snapshot")
+        offsets.append(len(names))
+
+    if sys.byteorder != "little":
+        # 'array' writes numbers in this computer's own byte order; the file format is always little-endian.
+        for column in (midterm, final, attendance, project, offsets):
+            column.byteswap()
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(status), len(names)))
+        for column in (midterm, final, attendance, project, offsets):
+            column.tofile(f)
+        f.write(status)
+        f.write(names)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class MappedRoster:
+    # This defines a read-only, list-like view of a binary snapshot.
+    # 'len(roster)' and 'roster[i]' work like on a normal list of Students, but each Student is only
+    # created (decoded) when it is asked for, so opening even a huge snapshot is almost instant.
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            # Map the whole file into memory. Nothing is actually read from disk until we touch it.
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows, name_bytes = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary student snapshot")
+        if version != VERSION:
+            raise ValueError(f"{path} uses snapshot version {version}, but only version {VERSION} is supported")
+        if sys.byteorder != "little":
+            raise ValueError("Binary snapshots can only be opened on little-endian computers")
+
+        # Work out where each column starts, and make a 'memoryview' (a window onto the mapped bytes)
+        # for each one. 'cast' makes the window hand out numbers instead of single bytes.
+        view = memoryview(self._map)
+        position = HEADER.size
+        columns = []
+        for _ in range(4):
+            columns.append(view[position:position + rows * 8].cast("d"))
+            position += rows * 8
+        self._midterm, self._final, self._attendance, self._project = columns
+        self._offsets = view[position:position + (2 * rows + 1) * 4].cast("I")
+        position += (2 * rows + 1) * 4
+        self._status = view[position:position + rows]
+        position += rows
+        self._names = view[position:position + name_bytes]
+        self._rows = rows
+        self._decoded = {}  # Students decoded so far, so asking for the same row twice gives the same object.
+
+    def __len__(self):
+        return self._rows
+
+    def __getitem__(self, i):
+        # roster[i] gives one Student; roster[a:b] gives a list of Students.
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._rows))]
+        if i < 0:
+            i += self._rows
+        if not 0 <= i < self._rows:
+            raise IndexError("student index out of range")
+        student = self._decoded.get(i)
+        if student is None:
+            start, middle, end = self._offsets[2 * i], self._offsets[2 * i + 1], self._offsets[2 * i + 2]
+            student = self._decoded[i] = Student(
+                bytes(self._names[start:middle]).decode("utf-8"),
+                bytes(self._names[middle:end]).decode("utf-8"),
+                self._midterm[i],
+                self._final[i],
+                self._attendance[i],
+                self._project[i],
+                "Passed" if self._status[i] else "Failed"
+            )
+        return student
+
+    BLOCK_ROWS = 65536  # When going through every student, decode this many rows at a time.
+
+    def __iter__(self):
+        # Going through the whole roster decodes every student once, without keeping them all in '_decoded'.
+        for block in self.blocks():
+            yield from block
+
+    def blocks(self):
+        # This function yields the students as lists of up to BLOCK_ROWS students each
+        # (handy for 'Classroom.add_students'). To be quick, it copies a whole block of each column
+        # into normal Python lists with 'tolist()' instead of reading the columns one value at a time.
+        for block_start in range(0, self._rows, self.BLOCK_ROWS):
+            block_end = min(block_start + self.BLOCK_ROWS, self._rows)
+            midterm = self._midterm[block_start:block_end].tolist()
+            final = self._final[block_start:block_end].tolist()
+            attendance = self._attendance[block_start:block_end].tolist()
+            project = self._project[block_start:block_end].tolist()
+            status = self._status[block_start:block_end].tolist()
+            offsets = self._offsets[2 * block_start:2 * block_end + 1].tolist()
+            names = bytes(self._names[offsets[0]:offsets[-1]])  # Just the names used by this block.
+            base = offsets[0]
+            block = []
+            for j in range(block_end - block_start):
+                student = self._decoded.get(block_start + j)
+                if student is None:
+                    start, middle, end = offsets[2 * j] - base, offsets[2 * j + 1] - base, offsets[2 * j + 2] - base
+                    student = Student(names[start:middle].decode("utf-8"), names[middle:end].decode("utf-8"),
+                                      midterm[j], final[j], attendance[j], project[j],
+                                      "Passed" if status[j] else "Failed")
+                block.append(student)
+            yield block
+
+    def close(self):
+        # Let go of the mapped file (needed before the file can be replaced on some systems).
+        for column in (self._midterm, self._final, self._attendance, self._project,
+                       self._offsets, self._status, self._names):
+            column.release()
+        self._map.close()
+
+
+def main(arguments):
+    # The command-line converter (see the top of this file).
+    from Classroom import Classroom
+    from StudentFile import StudentFile
+
+    if len(arguments) != 3 or arguments[0] not in ("to-binary", "to-text"):
+        print("Usage: python BinarySnapshot.py to-binary|to-text SOURCE DESTINATION")
+        return 2
+    command, source, destination = arguments
+    # Loading through a StudentFile reads either format (and any journal next to the source file).
+    classroom = Classroom()
+    problems = StudentFile(source).load(classroom)
+    for where, line, error in problems:
+        print(f"Skipped {where}: {line} - {error}")
+    StudentFile(destination, binary=command == "to-binary").compact(classroom.students)
+    print(f"Wrote {len(classroom)} students to {destination}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,53 +1,384 @@
+import bisect  # Binary search helpers, used to keep the sorted orders up to date.
+
+from SearchIndex import *  # The trigram index that makes partial name searches fast.
+from Statistics import *  # Class averages, pass rates and percentiles, kept up to date as students change.
+
+
+class SortedStudents:
+    # This defines a read-only, list-like view of the students in one sorted order (see 'Classroom').
+    # It doesn't copy anything: 'view[i]' looks up the i-th entry of the Classroom's sorted order,
+    # so it always shows the current state, and getting one costs nothing however many students there are.
+
+    def __init__(self, classroom, order, student_of):
+        self._classroom = classroom
+        self._order = order  # The name of the Classroom attribute holding the sorted entries.
+        self._student_of = student_of  # A function that turns one entry into its Student.
+
+    def _entries(self):
+        return getattr(self._classroom, self._order)
+
+    def __len__(self):
+        return len(self._entries())
+
+    def __getitem__(self, i):
+        # view[i] gives one Student; view[a:b] gives a list of Students.
+        if isinstance(i, slice):
+            return [self._student_of(entry) for entry in self._entries()[i]]
+        return self._student_of(self._entries()[i])
+
+    def __iter__(self):
+        return iter([self._student_of(entry) for entry in self._entries()])
+
+    def __contains__(self, student):
+        # 'student in view' looks the student up by name instead of going through every student
+        # (a sorted order always holds every student of the classroom).
+        return self._classroom.find_student(student.first_name, student.last_name) is student
+
+
+class SearchResults:
+    # This defines a read-only, list-like view of the students whose first or last name contains some text,
+    # in one of the orders "roster", "name" or "average" (like 'StudentQuery' does for the SQLite database).
+    # How many students match is known straight away (see 'Classroom.search_student_partial'), but WHICH ones
+    # are only looked for as far as someone asks: 'results[i]' goes through the classroom in the chosen order
+    # until it has found i + 1 matches. So showing the first screen of a one-letter search is quick even when
+    # most of a million students match. Like 'SortedStudents', it reads the classroom's own orders (nothing is
+    # copied), so after the classroom changes, search again for up-to-date results (the app always does).
+
+    STEP = 4096  # How many students are checked at once while looking for more matches.
+    SORT_AT_MOST = 5000  # Up to this many matches, they are simply all put in order at once.
+
+    def __init__(self, classroom, query, matches, count, order="roster"):
+        self._classroom = classroom
+        self._query = query  # The search text, already case-folded.
+        # The keys of every match, or None if every name has to be checked instead (see '_is_match').
+        self._matches = matches
+        self._count = count
+        self._order = order
+        if matches is not None and count <= self.SORT_AT_MOST:
+            self._found = sorted(matches, key=classroom._sort_key(order))  # The matches found so far.
+        else:
+            self._found = []
+        self._source = None  # Every student's entry in this order (only fetched when it is gone through).
+        self._checked = 0  # How many entries of '_source' have been looked at.
+
+    def ordered(self, order):
+        # Gives back the same students in another order ("roster", "name" or "average").
+        return SearchResults(self._classroom, self._query, self._matches, self._count, order)
+
+    def _is_match(self, key):
+        if self._matches is not None:
+            return key in self._matches
+        return self._query in key[0] or self._query in key[1]
+
+    def _find(self, wanted):
+        # This helper looks for more matches until 'wanted' of them are found (or every match is).
+        found = self._found
+        wanted = min(wanted, self._count)
+        if len(found) >= wanted:
+            return
+        if self._source is None:
+            self._source, self._key_of = self._classroom._keys_in_order(self._order)
+        source = self._source
+        key_of = self._key_of
+        matches = self._matches
+        query = self._query
+        while len(found) < wanted and self._checked < len(source):
+            keys = map(key_of, source[self._checked:self._checked + self.STEP])
+            self._checked += self.STEP
+            if matches is not None:
+                found.extend([key for key in keys if key in matches])
+            else:
+                found.extend([key for key in keys if query in key[0] or query in key[1]])
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        # results[i] gives one Student; results[a:b] gives a list of Students.
+        index = self._classroom._index
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._count)
+            self._find(stop)
+            return [index[key] for key in self._found[start:stop:step]]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("search result index out of range")
+        self._find(i + 1)
+        return index[self._found[i]]
+
+    def __iter__(self):
+        self._find(self._count)
+        index = self._classroom._index
+        return iter([index[key] for key in self._found])
+
+    def __contains__(self, student):
+        # 'student in results' checks the student's own name instead of going through the results.
+        key = self._classroom.make_key(student.first_name, student.last_name)
+        return self._classroom._index.get(key) is student and self._is_match(key)
+
+
 class Classroom:
     # This defines the blueprint for a 'Classroom'.
 
+    # If 'add_students' adds more students than this, they are merged into the sorted orders all together
+    # instead of one by one.
+    REBUILD_AFTER_ADDING = 1000
+
     def __init__(self):
         # This is the constructor for creating a new Classroom object.
-        self.students = []  # When a classroom is created, it starts with an empty list to hold students.
+        # Students are kept in a dictionary called the 'index'.
+        # Each key is the student's (first name, last name) in case-folded form (a stronger kind of lowercase),
+        # and each value is the Student object itself.
+        # Python dictionaries remember the order things were added, so the index doubles as our ordered list.
+        # Looking up a key in a dictionary takes the same time no matter how many students there are.
+        self._index = {}
+        self._students_cache = None  # A ready-made list of students, rebuilt only after the roster changes.
+        self._rank = {}  # key -> a number that goes up in roster order, used to put search results in order.
+        self._next_rank = 0  # The number the next added student gets.
+        # Finds which students' names contain a piece of text. It is only built the first time it is needed
+        # (see 'search_student_partial'), so loading students stays fast; after that it is kept up to date.
+        self._search_index = None
+        self._last_query = None  # The previous search text...
+        self._last_results = None  # ...and the keys it found, so a longer search can start from them.
+        self._keys_cache = None  # A ready-made list of every key in roster order, for SearchResults.
+        # Sorted orders, kept up to date as students are added, updated and deleted (built on first use):
+        #   _by_name:    (last name, first name) case-folded, in alphabetical order
+        #   _by_average: (-average, rank, key), so the highest average comes first and ties keep roster order
+        self._by_name = None
+        self._by_average = None
+        # Class-level numbers (see 'Statistics.py'). Built on first use, then kept up to date.
+        self._statistics = None
+
+    @staticmethod
+    def make_key(first_name, last_name):
+        # This helper turns a first and last name into the key we use in the index.
+        # 'casefold()' is like 'lower()' but also handles special letters (e.g., German 'ß' becomes 'ss').
+        return first_name.casefold(), last_name.casefold()
+
+    @property
+    def students(self):
+        # 'students' looks like a normal list from the outside (e.g., 'classroom.students'),
+        # but it is built from the index. We only rebuild it when something was added or removed.
+        if self._students_cache is None:
+            self._students_cache = list(self._index.values())
+        return self._students_cache
+
+    def __len__(self):
+        # Lets us write 'len(classroom)' to get how many students are in it.
+        return len(self._index)
+
+    def copy_students(self):
+        # Gives back a new list of every student, which doesn't change when students are added or deleted later
+        # (used to save the students in the background while the app keeps running, see 'BackgroundIO.py').
+        return list(self._index.values())
 
     def add_student(self, student):
-        # This function tries to add a 'student' object to the classroom's list.
+        # This function tries to add a 'student' object to the classroom.
 
-        # 'not any(...)' checks if there is *no* student in the current list
-        # that has the same first AND last name (ignoring if they are uppercase/lowercase).
-        if not any(s.first_name.lower() == student.first_name.lower() and \
-                   s.last_name.lower() == student.last_name.lower() for s in self.students):
-            self.students.append(student)  # If no duplicate is found, add the new student to the list.
+        key = self.make_key(student.first_name, student.last_name)
+        if key not in self._index:
+            # No student with the same first AND last name (ignoring upper/lowercase) exists yet.
+            self._index[key] = student  # Add the new student to the index.
+            self._rank[key] = self._next_rank
+            self._next_rank += 1
+            self._added(key, student)
+            self._roster_changed()
             return True  # Tell whoever called this function that it worked.
         return False  # Tell them it didn't work (because a student with that name already exists).
 
+    def add_students(self, students):
+        # This function adds many students at once (e.g., while loading a file) and
+        # gives back how many were added. Students whose name is already taken are skipped.
+        # It does the same as calling 'add_student' for each one, but with less work per student:
+        # the names are looked up in local variables and the ready-made list is only cleared once at the end.
+        index = self._index
+        rank = self._rank
+        next_rank = self._next_rank
+        new = []
+        for student in students:
+            key = (student.first_name.casefold(), student.last_name.casefold())
+            if key not in index:
+                index[key] = student
+                rank[key] = next_rank
+                next_rank += 1
+                new.append((key, student))
+        self._next_rank = next_rank
+        if not new:
+            return 0
+        # The statistics take all new students in one go (quicker than one by one in '_added').
+        statistics = self._statistics
+        self._statistics = None
+        by_name = by_average = None
+        if len(new) > self.REBUILD_AFTER_ADDING:
+            # So many new students that inserting them into the sorted orders one by one would be slow.
+            # Instead they are added to the end and the list is sorted again: Python's sort notices that the
+            # old part is already in order and only sorts the new part, then merges the two.
+            # (The same list objects are kept, so SortedStudents views handed out earlier keep working.)
+            by_name, self._by_name = self._by_name, None
+            by_average, self._by_average = self._by_average, None
+        for key, student in new:
+            self._added(key, student)
+        if by_name is not None:
+            by_name.extend([(key[1], key[0]) for key, _ in new])
+            by_name.sort()
+            self._by_name = by_name
+        if by_average is not None:
+            by_average.extend([(-student.average(), rank[key], key) for key, student in new])
+            by_average.sort()
+            self._by_average = by_average
+        if statistics is not None:
+            statistics.add_students([student for _, student in new])
+            self._statistics = statistics
+        self._roster_changed()
+        return len(new)
+
     def delete_student(self, first_name, last_name):
-        # This function removes a student from the classroom's list by their name.
+        # This function removes a student from the classroom by their name.
+
+        # 'pop' removes the key from the index and gives back the student (or None if there was no such key).
+        key = self.make_key(first_name, last_name)
+        student = self._index.pop(key, None)
+        if student is None:
+            return False  # Nobody with that name was in the classroom.
+        self._removed(key, student)
+        del self._rank[key]
+        self._roster_changed()
+        return True
+
+    def update_student(self, student, midterm, final, project, attendance):
+        # This function changes a student's grades and attendance. The Student works out its new
+        # average and status by itself the next time they are needed.
+        # The name stays the same, so the student keeps their place and the search index doesn't change,
+        # but their place in the 'by average' order may move.
+        key = self.make_key(student.first_name, student.last_name)
+        self._removed(key, student)
+        student.midterm = midterm
+        student.final = final
+        student.project = project
+        student.attendance = attendance
+        self._added(key, student)
 
-        original_count = len(self.students)  # Remember how many students we had before trying to delete.
+    def apply_batch(self, batch):
+        # This function makes all the changes in a StudentBatch (see 'StudentBatch.py'): all of them or none.
+        # New students are added together, so the indexes are brought up to date in one go.
+        return batch.apply(self)
 
-        # This line creates a *new* list of students.
-        # It includes all students from the old list EXCEPT the one with the matching first and last name.
-        self.students = [s for s in self.students if not \
-            (s.first_name.lower() == first_name.lower() and \
-             s.last_name.lower() == last_name.lower())]
+    def _added(self, key, student):
+        # This helper brings the search index and sorted orders up to date after 'student' was added
+        # (or after an update, together with '_removed'). 'insort' uses binary search to find the right spot.
+        if self._search_index is not None:
+            self._search_index.add(key)
+        if self._by_name is not None:
+            bisect.insort(self._by_name, (key[1], key[0]))
+        if self._by_average is not None:
+            bisect.insort(self._by_average, (-student.average(), self._rank[key], key))
+        if self._statistics is not None:
+            self._statistics.add(student)
 
-        # Check if the number of students is now less than before (meaning one was deleted).
-        return len(self.students) < original_count
+    def _removed(self, key, student):
+        # This helper takes 'student' out of the search index and sorted orders
+        # (before they are deleted, or before their grades change).
+        if self._search_index is not None:
+            self._search_index.remove(key)
+        if self._by_name is not None:
+            self._remove_entry(self._by_name, (key[1], key[0]))
+        if self._by_average is not None:
+            self._remove_entry(self._by_average, (-student.average(), self._rank[key], key))
+        if self._statistics is not None:
+            self._statistics.remove(student)
+
+    @staticmethod
+    def _remove_entry(entries, entry):
+        # This helper finds 'entry' in the sorted list 'entries' with binary search and removes it.
+        position = bisect.bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+
+    def _roster_changed(self):
+        # This helper is called whenever students are added or removed.
+        self._students_cache = None  # The ready-made lists are now out of date.
+        self._keys_cache = None
+        self._last_query = None  # Old search results may be missing new students (or include removed ones).
+        self._last_results = None
 
     def find_student(self, first_name, last_name):
         # This function searches for a specific student by their first and last name.
-
-        for student in self.students:  # Go through each student in our list.
-            if student.first_name.lower() == first_name.lower() and \
-                    student.last_name.lower() == last_name.lower():
-                return student  # If we find a match, give that student object back.
-        return None  # If we go through all students and find no match, return nothing.
+        # It gives back the Student object, or None if there is no match.
+        return self._index.get(self.make_key(first_name, last_name))
 
     def search_student_partial(self, query):
         # This function searches for students whose names *contain* a part of the 'query' text.
+        # It gives back a SearchResults view (see above), in roster order.
+        # The keys in our index are already case-folded, so we don't need to convert every name again.
+
+        query_lower = query.casefold()  # Convert the search query to case-folded form for easy comparison.
+        results = None
+
+        if len(query_lower) >= TrigramIndex.SIZE and self._search_index is None:
+            # First search that the trigram index can help with: build it now
+            # (it also counts pieces of 1 and 2 letters, for shorter searches).
+            self._search_index = TrigramIndex(short_counts=True)
+            for key in self._index:
+                self._search_index.add(key)
 
-        query_lower = query.lower()  # Convert the search query to lowercase for easy comparison.
-        # This creates a new list containing only students whose first OR last name (in lowercase)
-        # has the 'query_lower' text inside it.
-        return [s for s in self.students if \
-                query_lower in s.first_name.lower() or \
-                query_lower in s.last_name.lower()]
+        if len(query_lower) < TrigramIndex.SIZE:
+            # Too short for trigrams, but the index knows how many students match.
+            if self._search_index is None:
+                # No index yet (building it takes a while, so a first short search doesn't): count them instead.
+                count = sum(1 for key in self._index if query_lower in key[0] or query_lower in key[1])
+                return SearchResults(self, query_lower, None, count)
+            count = self._search_index.count(query_lower) if query_lower else len(self._index)
+            if count > SearchResults.SORT_AT_MOST:
+                # Lots of matches: SearchResults finds them while going through the roster, as far as needed.
+                return SearchResults(self, query_lower, None, count)
+            # Few matches: going through the roster would take long to find them, so ask the index instead.
+            keys = self._search_index.short_candidates(query_lower)
+        else:
+            estimate = self._search_index.estimate(query_lower)
+            if self._last_query is not None and self._last_query in query_lower and \
+                    self._last_results is not None and len(self._last_results) <= estimate:
+                # The new search text contains the previous one (e.g., the user typed one more letter),
+                # so every match must also have matched last time: we only need to check those.
+                keys = self._last_results
+            elif len(query_lower) == TrigramIndex.SIZE:
+                # The query is one trigram: exactly the students in its set match, so there is nothing to check.
+                keys = results = self._search_index.candidates(query_lower)
+            else:
+                # Only students whose names contain every 3-letter piece of the query can match.
+                keys = self._search_index.candidates(query_lower)
+
+        if keys is not results:
+            # Keep only students whose first OR last name has the query inside it.
+            results = {key for key in keys if \
+                       query_lower in key[0] or \
+                       query_lower in key[1]}
+        self._last_query = query_lower
+        self._last_results = results
+        return SearchResults(self, query_lower, results, len(results))
+
+    def _keys_in_order(self, order):
+        # This helper gives back (entries, key_of) for SearchResults: every student's entry in 'order'
+        # ("roster", "name" or "average"), and a function that turns an entry into the student's key.
+        if order == "name":
+            self.sort_students_by_name()  # Make sure the sorted order exists.
+            return self._by_name, lambda entry: (entry[1], entry[0])
+        if order == "average":
+            self.sort_students_by_average()
+            return self._by_average, lambda entry: entry[2]
+        if self._keys_cache is None:
+            self._keys_cache = list(self._index)
+        return self._keys_cache, lambda key: key
+
+    def _sort_key(self, order):
+        # This helper gives back the function that puts keys in 'order' (the same order as '_keys_in_order').
+        if order == "name":
+            return lambda key: (key[1], key[0])
+        if order == "average":
+            index = self._index
+            rank = self._rank
+            return lambda key: (-index[key].average(), rank[key])
+        return self._rank.__getitem__
 
     def filter_students(self, status_to_filter):
         # This function creates a new list containing only students who have a specific 'status' (Passed/Failed).
@@ -56,13 +387,30 @@ class Classroom:
         return [s for s in self.students if s.status.lower() == status_to_filter.lower()]
 
     def sort_students_by_name(self):
-        # This function rearranges the 'students' list within the classroom.
-        # It sorts them alphabetically by their last name first, then by their first name.
-        # 'key=lambda s: (...)' tells Python to sort based on these parts of the student object.
-        self.students.sort(key=lambda s: (s.last_name.lower(), s.first_name.lower()))
+        # This function gives back the students sorted alphabetically by last name, then first name.
+        # The classroom's own order doesn't change. The sorted order is kept up to date as students
+        # come and go, so after the first call this costs almost nothing.
+        if self._by_name is None:
+            # The key is already (first, last) in case-folded form, so each entry is (key[1], key[0]).
+            self._by_name = sorted((last, first) for first, last in self._index)
+        index = self._index
+        return SortedStudents(self, "_by_name", lambda entry: index[(entry[1], entry[0])])
 
     def sort_students_by_average(self):
-        # This function rearranges the 'students' list.
-        # It sorts them by their average grade, with the highest average first.
-        # 'reverse=True' makes it sort from largest to smallest.
-        self.students.sort(key=lambda s: s.average(), reverse=True)
\ No newline at end of file
+        # This function gives back the students sorted by their average grade, highest first.
+        # Students with the same average stay in roster order. Like 'sort_students_by_name',
+        # the classroom's own order doesn't change and the sorted order is kept up to date.
+        if self._by_average is None:
+            rank = self._rank
+            self._by_average = sorted((-student.average(), rank[key], key) for key, student in self._index.items())
+        index = self._index
+        return SortedStudents(self, "_by_average", lambda entry: index[entry[2]])
+
+    def statistics(self):
+        # This function gives back the ClassStatistics for the students in this classroom.
+        # The first call goes through every student once; after that the numbers are kept up to date
+        # by '_added' and '_removed', so asking again costs nothing however many students there are.
+        if self._statistics is None:
+            self._statistics = ClassStatistics()
+            self._statistics.add_students(list(self._index.values()))
+        return self._statistics
@@ -0,0 +1,661 @@
+import bisect  # Binary search, used to keep the sorted orders up to date.
+import weakref  # Remembers the StudentRow views that are still in use, without keeping them alive.
+from array import array  # A compact list of plain numbers, used for the name look-up table.
+
+# NumPy is an optional extra. The normal 'Classroom' works without it.
+try:
+    import numpy as np  # NumPy stores many numbers in one compact block of memory and does math on all of them at once.
+except ImportError:
+    np = None
+
+from Student import *  # The Student blueprint (its helper functions are reused by StudentRow below).
+from SearchIndex import *  # The trigram index that makes partial name searches fast.
+from Classroom import SortedStudents  # The list-like view used for sorted results.
+from Statistics import *  # Class averages, pass rates and percentiles, kept up to date as students change.
+
+
+class StudentRow:
+    # This defines a 'view' of one row in a ColumnarClassroom.
+    # It behaves like a Student object (it has first_name, midterm, average(), status, ...),
+    # but it does not store any data itself: it reads and writes the classroom's columns.
+    # '__slots__' means each StudentRow only has room for these values, which keeps it small
+    # ('__weakref__' lets the classroom remember the view without keeping it alive, see 'ColumnarClassroom._view').
+    __slots__ = ("_roster", "_row", "__weakref__")
+
+    def __init__(self, roster, row):
+        self._roster = roster  # The ColumnarClassroom this row belongs to.
+        self._row = row  # Which position in the columns holds this student.
+
+    @property
+    def first_name(self):
+        return self._roster._names_of(self._row)[0]
+
+    @property
+    def last_name(self):
+        return self._roster._names_of(self._row)[1]
+
+    @property
+    def midterm(self):
+        return float(self._roster._midterm[self._row])
+
+    @midterm.setter
+    def midterm(self, value):
+        self._roster._set_grade(self._roster._midterm, self._row, value)
+
+    @property
+    def final(self):
+        return float(self._roster._final[self._row])
+
+    @final.setter
+    def final(self, value):
+        self._roster._set_grade(self._roster._final, self._row, value)
+
+    @property
+    def attendance(self):
+        return float(self._roster._attendance[self._row])
+
+    @attendance.setter
+    def attendance(self, value):
+        self._roster._set_grade(self._roster._attendance, self._row, value)
+
+    @property
+    def project(self):
+        return float(self._roster._project[self._row])
+
+    @project.setter
+    def project(self, value):
+        self._roster._set_grade(self._roster._project, self._row, value)
+
+    @property
+    def status(self):
+        # Kept up to date by the classroom whenever a grade changes (see ColumnarClassroom._set_grade).
+        return "Passed" if self._roster._passed[self._row] else "Failed"
+
+    def average(self):
+        # The averages of all students are worked out together (see ColumnarClassroom.averages),
+        # so asking for one student's average is just a quick look-up.
+        return float(self._roster.averages()[self._row])
+
+    # These work exactly like the Student versions, because they only use the attributes above.
+    calculate_status = Student.calculate_status
+    to_line = Student.to_line
+    __str__ = Student.__str__
+
+
+class StudentRows(SortedStudents):
+    # The list-like view that a ColumnarClassroom gives back for its roster and its sorted orders.
+    # StudentRow views are made when they are looked at (not kept for every row), and 'student in view'
+    # is answered straight from the columns instead of going through every student.
+
+    def __contains__(self, student):
+        classroom = self._classroom
+        # A student that is still in the classroom always has its view in '_views' (see 'ColumnarClassroom._view');
+        # the view of a deleted student was taken out of it.
+        if not isinstance(student, StudentRow) or student._roster is not classroom:
+            return False
+        reference = classroom._views.get(student._row)
+        return reference is not None and reference() is student
+
+
+class ColumnarClassroom:
+    # This defines a 'columnar' classroom: a drop-in replacement for 'Classroom' for very large rosters.
+    #
+    # Instead of one Python object per student, every kind of value gets its own column (array):
+    # one for midterm grades, one for final grades, and so on.
+    # Row number 5 in every column together describes one student.
+    # Numbers stored this way take far less memory, and NumPy can calculate the average
+    # or pass/fail status of every student in one go.
+    #
+    # The names aren't Python strings either: every row's "first name\nlast name\n" is written one after the other
+    # into ONE block of bytes ('_names'), and the '_name_start' column says where each row's names begin.
+    # Finding a student by name uses a 'hash table' of row numbers ('_slots'): the name is turned into a number
+    # (its 'hash'), which picks the slot to look in first; if that slot holds another student, the next slots are
+    # tried until the student or an empty slot is found. The table is kept at most half full, so this takes one or
+    # two tries on average.
+    #
+    # Code that expects Student objects still works: it gets StudentRow views instead.
+
+    INITIAL_CAPACITY = 1024  # How many rows we make room for at the start (the columns grow when needed).
+    # If 'add_students' adds more students than this, the sorted orders are made again (on next use)
+    # instead of the new rows being inserted into them one by one.
+    REBUILD_AFTER_ADDING = 1000
+    EMPTY_SLOT = -1  # A slot in the look-up table that was never used.
+    DELETED_SLOT = -2  # A slot whose student was deleted (searching has to go on past it).
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("ColumnarClassroom needs NumPy. Install it with: pip install numpy")
+
+        self._size = 0  # How many rows have been used (including deleted ones that haven't been cleaned up yet).
+        self._deleted = 0  # How many of those rows belong to deleted students.
+        self._allocate(self.INITIAL_CAPACITY)
+        self._names = bytearray()  # Every row's names in UTF-8, in row order (see the top of this class).
+        self._slots = array("i", [self.EMPTY_SLOT]) * 8  # The look-up table: row numbers (see '_slot_of').
+        self._used_slots = 0  # Slots that aren't EMPTY_SLOT (students and deleted students).
+        # row number -> a 'weak reference' to its StudentRow, for the views that are still in use somewhere,
+        # so the same student gives back the same view. A weak reference doesn't keep the view alive.
+        self._views = {}
+        self._dead_views = 0  # How many views in '_views' were thrown away since it was last cleaned up.
+        self._averages = None  # All averages worked out together; kept up to date as grades change.
+        self._search_index = None  # Finds which names contain a piece of text; built on first use.
+        self._last_query = None  # The previous search text and the rows it found,
+        self._last_results = None  # so a longer search can start from them.
+        self._roster_order = None  # Row numbers of every student in roster order; worked out again after changes.
+        # Row numbers sorted by name and by average. Made on first use, then kept up to date change by change
+        # (see '_insert_into_orders'), so a change doesn't mean sorting every row again.
+        self._name_order = None
+        self._average_order = None
+        self._statistics = None  # Class-level numbers (see 'Statistics.py'). Built on first use, then kept up to date.
+
+    def _allocate(self, capacity):
+        # This helper makes empty columns that have room for 'capacity' students.
+        self._name_start = np.zeros(capacity, dtype=np.int64)  # Where each row's names begin in '_names'.
+        self._hash = np.zeros(capacity, dtype=np.int64)  # The hash of each row's key (see '_slot_of').
+        self._midterm = np.zeros(capacity, dtype=np.float64)
+        self._final = np.zeros(capacity, dtype=np.float64)
+        self._attendance = np.zeros(capacity, dtype=np.float64)
+        self._project = np.zeros(capacity, dtype=np.float64)
+        self._passed = np.zeros(capacity, dtype=bool)  # True means "Passed", False means "Failed".
+        self._alive = np.zeros(capacity, dtype=bool)  # False for rows whose student was deleted.
+
+    def _columns(self):
+        # The names of every column, so we can grow or reorder them all together.
+        return ("_name_start", "_hash", "_midterm", "_final", "_attendance", "_project", "_passed", "_alive")
+
+    def _grow(self):
+        # This helper doubles the room in every column when we run out of space.
+        # Doubling means growing happens rarely, so adding students stays fast on average.
+        for name in self._columns():
+            old = getattr(self, name)
+            new = self._empty_column(old, len(old) * 2)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    @staticmethod
+    def _empty_column(like, capacity):
+        # This helper makes a new, empty column of the same kind as 'like' with room for 'capacity' rows.
+        return np.zeros(capacity, dtype=like.dtype)
+
+    def _names_of(self, row):
+        # This helper gives back (first name, last name) of one row, read from the names block.
+        # A row's names end where the next row's begin (or at the end of the block for the last row).
+        start = self._name_start[row]
+        end = self._name_start[row + 1] if row + 1 < self._size else len(self._names)
+        first_name, last_name, _ = self._names[start:end].decode("utf-8").split("\n")
+        return first_name, last_name
+
+    def _names_of_rows(self, rows):
+        # This helper gives back [(first name, last name), ...] for many rows at once. For lots of rows the whole
+        # block is read in one go (two entries per row, so row 'r' has its names at [2 * r] and [2 * r + 1]).
+        rows = np.asarray(rows, dtype=np.int64).tolist()
+        if len(rows) * 8 > self._size:
+            names = self._names.decode("utf-8").split("\n")
+            return [(names[2 * row], names[2 * row + 1]) for row in rows]
+        return [self._names_of(row) for row in rows]
+
+    def _keys_of_rows(self, rows):
+        # Same as '_names_of_rows', but with the names in case-folded form (as in 'make_key').
+        # Case-folding never adds or removes line breaks, so for lots of rows the whole block is case-folded at once.
+        rows = np.asarray(rows, dtype=np.int64).tolist()
+        if len(rows) * 8 > self._size:
+            keys = self._names.decode("utf-8").casefold().split("\n")
+            return [(keys[2 * row], keys[2 * row + 1]) for row in rows]
+        return [self.make_key(*self._names_of(row)) for row in rows]
+
+    @staticmethod
+    def _name_entry(first_name, last_name):
+        # One row's part of the names block. A line break would end a name early, so names can't contain one
+        # (the app and the students.txt format don't allow them anyway).
+        if "\n" in first_name or "\n" in last_name:
+            raise ValueError("Student names can't contain line breaks")
+        return f"{first_name}\n{last_name}\n".encode("utf-8")
+
+    def _append_names(self, start, names):
+        # This helper writes the (first name, last name) pairs of the rows 'start', 'start' + 1, ...
+        # at the end of the names block.
+        entries = [self._name_entry(first_name, last_name) for first_name, last_name in names]
+        lengths = np.fromiter(map(len, entries), dtype=np.int64, count=len(entries))
+        self._name_start[start:start + len(entries)] = len(self._names) + np.cumsum(lengths) - lengths
+        self._names += b"".join(entries)
+
+    def _slot_of(self, key, key_hash):
+        # This helper gives back the slot of the look-up table that holds the student with 'key',
+        # or None if there is no such student. Slots are tried one after the other from the one the hash picks;
+        # only rows with the same hash have their names read and compared.
+        slots = self._slots
+        mask = len(slots) - 1  # The table size is a power of two, so '& mask' is a quick remainder.
+        slot = key_hash & mask
+        while True:
+            row = slots[slot]
+            if row == self.EMPTY_SLOT:
+                return None
+            if row >= 0 and self._hash[row] == key_hash and self.make_key(*self._names_of(row)) == key:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _add_to_slots(self, rows, hashes):
+        # This helper puts new rows (whose names aren't in the look-up table yet) into the table.
+        # If that would make it more than half full, the table is made again instead, with room to spare.
+        if (self._used_slots + len(rows)) * 2 > len(self._slots):
+            self._rebuild_slots()  # The new rows are already alive, so they are included.
+            return
+        slots = self._slots
+        mask = len(slots) - 1
+        for row, key_hash in zip(rows, hashes):
+            slot = key_hash & mask
+            while slots[slot] >= 0:
+                slot = (slot + 1) & mask
+            if slots[slot] == self.EMPTY_SLOT:
+                self._used_slots += 1
+            slots[slot] = row
+
+    def _rebuild_slots(self):
+        # This helper makes a new look-up table for every live row, at most a third full
+        # (so many more students can be added before it has to be made again). Deleted slots are left behind.
+        rows = self._live_rows()
+        capacity = 8
+        while capacity < len(rows) * 3:
+            capacity *= 2
+        slots = array("i", [self.EMPTY_SLOT]) * capacity
+        mask = capacity - 1
+        for row, key_hash in zip(rows.tolist(), self._hash[rows].tolist()):
+            slot = key_hash & mask
+            while slots[slot] != self.EMPTY_SLOT:
+                slot = (slot + 1) & mask
+            slots[slot] = row
+        self._slots = slots
+        self._used_slots = len(rows)
+
+    def _find_row(self, key):
+        # The row number of the student with 'key', or None.
+        slot = self._slot_of(key, hash(key))
+        return None if slot is None else self._slots[slot]
+
+    def _set_grade(self, column, row, value):
+        # Used by StudentRow when a grade is changed.
+        self._set_grades(row, ((column, value),))
+
+    def _set_grades(self, row, changes):
+        # This helper changes one row's grades ('changes' holds (column, new value) pairs). Only this row's
+        # average and status have to be worked out again, so the saved averages of everyone else are kept,
+        # and the row is only moved within the 'by average' order.
+        if self._statistics is not None:
+            self._statistics.remove_values(self._row_values(row), self._passed[row])
+        self._remove_from_orders(row, names=False)
+        for column, value in changes:
+            column[row] = value
+        average = self._midterm[row] * 0.4 + self._final[row] * 0.4 + self._project[row] * 0.2
+        if self._averages is not None:
+            self._averages[row] = average
+        self._passed[row] = average >= 60 and self._attendance[row] >= 70
+        self._insert_into_orders(row, names=False)
+        if self._statistics is not None:
+            self._statistics.add_values(self._row_values(row), self._passed[row])
+
+    def _name_key(self, row):
+        # This helper gives back what the 'by name' order is sorted on: (last name, first name), case-folded.
+        first_name, last_name = self._names_of(row)
+        return last_name.casefold(), first_name.casefold()
+
+    def _average_key(self, row):
+        # This helper gives back what the 'by average' order is sorted on: the highest average first,
+        # and equal averages in roster order (row numbers go up in roster order).
+        return -self.averages()[row], row
+
+    def _insert_into_orders(self, row, names=True):
+        # This helper puts a new (or changed) row into the sorted orders that exist, at the place binary search
+        # finds for it ('bisect' with 'key' compares only the few rows it looks at, not every row).
+        # 'np.insert' then makes the order one longer, which is one quick copy of the row numbers.
+        if names and self._name_order is not None:
+            position = bisect.bisect_left(self._name_order, self._name_key(row), key=self._name_key)
+            self._name_order = np.insert(self._name_order, position, row)
+        if self._average_order is not None:
+            position = bisect.bisect_left(self._average_order, self._average_key(row), key=self._average_key)
+            self._average_order = np.insert(self._average_order, position, row)
+
+    def _remove_from_orders(self, row, names=True):
+        # This helper takes a row out of the sorted orders that exist (before it is deleted or its grades change,
+        # so it is still found by its old name and average).
+        if names and self._name_order is not None:
+            position = bisect.bisect_left(self._name_order, self._name_key(row), key=self._name_key)
+            self._name_order = np.delete(self._name_order, position)
+        if self._average_order is not None:
+            position = bisect.bisect_left(self._average_order, self._average_key(row), key=self._average_key)
+            self._average_order = np.delete(self._average_order, position)
+
+    def _row_values(self, row):
+        # This helper gives back one row's grades in 'ClassStatistics.COMPONENTS' order, without
+        # needing 'averages()' (which may have to work out every average again after a change).
+        midterm, final, project = float(self._midterm[row]), float(self._final[row]), float(self._project[row])
+        return midterm, final, project, float(self._attendance[row]), midterm * 0.4 + final * 0.4 + project * 0.2
+
+    def _view(self, row):
+        # This helper gives back the StudentRow for 'row'. A view that is still in use somewhere is given back
+        # again; otherwise a new one is made. Views aren't kept for every row, because with millions of
+        # students they would take more memory than the columns themselves.
+        row = int(row)
+        reference = self._views.get(row)
+        view = None if reference is None else reference()
+        if view is None:
+            view = StudentRow(self, row)
+            self._views[row] = weakref.ref(view, self._view_gone)
+        return view
+
+    def _view_gone(self, reference):
+        # Python calls this when a StudentRow that nobody uses any more is thrown away. Its entry in '_views'
+        # isn't removed straight away: once half of the entries are gone, they are all removed together.
+        self._dead_views += 1
+        if self._dead_views * 2 > len(self._views):
+            self._views = {row: reference for row, reference in self._views.items() if reference() is not None}
+            self._dead_views = 0
+
+    def _live_rows(self):
+        # The row numbers of every student that has not been deleted, in roster order.
+        return np.flatnonzero(self._alive[:self._size])
+
+    @staticmethod
+    def make_key(first_name, last_name):
+        # Same key as 'Classroom.make_key', so both classrooms treat names the same way.
+        return first_name.casefold(), last_name.casefold()
+
+    @property
+    def students(self):
+        # A list-like view of the students in roster order (see 'StudentRows').
+        return StudentRows(self, "_rows_in_roster_order", self._view)
+
+    @property
+    def _rows_in_roster_order(self):
+        # The row numbers behind 'students'. They are only worked out again after the roster changes.
+        if self._roster_order is None:
+            self._roster_order = self._live_rows()
+        return self._roster_order
+
+    def __len__(self):
+        return self._size - self._deleted
+
+    def copy_students(self):
+        # Same idea as 'Classroom.copy_students'. StudentRow views always show the current columns,
+        # so instead the live rows of every column are copied now (a quick NumPy copy), and normal
+        # Student objects are only made from the copies while the result is gone through.
+        rows = self._live_rows()
+        names = self._names_of_rows(rows)
+        grades = [column[rows].tolist() for column in (self._midterm, self._final, self._attendance, self._project)]
+        return (Student(first_name, last_name, *values) for (first_name, last_name), *values in zip(names, *grades))
+
+    def averages(self):
+        # This function calculates the weighted average (40% midterm, 40% final, 20% project)
+        # of EVERY row at once and keeps the result until a grade changes.
+        if self._averages is None:
+            self._averages = self._midterm * 0.4 + self._final * 0.4 + self._project * 0.2
+        return self._averages
+
+    def calculate_statuses(self):
+        # This function works out "Passed" (True) or "Failed" (False) for every row at once,
+        # using the same rule as 'Student.calculate_status', and stores the results.
+        self._passed = (self.averages() >= 60) & (self._attendance >= 70)
+        return self._passed
+
+    def add_student(self, student):
+        # This function copies a Student's values into a new row, unless the name is already taken.
+
+        key = self.make_key(student.first_name, student.last_name)
+        key_hash = hash(key)
+        if self._slot_of(key, key_hash) is not None:
+            return False  # A student with that name already exists.
+        if self._size == len(self._alive):
+            self._grow()  # Make more room first.
+        row = self._size
+        entry = self._name_entry(student.first_name, student.last_name)
+        self._name_start[row] = len(self._names)
+        self._names += entry
+        self._hash[row] = key_hash
+        self._midterm[row] = student.midterm
+        self._final[row] = student.final
+        self._attendance[row] = student.attendance
+        self._project[row] = student.project
+        self._passed[row] = student.calculate_status() == "Passed"
+        self._alive[row] = True
+        self._size += 1
+        self._add_to_slots([row], [key_hash])
+        if self._search_index is not None:
+            self._search_index.add(key, row)
+        if self._statistics is not None:
+            self._statistics.add_values(self._row_values(row), self._passed[row])
+        if self._averages is not None and row < len(self._averages):
+            self._averages[row] = self._row_values(row)[4]
+        else:
+            self._averages = None  # The columns grew, so all averages are worked out again.
+        self._insert_into_orders(row)
+        self._roster_changed()
+        return True
+
+    def add_students(self, students):
+        # This function adds many students at once and gives back how many were added
+        # (names that are already taken are skipped). The new values are copied into the columns
+        # in one step per column, instead of one student at a time.
+        new = []
+        new_keys = set()  # Names added earlier in this same call (the first one wins, like in 'Classroom').
+        for student in students:
+            key = self.make_key(student.first_name, student.last_name)
+            if key in new_keys:
+                continue
+            key_hash = hash(key)
+            if self._slot_of(key, key_hash) is None:
+                new_keys.add(key)
+                new.append((key, key_hash, student))
+        if not new:
+            return 0
+        while self._size + len(new) > len(self._alive):
+            self._grow()
+        start, end = self._size, self._size + len(new)
+        self._append_names(start, [(student.first_name, student.last_name) for _, _, student in new])
+        self._hash[start:end] = [key_hash for _, key_hash, _ in new]
+        self._midterm[start:end] = [student.midterm for _, _, student in new]
+        self._final[start:end] = [student.final for _, _, student in new]
+        self._attendance[start:end] = [student.attendance for _, _, student in new]
+        self._project[start:end] = [student.project for _, _, student in new]
+        # The status is always worked out from the grades, for all new rows at once.
+        self._passed[start:end] = (self._midterm[start:end] * 0.4 + self._final[start:end] * 0.4 +
+                                   self._project[start:end] * 0.2 >= 60) & (self._attendance[start:end] >= 70)
+        self._alive[start:end] = True
+        self._size = end
+        self._add_to_slots(range(start, end), [key_hash for _, key_hash, _ in new])
+        if self._search_index is not None:
+            for row, (key, _, _) in enumerate(new, start):
+                self._search_index.add(key, row)
+        if self._averages is not None and end <= len(self._averages):
+            self._averages[start:end] = (self._midterm[start:end] * 0.4 + self._final[start:end] * 0.4 +
+                                         self._project[start:end] * 0.2)
+        else:
+            self._averages = None
+        if self._statistics is not None:
+            self._statistics.merge(self._statistics_of(np.arange(start, end)))
+        if len(new) > self.REBUILD_AFTER_ADDING:
+            # Sorting everything again is quicker than this many single inserts. The orders are properties,
+            # so views handed out earlier simply see the new order the next time they are read.
+            self._name_order = None
+            self._average_order = None
+        else:
+            for row in range(start, end):
+                self._insert_into_orders(row)
+        self._roster_changed()
+        return len(new)
+
+    def delete_student(self, first_name, last_name):
+        # This function removes a student by name. The row is only marked as deleted;
+        # once more than half of the rows are deleted, the columns are cleaned up in one go.
+
+        key = self.make_key(first_name, last_name)
+        slot = self._slot_of(key, hash(key))
+        if slot is None:
+            return False
+        row = self._slots[slot]
+        self._slots[slot] = self.DELETED_SLOT
+        self._remove_from_orders(row)
+        if self._statistics is not None:
+            self._statistics.remove_values(self._row_values(row), self._passed[row])
+        self._alive[row] = False
+        self._views.pop(row, None)
+        self._deleted += 1
+        if self._search_index is not None:
+            self._search_index.remove(key, row)
+        self._roster_changed()
+        if self._deleted > self.INITIAL_CAPACITY and self._deleted * 2 > self._size:
+            self._reorder(self._live_rows())
+        return True
+
+    def update_student(self, student, midterm, final, project, attendance):
+        # Same as 'Classroom.update_student': change the grades (which also updates the status).
+        # All four are changed together, so the student is only moved once in the 'by average' order.
+        if isinstance(student, StudentRow) and student._roster is self:
+            self._set_grades(student._row, ((self._midterm, midterm), (self._final, final),
+                                            (self._project, project), (self._attendance, attendance)))
+            return
+        student.midterm = midterm
+        student.final = final
+        student.project = project
+        student.attendance = attendance
+
+    def apply_batch(self, batch):
+        # Same as 'Classroom.apply_batch': new students are copied into the columns together.
+        return batch.apply(self)
+
+    def _roster_changed(self):
+        # This helper is called whenever rows are added, removed or reordered.
+        # (The sorted orders are kept up to date by '_insert_into_orders' and '_remove_from_orders'.)
+        self._last_query = None  # Old search results may point at rows that moved or are gone.
+        self._last_results = None
+        self._roster_order = None
+
+    def _reorder(self, order):
+        # This helper rebuilds every column so that it holds the rows listed in 'order', in that order.
+        # It is used to clean up deleted rows. StudentRow views that are still in use are moved along.
+        count = len(order)
+        capacity = max(self.INITIAL_CAPACITY, len(self._alive))
+        names = self._names_of_rows(order)
+        new_position = np.full(len(self._alive), -1, dtype=np.int64)
+        new_position[order] = np.arange(count)
+        for name in self._columns():
+            old = getattr(self, name)
+            new = self._empty_column(old, capacity)
+            new[:count] = old[order]
+            setattr(self, name, new)
+        self._size = count
+        self._deleted = 0
+        self._names = bytearray()
+        self._append_names(0, names)
+        views = {}
+        for old_row, reference in list(self._views.items()):
+            view = reference()
+            if view is not None:
+                view._row = int(new_position[old_row])
+                views[view._row] = reference
+        self._views = views
+        self._dead_views = 0
+        # The sorted orders keep their order; only the row numbers in them change.
+        # (Rows keep their roster order, so equal averages stay in the right order too.)
+        if self._name_order is not None:
+            self._name_order = new_position[self._name_order]
+        if self._average_order is not None:
+            self._average_order = new_position[self._average_order]
+        self._rebuild_slots()
+        self._search_index = None  # It holds the old row numbers; it is built again on the next search.
+        self._averages = None
+        self._roster_changed()
+
+    def find_student(self, first_name, last_name):
+        # This function gives back the StudentRow for a name, or None if there is no match.
+        row = self._find_row(self.make_key(first_name, last_name))
+        return None if row is None else self._view(row)
+
+    def search_student_partial(self, query):
+        # This function searches for students whose first OR last name contains the 'query' text.
+        # It works like 'Classroom.search_student_partial': the trigram index (which stores row numbers here)
+        # or the previous results narrow down who needs to be checked.
+        query_lower = query.casefold()
+        if len(query_lower) >= TrigramIndex.SIZE and self._search_index is None:
+            self._search_index = TrigramIndex()
+            rows = self._live_rows().tolist()
+            for row, key in zip(rows, self._keys_of_rows(rows)):
+                self._search_index.add(key, row)
+
+        estimate = self._search_index.estimate(query_lower) if self._search_index is not None else None
+        if self._last_query is not None and self._last_query in query_lower and \
+                (estimate is None or len(self._last_results) <= estimate):
+            rows = self._last_results
+        elif estimate is None:
+            rows = self._live_rows().tolist()
+        else:
+            # Row numbers go up in roster order, so sorting them puts the results in order.
+            rows = sorted(self._search_index.candidates(query_lower))
+        results = [row for row, key in zip(rows, self._keys_of_rows(rows)) if \
+                   query_lower in key[0] or \
+                   query_lower in key[1]]
+        self._last_query = query_lower
+        self._last_results = results
+        return [self._view(row) for row in results]
+
+    def filter_students(self, status_to_filter):
+        # This function gives back the students with a specific status, picked out in one step by NumPy.
+        wanted = status_to_filter.lower() == "passed"
+        rows = np.flatnonzero(self._alive[:self._size] & (self._passed[:self._size] == wanted))
+        return [self._view(row) for row in rows]
+
+    def sort_students_by_name(self):
+        # This function gives back the students sorted by last name, then first name,
+        # without changing the roster's own order. NumPy sorts all rows at once the first time,
+        # and the order is kept up to date after that, so asking again costs nothing.
+        return StudentRows(self, "_rows_by_name", self._view)
+
+    @property
+    def _rows_by_name(self):
+        # The row numbers behind 'sort_students_by_name'.
+        # 'lexsort' sorts by the LAST column given first, so we pass (first names, last names).
+        if self._name_order is None:
+            rows = self._live_rows()
+            keys = self._keys_of_rows(rows)
+            first_keys = np.array([key[0] for key in keys], dtype=object)
+            last_keys = np.array([key[1] for key in keys], dtype=object)
+            self._name_order = rows[np.lexsort((first_keys, last_keys))]
+        return self._name_order
+
+    def sort_students_by_average(self):
+        # This function gives back the students sorted by average grade, highest first.
+        return StudentRows(self, "_rows_by_average", self._view)
+
+    @property
+    def _rows_by_average(self):
+        # The row numbers behind 'sort_students_by_average'. Sorting the negative averages from small to large
+        # gives the highest averages first, and 'stable' keeps students with equal averages in roster order.
+        if self._average_order is None:
+            rows = self._live_rows()
+            self._average_order = rows[np.argsort(-self.averages()[rows], kind="stable")]
+        return self._average_order
+
+    def statistics(self):
+        # Same as 'Classroom.statistics'. The first time, NumPy works out the numbers for every row at once;
+        # after that they are kept up to date student by student.
+        if self._statistics is None:
+            self._statistics = self._statistics_of(self._live_rows())
+        return self._statistics
+
+    def _statistics_of(self, rows):
+        # This helper gives back a new ClassStatistics for the given row numbers, worked out by NumPy
+        # one whole column at a time (one GradeSummary per column).
+        statistics = ClassStatistics()
+        columns = (self._midterm, self._final, self._project, self._attendance, self.averages())
+        for summary, column in zip(statistics.grades.values(), columns):
+            values = column[rows]
+            if len(values) == 0:
+                continue
+            summary.count = len(values)
+            summary.mean = float(values.mean())
+            summary._m2 = float(((values - summary.mean) ** 2).sum())
+            # The same bins as 'GradeSummary.bin_of' ('astype' also cuts off the decimals, and
+            # 'nan_to_num' puts 'nan' in the first bin; 'clip' already handles 'inf').
+            scaled = np.nan_to_num(values / GradeSummary.BIN_WIDTH, nan=0.0)
+            bins = np.clip(scaled, 0, GradeSummary.BINS - 1).astype(np.int64)
+            summary.bins = np.bincount(bins, minlength=GradeSummary.BINS).tolist()
+        statistics.passed = int(self._passed[rows].sum())
+        statistics.failed = len(rows) - statistics.passed
+        return statistics
@@ -0,0 +1,188 @@
+# This file manages a 'dataset': a folder with one student file per class section (a 'shard'), e.g.
+#   sections/
+#       math-101.txt         (with its own journal, math-101.txt.journal)
+#       math-102.txt
+#       physics-201.bin      (a binary snapshot, see 'BinarySnapshot.py')
+#
+# Each shard is a normal student file with its own Classroom (and so its own indexes). A shard is only loaded
+# when it is opened, and at most 'max_open' shards stay loaded: opening one more forgets the one that was used
+# longest ago ('least recently used'). Its changes are already in its file and journal, so nothing is lost.
+#
+# Questions about ALL shards (partial name searches and class statistics) are sent to several helper
+# processes at once, one shard each. Shards that are loaded already are answered from memory instead.
+#
+# It can also be used from the command line:
+#   python Dataset.py sections search ava      (find 'ava' in every section)
+#   python Dataset.py sections summary         (class statistics for every section and for all together)
+
+import os  # Used to list the shard files and build their paths.
+import sys  # Used to read the command-line arguments.
+from collections import OrderedDict  # A dictionary that remembers (and can change) the order of its keys.
+from concurrent.futures import ProcessPoolExecutor  # Runs work in several Python processes at the same time.
+
+from Student import *  # The Student blueprint.
+from Classroom import *  # Every shard is loaded into its own Classroom.
+from StudentFile import *  # Reads each shard's file and journal.
+from Statistics import *  # Class statistics, which can be merged across shards.
+
+SHARD_EXTENSIONS = (".txt", ".bin")  # Files with these endings in the folder are shards.
+
+
+def load_shard(path):
+    # This function loads one shard file (and its journal) into a new Classroom.
+    # Helper processes use it too, so it reads with one process (they are already running side by side).
+    classroom = Classroom()
+    StudentFile(path).load(classroom, workers=1)
+    return classroom
+
+
+def search_shard(path, query):
+    # Runs in a helper process: the values of every student in the shard at 'path' whose first or last name
+    # contains 'query', in roster order. (The shard is only searched once, so building the trigram index
+    # would take longer than simply checking every name.)
+    query = query.casefold()
+    return [(student.first_name, student.last_name, student.midterm, student.final, student.attendance,
+             student.project) for student in load_shard(path).students
+            if query in student.first_name.casefold() or query in student.last_name.casefold()]
+
+
+def shard_statistics(path):
+    # Runs in a helper process: the ClassStatistics of the shard at 'path'.
+    return load_shard(path).statistics()
+
+
+class Dataset:
+    # This defines a folder of shards (see the top of this file).
+
+    MAX_OPEN = 4  # How many shards stay loaded at most (unless another number is given).
+
+    def __init__(self, folder, max_open=MAX_OPEN, workers=None):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)  # A new dataset starts as an empty folder.
+        self.max_open = max_open
+        self.workers = workers  # How many helper processes answer questions about all shards (None = one per core).
+        # name -> Classroom for every loaded shard, the one used longest ago first.
+        self._open = OrderedDict()
+        self._pool = None  # The helper processes, started the first time they are needed.
+
+    def shard_names(self):
+        # The names of every shard (the file names without their ending), in alphabetical order.
+        names = []
+        for file_name in os.listdir(self.folder):
+            name, extension = os.path.splitext(file_name)
+            if extension in SHARD_EXTENSIONS and os.path.isfile(os.path.join(self.folder, file_name)):
+                names.append(name)
+        return sorted(names)
+
+    def shard_path(self, name):
+        # The file of the shard called 'name' (a new shard gets a text file).
+        for extension in SHARD_EXTENSIONS:
+            path = os.path.join(self.folder, name + extension)
+            if os.path.exists(path):
+                return path
+        return os.path.join(self.folder, name + SHARD_EXTENSIONS[0])
+
+    def create_shard(self, name):
+        # This function makes a new, empty shard and gives back its file name.
+        # Names may only use letters, digits, spaces, '-' and '_', so they are always safe file names.
+        if not name.strip() or not all(c.isalnum() or c in " -_" for c in name):
+            raise ValueError(f"Invalid section name: {name!r} (use letters, digits, spaces, '-' and '_')")
+        if name in self.shard_names():
+            raise ValueError(f"There is already a section called {name}")
+        path = self.shard_path(name)
+        open(path, "w", encoding="utf-8").close()
+        return path
+
+    def resident(self, name):
+        # The loaded Classroom of shard 'name' (which now counts as just used), or None if it isn't loaded.
+        classroom = self._open.get(name)
+        if classroom is not None:
+            self._open.move_to_end(name)  # The end of the OrderedDict is the most recently used.
+        return classroom
+
+    def keep(self, name, classroom):
+        # Remember 'classroom' as the loaded shard 'name' (e.g., one the app is loading by itself in the
+        # background), and forget the least recently used shards if too many are loaded now.
+        self._open[name] = classroom
+        self._open.move_to_end(name)
+        while len(self._open) > self.max_open:
+            self._open.popitem(last=False)  # The start of the OrderedDict is the one used longest ago.
+
+    def open_shard(self, name):
+        # This function gives back the Classroom of shard 'name', loading it first if it isn't loaded yet.
+        classroom = self.resident(name)
+        if classroom is None:
+            classroom = load_shard(self.shard_path(name))
+            self.keep(name, classroom)
+        return classroom
+
+    def _fan_out(self, function, *args):
+        # This helper asks 'function(shard file, *args)' about every shard that isn't loaded, in the helper
+        # processes at the same time, and gives back {name: Classroom} for the loaded shards and
+        # {name: Future} for the others (a Future is an answer that may still be on its way).
+        loaded = {}
+        waiting = {}
+        for name in self.shard_names():
+            if name in self._open:
+                loaded[name] = self._open[name]
+            else:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                waiting[name] = self._pool.submit(function, self.shard_path(name), *args)
+        return loaded, waiting
+
+    def search(self, query):
+        # This function finds the students in ALL shards whose first or last name contains 'query'.
+        # It gives back a list of (shard name, Student), by shard name and then in roster order.
+        # Students of shards that aren't loaded are copies: changing them changes nothing.
+        loaded, waiting = self._fan_out(search_shard, query)
+        results = []
+        for name in sorted([*loaded, *waiting]):
+            if name in loaded:
+                students = loaded[name].search_student_partial(query)
+            else:
+                students = [Student(*values) for values in waiting[name].result()]
+            results.extend((name, student) for student in students)
+        return results
+
+    def statistics(self):
+        # This function gives back (statistics of all shards together, {shard name: its statistics}).
+        loaded, waiting = self._fan_out(shard_statistics)
+        per_shard = {name: classroom.statistics() for name, classroom in loaded.items()}
+        for name, future in waiting.items():
+            per_shard[name] = future.result()
+        total = ClassStatistics()  # A new one, so the loaded shards' own statistics aren't changed.
+        for name in sorted(per_shard):
+            total.merge(per_shard[name])
+        return total, dict(sorted(per_shard.items()))
+
+    def close(self):
+        # Stop the helper processes (if they were started).
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def main(arguments):
+    # The command-line version (see the top of this file).
+    if len(arguments) < 2 or arguments[1] not in ("search", "summary") or \
+            (arguments[1] == "search") != (len(arguments) == 3):
+        print("Usage: python Dataset.py FOLDER search TEXT\n       python Dataset.py FOLDER summary")
+        return 2
+    dataset = Dataset(arguments[0])
+    try:
+        if arguments[1] == "search":
+            for name, student in dataset.search(arguments[2]):
+                print(f"{name}: {student}")
+        else:
+            total, per_shard = dataset.statistics()
+            for name, statistics in per_shard.items():
+                print(f"== {name}\n{statistics.summary()}\n")
+            print(f"== All sections\n{total.summary()}")
+    finally:
+        dataset.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
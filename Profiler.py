@@ -0,0 +1,142 @@
+# This file measures where the time goes when the app feels slow: how often each important function runs
+# and how long it takes (the median, and the slowest 5% and 1% of calls).
+#
+# It is OFF unless you ask for it, either with the command-line option or the environment variable:
+#   python main.py --profile                     (writes profile.json when the window is closed)
+#   python main.py --profile-json big_run.json   (the same, with another file name)
+#   STUDENT_MANAGER_PROFILE=1 python main.py
+# While it is on, the "Diagnostics" button opens a window with the numbers so far.
+#
+# How it works: 'instrument' swaps the chosen functions for small wrappers that time every call.
+# When profiling is off nothing is swapped, so the app runs exactly as fast as without this file.
+
+import atexit  # Runs a function when the program ends (used to write the JSON file).
+import functools  # 'wraps' makes a wrapper look like the function it wraps (same name and so on).
+import inspect  # Used to skip functions that can't be timed by a simple wrapper (generators).
+import json  # Writes the numbers to a file that other programs can read.
+import math  # 'log2' picks the histogram bucket for a time.
+import os  # Reads the environment variable.
+import threading  # A lock, because loading and saving run on a background thread too (see 'BackgroundIO.py').
+import time  # 'perf_counter' is the most precise clock for measuring short times.
+
+ENVIRONMENT_VARIABLE = "STUDENT_MANAGER_PROFILE"  # Set this to 1 to turn profiling on.
+DEFAULT_JSON_FILE = "profile.json"
+
+# The functions worth timing, per class. The app passes in the classes themselves (see main.py).
+CLASSROOM_FUNCTIONS = ("add_student", "add_students", "delete_student", "update_student", "find_student",
+                       "search_student_partial", "filter_students", "sort_students_by_name",
+                       "sort_students_by_average", "statistics", "copy_students", "import_file")
+STUDENT_FILE_FUNCTIONS = ("append_records", "compact", "read_journal", "apply_journal")
+APP_FUNCTIONS = ("load_students", "on_batch_loaded", "on_loading_done", "run_search", "refresh_student_list",
+                 "render_virtual_rows", "sync_rows", "refresh_student_row", "refresh_summary", "save_students")
+DATASET_FUNCTIONS = ("open_shard", "search", "statistics")
+
+
+def wanted_by_environment():
+    # True if the environment variable asks for profiling (any value except empty or 0).
+    return os.environ.get(ENVIRONMENT_VARIABLE, "") not in ("", "0")
+
+
+class LatencyHistogram:
+    # This defines the timing numbers for ONE function.
+    #
+    # Keeping every single time would use more and more memory, so the times are counted in 'buckets' instead:
+    # each bucket covers times about 19% longer than the one before (4 buckets per doubling), from nanoseconds
+    # to minutes in less than 200 buckets. A percentile is read from the buckets, so it is correct to about 19%.
+
+    BUCKETS_PER_DOUBLING = 4
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0  # Seconds spent in all calls together.
+        self.slowest = 0.0  # Seconds of the slowest call.
+        self.buckets = {}  # bucket number -> how many calls took that long.
+
+    def record(self, seconds):
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.slowest:
+            self.slowest = seconds
+        nanoseconds = seconds * 1e9
+        bucket = int(math.log2(nanoseconds) * self.BUCKETS_PER_DOUBLING) if nanoseconds > 1 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, percent):
+        # The time (in seconds) that 'percent' % of the calls were quicker than: the top of that bucket
+        # (but never more than the slowest call).
+        wanted = self.calls * percent / 100
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= wanted:
+                return min(self.slowest, 2 ** ((bucket + 1) / self.BUCKETS_PER_DOUBLING) / 1e9)
+        return self.slowest
+
+    def summary(self):
+        # The numbers for this function, in milliseconds.
+        return {
+            "calls": self.calls,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.calls * 1000 if self.calls else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.slowest * 1000,
+        }
+
+
+class Profiler:
+    # This defines the profiler: one LatencyHistogram per timed function.
+
+    def __init__(self):
+        self.histograms = {}  # "Class.function" -> its LatencyHistogram.
+        self._lock = threading.Lock()  # Only one thread at a time may change the histograms.
+        self.started = time.perf_counter()
+
+    def record(self, name, seconds):
+        # Count one call of 'name' that took 'seconds'. Can also be called by hand for things that aren't
+        # one function call (e.g., the app times a whole load from start to finish this way).
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def instrument(self, owner, names):
+        # Swap each function in 'names' on the class 'owner' for a wrapper that times it.
+        # Functions the class doesn't have (or that are generators or static methods) are left alone.
+        for name in names:
+            function = owner.__dict__.get(name)
+            if not inspect.isfunction(function) or inspect.isgeneratorfunction(function):
+                continue
+            setattr(owner, name, self._timed(function, f"{owner.__name__}.{name}"))
+
+    def _timed(self, function, label):
+        # This helper makes the wrapper for one function.
+        record = self.record
+        clock = time.perf_counter
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(label, clock() - start)
+        return timed
+
+    def summary(self):
+        # The numbers for every timed function, slowest in total first: a list of (name, numbers).
+        with self._lock:
+            rows = [(name, histogram.summary()) for name, histogram in self.histograms.items()]
+        return sorted(rows, key=lambda row: row[1]["total_ms"], reverse=True)
+
+    def dump(self, path):
+        # Write the numbers to a JSON file.
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"seconds_running": time.perf_counter() - self.started,
+                       "functions": dict(self.summary())}, f, indent=2)
+
+    def dump_at_exit(self, path):
+        # Write the JSON file when the program ends.
+        atexit.register(self.dump, path)
@@ -0,0 +1,125 @@
+class TrigramIndex:
+    # This defines a search index that makes "does the name contain this text?" searches fast.
+    #
+    # A 'trigram' is a piece of 3 letters in a row. The name "emma" has the trigrams "emm" and "mma".
+    # For every trigram we keep a set of the students whose first or last name contains it.
+    # If someone searches for "emma", only students that appear in BOTH the "emm" set and the "mma" set
+    # can match, so we only have to check those few students instead of the whole classroom.
+    #
+    # Students are stored by their key: (first name, last name) in case-folded form, as used by the Classroom.
+    # Another value can be stored for a student instead ('item'), e.g., the ColumnarClassroom stores row numbers.
+    #
+    # Searches of 1 or 2 letters are too short for trigrams. With 'short_counts=True', the index also COUNTS how
+    # many students have each piece of 1 or 2 letters in their names (a few thousand numbers, however many students
+    # there are), so the number of matches is known straight away (see 'count' and 'short_candidates').
+    # Counting makes building the index take about twice as long, so it is only done when asked for.
+
+    SIZE = 3  # How many letters make up one piece.
+
+    def __init__(self, short_counts=False):
+        self._postings = {}  # trigram -> set of student keys whose first or last name contains it.
+        # piece of 1 or 2 letters -> how many students have it in their first or last name (or None: not counted).
+        self._counts = {} if short_counts else None
+        self._short_names = set()  # Keys with a name shorter than SIZE (they have no trigrams for that name).
+
+    @staticmethod
+    def _short_pieces(key):
+        # This helper gives back every piece of 1 or 2 letters in the first and last name of 'key' (without repeats).
+        first, last = key
+        return {*first, *last, *map(str.__add__, first, first[1:]), *map(str.__add__, last, last[1:])}
+
+    def _grams(self, key):
+        # This helper gives back every trigram in the first and last name of 'key' (without repeats).
+        grams = set()
+        for name in key:
+            for i in range(len(name) - self.SIZE + 1):
+                grams.add(name[i:i + self.SIZE])
+        return grams
+
+    def add(self, key, item=None):
+        # Call this when a student is added to the classroom.
+        # This runs for every student when the index is first built, so it is written to be quick:
+        # it looks things up in local variables and doesn't build a set of trigrams first
+        # (adding the same key to a set twice is harmless).
+        if item is None:
+            item = key
+        postings = self._postings
+        size = self.SIZE
+        for name in key:
+            for i in range(len(name) - size + 1):
+                gram = name[i:i + size]
+                keys = postings.get(gram)
+                if keys is None:
+                    postings[gram] = {item}
+                else:
+                    keys.add(item)
+        counts = self._counts
+        if counts is not None:
+            for piece in self._short_pieces(key):
+                counts[piece] = counts.get(piece, 0) + 1
+            if len(key[0]) < size or len(key[1]) < size:
+                self._short_names.add(item)
+
+    def remove(self, key, item=None):
+        # Call this when a student is removed from the classroom (with the same 'item' as for 'add').
+        if item is None:
+            item = key
+        for gram in self._grams(key):
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(item)
+                if not keys:
+                    del self._postings[gram]  # Don't keep empty sets around.
+        if self._counts is not None:
+            for piece in self._short_pieces(key):
+                self._counts[piece] -= 1
+                if not self._counts[piece]:
+                    del self._counts[piece]
+            self._short_names.discard(item)
+
+    def estimate(self, query):
+        # This function quickly guesses how many keys 'candidates' could give back at most
+        # (the size of the smallest set involved), without doing the real work.
+        # It gives back None if the query is too short for the index.
+        if len(query) < self.SIZE:
+            return None
+        return min(len(self._postings.get(query[i:i + self.SIZE], ())) for i in range(len(query) - self.SIZE + 1))
+
+    def candidates(self, query):
+        # This function gives back the set of keys that MIGHT match 'query' (already case-folded).
+        # Every real match is in the set, but the caller still has to check each one, because the trigrams
+        # could be spread over the first AND last name (e.g., "ann" + "nno" for "Ann Nolan" and "anno").
+        # It gives back None if the query is shorter than one trigram, because then the index can't help.
+        if len(query) < self.SIZE:
+            return None
+        posting_sets = []
+        for i in range(len(query) - self.SIZE + 1):
+            keys = self._postings.get(query[i:i + self.SIZE])
+            if not keys:
+                return set()  # Some piece of the query appears in nobody's name, so nothing can match.
+            posting_sets.append(keys)
+        posting_sets.sort(key=len)  # Start from the smallest set, so each step has as little to check as possible.
+        result = set(posting_sets[0])
+        for keys in posting_sets[1:]:
+            result &= keys
+            if not result:
+                break
+        return result
+
+    def count(self, query):
+        # This function gives back how many students have 'query' (1 or 2 letters, already case-folded)
+        # in their first or last name, without looking at any student. (Only for an index with 'short_counts'.)
+        return self._counts.get(query, 0)
+
+    def short_candidates(self, query):
+        # This function gives back the set of keys whose first or last name contains 'query' (1 or 2 letters).
+        # A name of 3 letters or more that contains it also has a trigram containing it, so the sets of those
+        # trigrams are joined together; names shorter than a trigram are checked separately.
+        # This goes through every trigram there is, so it is meant for letters that few students have
+        # (see 'count'); the caller still checks each key, like for 'candidates'.
+        result = set()
+        for gram, keys in self._postings.items():
+            if query in gram:
+                result |= keys
+        result.update(self._short_names)
+        return result
@@ -0,0 +1,534 @@
+# This file keeps the students in a SQLite database file (e.g., 'students.db') instead of in memory.
+#
+# SQLite is a small database that comes with Python ('import sqlite3'). The students live in a table on disk,
+# and only the students that are actually looked at (e.g., the rows on screen) are loaded into memory,
+# so even rosters with millions of students start instantly and use little memory.
+# Every change (add, update, delete) is saved right away as one small 'transaction':
+# a change that is either saved completely or not at all, even if the computer crashes halfway.
+#
+# 'Indexes' (sorted look-up tables that the database keeps up to date by itself) make the usual questions quick:
+#   - the case-folded (first, last) name, to find a student and to refuse duplicate names
+#   - (last, first) name and the average grade, so both sort orders can be read straight from disk
+#   - the status, so 'filter_students' doesn't have to look at everyone
+#   - a 'trigram' full-text index (SQLite's FTS5), for partial name searches (like SearchIndex.py does in memory)
+# The class statistics are kept in two small tables that 'triggers' keep up to date, so they are read instantly.
+#
+# It can also be used from the command line to move students between a text file and a database:
+#   python SqliteClassroom.py import students.txt students.db
+#   python SqliteClassroom.py export students.db students.txt
+
+import contextlib  # Helps write our own 'with' blocks (see '_transaction').
+import os  # Used to name the file in import problems.
+import sqlite3  # The SQLite database that comes with Python.
+import sys  # Used to read the command-line arguments.
+import weakref  # Lets us remember loaded students without keeping them in memory forever.
+
+from Student import *  # The Student blueprint.
+from Statistics import *  # Class averages, pass rates and percentiles, kept up to date as students change.
+
+TABLE = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,  -- Goes up in the order students were added (the roster order).
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    first_key TEXT NOT NULL,  -- The names in case-folded form (see 'Classroom.make_key').
+    last_key TEXT NOT NULL,
+    midterm REAL NOT NULL,
+    final REAL NOT NULL,
+    attendance REAL NOT NULL,
+    project REAL NOT NULL,
+    -- Saved together with the grades (worked out by 'Student.average' and 'Student.status'), so they can be indexed.
+    average REAL NOT NULL,
+    passed INTEGER NOT NULL  -- 1 = Passed, 0 = Failed.
+)"""
+
+KEY_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS students_by_key ON students (first_key, last_key)"
+
+# The indexes that are only needed for sorting and filtering (see 'import_file').
+ORDER_INDEXES = {
+    "students_by_name": "CREATE INDEX IF NOT EXISTS students_by_name ON students (last_key, first_key)",
+    "students_by_average": "CREATE INDEX IF NOT EXISTS students_by_average ON students (average DESC)",
+    "students_by_status": "CREATE INDEX IF NOT EXISTS students_by_status ON students (passed)",
+}
+
+# The trigram index only stores the case-folded names; it reads everything else from the 'students' table.
+SEARCH_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS students_search USING fts5(
+    first_key, last_key, content='students', content_rowid='id', tokenize='trigram'
+)"""
+
+# These 'triggers' keep the trigram index up to date whenever a student is added or deleted.
+SEARCH_TRIGGERS = {
+    "students_search_add": """
+CREATE TRIGGER IF NOT EXISTS students_search_add AFTER INSERT ON students BEGIN
+    INSERT INTO students_search (rowid, first_key, last_key) VALUES (new.id, new.first_key, new.last_key);
+END""",
+    "students_search_delete": """
+CREATE TRIGGER IF NOT EXISTS students_search_delete AFTER DELETE ON students BEGIN
+    INSERT INTO students_search (students_search, rowid, first_key, last_key)
+    VALUES ('delete', old.id, old.first_key, old.last_key);
+END""",
+}
+
+# The class statistics (see 'Statistics.py') are kept in two small tables, so reading them never has to go
+# through the students table (which takes seconds for millions of students):
+#   - 'statistics_totals' has ONE row: how many students there are, how many of them passed and, for every grade,
+#     the sum of (grade - 50) and the sum of (grade - 50) squared. Measuring from the middle (50) instead of
+#     from 0 keeps the numbers small, so they stay precise.
+#   - 'statistics_bins' has one row per bin (see 'GradeSummary'), with how many grades of each kind fall in it.
+GRADES = ClassStatistics.COMPONENTS  # The statistics' grade names are also the names of the table's columns.
+MIDDLE = 50.0
+
+STATISTICS_TABLES = (
+    "CREATE TABLE IF NOT EXISTS statistics_totals (students INTEGER, passed INTEGER, "
+    + ", ".join(f"{grade}_sum REAL, {grade}_squares REAL" for grade in GRADES) + ")",
+    "CREATE TABLE IF NOT EXISTS statistics_bins (bin INTEGER PRIMARY KEY, "
+    + ", ".join(f"{grade} INTEGER NOT NULL DEFAULT 0" for grade in GRADES) + ")",
+)
+
+
+def bin_of(grade):
+    # The SQL for the bin a grade is counted in: the same bins as 'GradeSummary.bin_of'
+    # ('CAST ... AS INTEGER' also cuts off the decimals).
+    return f"MIN(MAX(CAST({grade} / {GradeSummary.BIN_WIDTH} AS INTEGER), 0), {GradeSummary.BINS - 1})"
+
+
+def statistics_changes(row, sign):
+    # The SQL that adds (sign "+") or takes away (sign "-") one student's values ('row' is "new" or "old").
+    totals = [f"students = students {sign} 1", f"passed = passed {sign} {row}.passed"]
+    for grade in GRADES:
+        distance = f"({row}.{grade} - {MIDDLE})"
+        totals.append(f"{grade}_sum = {grade}_sum {sign} {distance}")
+        totals.append(f"{grade}_squares = {grade}_squares {sign} {distance} * {distance}")
+    statements = [f"UPDATE statistics_totals SET {', '.join(totals)};"]
+    statements.extend(f"UPDATE statistics_bins SET {grade} = {grade} {sign} 1 WHERE bin = {bin_of(row + '.' + grade)};"
+                      for grade in GRADES)
+    return "\n    ".join(statements)
+
+
+# These triggers keep the statistics tables up to date whenever a student is added, deleted or gets new grades.
+# They are part of the same transaction as the change itself, so an undone change also undoes its statistics.
+STATISTICS_TRIGGERS = {
+    "statistics_add": f"""
+CREATE TRIGGER IF NOT EXISTS statistics_add AFTER INSERT ON students BEGIN
+    {statistics_changes("new", "+")}
+END""",
+    "statistics_delete": f"""
+CREATE TRIGGER IF NOT EXISTS statistics_delete AFTER DELETE ON students BEGIN
+    {statistics_changes("old", "-")}
+END""",
+    "statistics_update": f"""
+CREATE TRIGGER IF NOT EXISTS statistics_update
+AFTER UPDATE OF {", ".join(GRADES)}, passed ON students BEGIN
+    {statistics_changes("old", "-")}
+    {statistics_changes("new", "+")}
+END""",
+}
+
+COLUMNS = "first_name, last_name, midterm, final, attendance, project, first_key, last_key"
+
+# The ORDER BY for each order a StudentQuery can give back its students in.
+ORDERS = {
+    "roster": "id",
+    "name": "last_key, first_key",
+    "average": "average DESC, id",
+}
+
+
+class StoredStudent(Student):
+    # A Student loaded from the database. It is exactly a Student, but it can be 'weakly' remembered
+    # (see 'SqliteClassroom._loaded'), which a plain Student can't because of its '__slots__'.
+    __slots__ = ("__weakref__",)
+
+
+class StudentQuery:
+    # This defines a read-only, list-like view of the students that match a question to the database
+    # (all students, a search, a status filter...), in one of the ORDERS.
+    # 'len(query)' and 'query[i]' work like on a normal list, but students are only read from the database
+    # when they are asked for, one page at a time, so even millions of results take almost no memory.
+
+    PAGE_ROWS = 256  # How many students are read from the database at once.
+    MAX_PAGES = 8  # How many pages are kept for next time (e.g., while scrolling back and forth).
+
+    def __init__(self, classroom, where="1", params=(), order="roster"):
+        self._classroom = classroom
+        self._where = where  # The SQL condition the students must meet ("1" means everyone).
+        self._params = params  # The values for the '?' placeholders in 'where'.
+        self._order = order
+        self._version = None  # The classroom version the saved length and pages belong to.
+        self._length = None
+        self._pages = {}  # page number -> list of students.
+
+    def ordered(self, order):
+        # Gives back the same students in another order ("roster", "name" or "average").
+        return StudentQuery(self._classroom, self._where, self._params, order)
+
+    def _check_version(self):
+        # Saved pages and lengths are forgotten as soon as the classroom changes.
+        if self._version != self._classroom._version:
+            self._version = self._classroom._version
+            self._length = None
+            self._pages = {}
+
+    def __len__(self):
+        self._check_version()
+        if self._length is None:
+            if self._where == "1":
+                self._length = len(self._classroom)
+            else:
+                self._length = self._classroom._db.execute(
+                    f"SELECT COUNT(*) FROM students WHERE {self._where}", self._params).fetchone()[0]
+        return self._length
+
+    def _read(self, start, count):
+        # This helper reads 'count' students starting at position 'start'.
+        # The database first finds just the ids of those rows: it can do that from an index alone,
+        # which is much quicker than skipping over whole rows. Then only the wanted rows are read.
+        db = self._classroom._db
+        ids = [row[0] for row in db.execute(
+            f"SELECT id FROM students WHERE {self._where} ORDER BY {ORDERS[self._order]} LIMIT ? OFFSET ?",
+            (*self._params, count, start))]
+        if not ids:
+            return []
+        rows = {row[0]: row[1:] for row in db.execute(
+            f"SELECT id, {COLUMNS} FROM students WHERE id IN ({','.join('?' * len(ids))})", ids)}
+        return [self._classroom._student(rows[i]) for i in ids]
+
+    def __getitem__(self, i):
+        # query[i] gives one Student; query[a:b] gives a list of Students.
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return [self[j] for j in range(start, stop, step)]
+            if stop - start > self.PAGE_ROWS:
+                return self._read(start, stop - start)
+            return [self[j] for j in range(start, stop)]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("student index out of range")
+        page_number, position = divmod(i, self.PAGE_ROWS)
+        page = self._pages.get(page_number)
+        if page is None:
+            if len(self._pages) >= self.MAX_PAGES:
+                self._pages.pop(next(iter(self._pages)))  # Forget the oldest page.
+            page = self._pages[page_number] = self._read(page_number * self.PAGE_ROWS, self.PAGE_ROWS)
+        return page[position]
+
+    def __iter__(self):
+        # Going through every student reads them from the database in one go, without keeping them.
+        cursor = self._classroom._db.execute(
+            f"SELECT {COLUMNS} FROM students WHERE {self._where} ORDER BY {ORDERS[self._order]}", self._params)
+        while True:
+            rows = cursor.fetchmany(self.PAGE_ROWS)
+            if not rows:
+                return
+            for row in rows:
+                yield self._classroom._student(row)
+
+    def __contains__(self, student):
+        # 'student in query' asks the database directly instead of going through every student.
+        return self._classroom._db.execute(
+            f"SELECT 1 FROM students WHERE first_key = ? AND last_key = ? AND ({self._where})",
+            (*self._classroom.make_key(student.first_name, student.last_name), *self._params)).fetchone() is not None
+
+
+class SqliteClassroom:
+    # This defines a classroom that keeps its students in a SQLite database file.
+    # It works like 'Classroom' (same functions), so the app can use either one.
+
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        # 'WAL' mode with 'synchronous=NORMAL' makes each small transaction much quicker,
+        # and a crash can still never leave the database half-changed.
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        with self._db:
+            for statement in (TABLE, KEY_INDEX, *ORDER_INDEXES.values()):
+                self._db.execute(statement)
+            try:
+                self._db.execute(SEARCH_TABLE)
+                self._full_text = True
+            except sqlite3.OperationalError:
+                # This SQLite is too old for trigram full-text search (it needs version 3.34 or newer),
+                # so partial searches check every name instead.
+                self._full_text = False
+            else:
+                for statement in SEARCH_TRIGGERS.values():
+                    self._db.execute(statement)
+            for statement in STATISTICS_TABLES:
+                self._db.execute(statement)
+            if self._db.execute("SELECT COUNT(*) FROM statistics_totals").fetchone()[0] == 0:
+                # A new database (or one made before the statistics tables existed): work them out once.
+                self._fill_statistics()
+            for statement in STATISTICS_TRIGGERS.values():
+                self._db.execute(statement)
+        self._count = self._db.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+        self._version = 0  # Goes up after every change, so StudentQuery views know to read again.
+        # key -> the Student object for that student, for every loaded student that is still in use somewhere.
+        # This way the same student always gives back the same object (the app relies on that),
+        # but students nobody uses any more are forgotten automatically.
+        self._loaded = weakref.WeakValueDictionary()
+        # Class-level numbers (see 'Statistics.py'), read from the statistics tables and kept until the next change.
+        self._statistics = None
+        self._statistics_version = None  # The version '_statistics' was read at.
+
+    @staticmethod
+    def make_key(first_name, last_name):
+        # The same key as 'Classroom.make_key'.
+        return first_name.casefold(), last_name.casefold()
+
+    def _student(self, row):
+        # This helper turns one row (in COLUMNS order) into a Student, reusing the loaded one if there is one.
+        first_name, last_name, midterm, final, attendance, project, first_key, last_key = row
+        student = self._loaded.get((first_key, last_key))
+        if student is None:
+            student = StoredStudent(first_name, last_name, midterm, final, attendance, project)
+            self._loaded[(first_key, last_key)] = student
+        return student
+
+    def _changed(self):
+        # This helper is called after every change.
+        self._version += 1
+
+    @property
+    def students(self):
+        # Every student in roster order, as a list-like StudentQuery view.
+        return StudentQuery(self)
+
+    def __len__(self):
+        # Counting the rows in a big table is slow in SQLite, so we keep count ourselves.
+        return self._count
+
+    def copy_students(self):
+        # Same as 'Classroom.copy_students'.
+        return list(self.students)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # This helper runs the code in a 'with self._transaction():' block as one transaction.
+        # If a bigger transaction is already running (see 'import_file'), the code simply becomes part of it.
+        if self._db.in_transaction:
+            yield
+        else:
+            with self._db:  # Saved when the block ends, or undone completely if something goes wrong.
+                yield
+
+    def add_student(self, student):
+        # This function adds 'student' unless a student with the same name (ignoring upper/lowercase) exists.
+        with self._transaction():
+            return self._insert([student]) == 1
+
+    def add_students(self, students):
+        # This function adds many students in one transaction and gives back how many were added.
+        # Students whose name is already taken are skipped.
+        with self._transaction():
+            return self._insert(students)
+
+    def _insert(self, students):
+        # This helper inserts 'students' (skipping taken names) and gives back how many were added.
+        # Only a taken name is skipped: any other broken rule of the table (e.g., a grade that is 'nan', which
+        # SQLite stores as an empty value) raises sqlite3.IntegrityError, so the student isn't lost without a word.
+        added = self._db.executemany(
+            f"INSERT INTO students ({COLUMNS}, average, passed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (first_key, last_key) DO NOTHING",
+            ((student.first_name, student.last_name, student.midterm, student.final, student.attendance,
+              student.project, *self.make_key(student.first_name, student.last_name),
+              student.average(), student.status == "Passed") for student in students)
+        ).rowcount
+        if added:
+            self._count += added
+            self._changed()
+        return added
+
+    def import_file(self, path):
+        # This function adds every student from a 'students.txt'-style file (text or binary snapshot,
+        # plus its journal) in ONE transaction, which is many times quicker than one transaction per student.
+        # The file is read in batches, so it never has to fit in memory.
+        # It gives back (number of students added, problems), where problems are (where, line, error message).
+        from StudentFile import StudentFile
+
+        store = StudentFile(path)
+        problems = []
+        before = len(self)
+        # Filling an EMPTY database: keeping every index up to date row by row is the slowest part,
+        # so the sorting indexes, the trigram index and the statistics triggers are dropped first,
+        # and everything is worked out once at the end. (The name index stays, because it finds duplicate names.)
+        rebuild = before == 0
+        with self._db:
+            self._db.execute("BEGIN")  # Everything below is one transaction.
+            if rebuild:
+                for name in ORDER_INDEXES:
+                    self._db.execute(f"DROP INDEX IF EXISTS {name}")
+                if self._full_text:
+                    for name in SEARCH_TRIGGERS:
+                        self._db.execute(f"DROP TRIGGER IF EXISTS {name}")
+                for name in STATISTICS_TRIGGERS:
+                    self._db.execute(f"DROP TRIGGER IF EXISTS {name}")
+            for students, batch_problems in store.read_batches():
+                problems.extend(batch_problems)
+                # A 'savepoint' marks a place inside the transaction that we can go back to.
+                self._db.execute("SAVEPOINT import_batch")
+                try:
+                    self._insert(students)
+                except sqlite3.IntegrityError:
+                    # Some student in this batch can't be stored: undo the batch and add its students one by one,
+                    # so only the ones that can't be stored are skipped (and reported).
+                    self._db.execute("ROLLBACK TO import_batch")
+                    for student in students:
+                        try:
+                            self._insert([student])
+                        except sqlite3.IntegrityError as e:
+                            problems.append((os.path.basename(path), student.to_line().strip(), str(e)))
+                self._db.execute("RELEASE import_batch")
+            if rebuild:
+                for statement in ORDER_INDEXES.values():
+                    self._db.execute(statement)
+                if self._full_text:
+                    self._db.execute("INSERT INTO students_search (students_search) VALUES ('rebuild')")
+                    for statement in SEARCH_TRIGGERS.values():
+                        self._db.execute(statement)
+                self._fill_statistics()
+                for statement in STATISTICS_TRIGGERS.values():
+                    self._db.execute(statement)
+            problems.extend(store.apply_journal(self, store.read_journal()))
+        return len(self) - before, problems
+
+    def delete_student(self, first_name, last_name):
+        # This function removes a student by name. It gives back True if someone was removed.
+        key = self.make_key(first_name, last_name)
+        with self._transaction():
+            if self._db.execute("DELETE FROM students WHERE first_key = ? AND last_key = ?", key).rowcount == 0:
+                return False
+        self._loaded.pop(key, None)
+        self._count -= 1
+        self._changed()
+        return True
+
+    def update_student(self, student, midterm, final, project, attendance):
+        # Same as 'Classroom.update_student'. The new average and status are saved together with the grades.
+        key = self.make_key(student.first_name, student.last_name)
+        new = Student(student.first_name, student.last_name, midterm, final, attendance, project)
+        with self._transaction():
+            self._db.execute("UPDATE students SET midterm = ?, final = ?, project = ?, attendance = ?, "
+                             "average = ?, passed = ? WHERE first_key = ? AND last_key = ?",
+                             (midterm, final, project, attendance, new.average(), new.status == "Passed", *key))
+        for same in {student, self._loaded.get(key)}:  # Keep any loaded copy the same as the database.
+            if same is not None:
+                same.midterm = midterm
+                same.final = final
+                same.project = project
+                same.attendance = attendance
+        self._changed()
+
+    def apply_batch(self, batch):
+        # Same as 'Classroom.apply_batch', but the whole batch is also ONE transaction,
+        # so it is saved to disk once (and if the computer crashes halfway, none of it is saved).
+        try:
+            with self._db:
+                self._db.execute("BEGIN")  # Everything below is one transaction (like in 'import_file').
+                return batch.apply(self)
+        except Exception:
+            # The database undid the whole transaction (the statistics tables too), so count the students again.
+            self._count = self._db.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+            self._changed()
+            raise
+
+    def find_student(self, first_name, last_name):
+        # This function finds a student by their first and last name (using the name index).
+        row = self._db.execute(f"SELECT {COLUMNS} FROM students WHERE first_key = ? AND last_key = ?",
+                               self.make_key(first_name, last_name)).fetchone()
+        return None if row is None else self._student(row)
+
+    def search_student_partial(self, query):
+        # This function finds the students whose first or last name contains 'query', in roster order.
+        # Queries of 3 letters or more use the trigram index; shorter ones have to check every name.
+        query_key = query.casefold()
+        if self._full_text and len(query_key) >= 3:
+            # The query is written as one "phrase", so its letters must appear next to each other.
+            phrase = '"' + query_key.replace('"', '""') + '"'
+            return StudentQuery(self, "id IN (SELECT rowid FROM students_search WHERE students_search MATCH ?)",
+                                (phrase,))
+        return StudentQuery(self, "(instr(first_key, ?) > 0 OR instr(last_key, ?) > 0)", (query_key, query_key))
+
+    def filter_students(self, status_to_filter):
+        # This function gives back the students with a specific status (using the status index).
+        return StudentQuery(self, "passed = ?", (1 if status_to_filter.lower() == "passed" else 0,))
+
+    def sort_students_by_name(self):
+        # Sorted by last name, then first name, read straight from the name index.
+        return StudentQuery(self, order="name")
+
+    def sort_students_by_average(self):
+        # Sorted by average, highest first (equal averages in roster order), read from the average index.
+        return StudentQuery(self, order="average")
+
+    def statistics(self):
+        # Same as 'Classroom.statistics'. The triggers keep the statistics tables up to date with every change,
+        # so this only reads one row and the bins, however many students there are.
+        if self._statistics_version != self._version:
+            statistics = ClassStatistics()
+            students, passed, *sums = self._db.execute("SELECT * FROM statistics_totals").fetchone()
+            bins = self._db.execute(f"SELECT {', '.join(GRADES)} FROM statistics_bins ORDER BY bin").fetchall()
+            if students:
+                for position, summary in enumerate(statistics.grades.values()):
+                    total, squares = sums[2 * position], sums[2 * position + 1]
+                    if total is None or squares is None:
+                        # An 'inf' grade got in and was taken out again, which SQLite stores as an empty value.
+                        total = squares = float("nan")
+                    summary.count = students
+                    summary.mean = MIDDLE + total / students
+                    summary._m2 = squares - total * total / students  # The same as the sum of (grade - mean) squared.
+                    summary.bins = [row[position] for row in bins]
+            statistics.passed = passed
+            statistics.failed = students - passed
+            self._statistics = statistics
+            self._statistics_version = self._version
+        return self._statistics
+
+    def _fill_statistics(self):
+        # This helper works the statistics tables out from scratch: one pass over the students for the totals,
+        # and one per kind of grade for the bins. The triggers keep them up to date after that.
+        sums = ", ".join(f"TOTAL({grade} - {MIDDLE}), TOTAL(({grade} - {MIDDLE}) * ({grade} - {MIDDLE}))"
+                         for grade in GRADES)
+        self._db.execute("DELETE FROM statistics_totals")
+        self._db.execute(f"INSERT INTO statistics_totals SELECT COUNT(*), COALESCE(SUM(passed), 0), {sums} "
+                         "FROM students")
+        self._db.execute("DELETE FROM statistics_bins")
+        self._db.executemany("INSERT INTO statistics_bins (bin) VALUES (?)",
+                             ((number,) for number in range(GradeSummary.BINS)))
+        for grade in GRADES:
+            self._db.executemany(f"UPDATE statistics_bins SET {grade} = ? WHERE bin = ?", [
+                (in_bin, number) for number, in_bin in
+                self._db.execute(f"SELECT {bin_of(grade)}, COUNT(*) FROM students GROUP BY 1")])
+
+    def close(self):
+        # Close the database file.
+        self._db.close()
+
+
+def main(arguments):
+    # The command-line converter (see the top of this file).
+    from StudentFile import StudentFile
+
+    if len(arguments) != 3 or arguments[0] not in ("import", "export"):
+        print("Usage: python SqliteClassroom.py import|export SOURCE DESTINATION")
+        return 2
+    command, source, destination = arguments
+    if command == "import":
+        classroom = SqliteClassroom(destination)
+        added, problems = classroom.import_file(source)
+        for where, line, error in problems:
+            print(f"Skipped {where}: {line} - {error}")
+        print(f"Added {added} students to {destination}")
+    else:
+        classroom = SqliteClassroom(source)
+        StudentFile(destination).compact(classroom.students)
+        print(f"Wrote {len(classroom)} students to {destination}")
+    classroom.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
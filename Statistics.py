@@ -0,0 +1,212 @@
+# This file keeps class-level numbers (how many students, averages, spread, pass rate, histograms, percentiles)
+# up to date while students are added, updated and deleted.
+#
+# Working these out from scratch means going through every student again, which gets slow for big rosters.
+# Instead, every change adds or takes away ONE student's values from 'running totals', so reading the numbers
+# takes the same (tiny) time however many students there are.
+
+import collections  # 'Counter' counts how many grades fall into each bin.
+
+
+class GradeSummary:
+    # This defines the running numbers for ONE kind of grade (e.g., every student's midterm grade).
+    #
+    # The mean and variance use 'Welford's method': instead of adding up all grades (and all squared grades),
+    # which loses precision with millions of students, it keeps the mean itself and the sum of squared
+    # distances from the mean ('_m2'), and corrects both a little for every grade that is added or removed.
+    #
+    # For histograms and percentiles, the range 0-100 is split into small 'bins' of BIN_WIDTH points,
+    # and we count how many grades fall into each bin. A percentile (e.g., the median) is found by walking
+    # through the bins, so it is 'approximate': it can be off by at most one bin width.
+    # (Sketches like t-digest are more precise, but they can't forget a grade again when a student is deleted.)
+
+    BIN_WIDTH = 0.5  # How many points wide each bin is.
+    BINS = 200  # 0-100 in steps of 0.5. Grades below 0 count in the first bin, grades of 100 or more in the last.
+
+    def __init__(self):
+        self.count = 0  # How many grades are included.
+        self.mean = 0.0  # Their average.
+        self._m2 = 0.0  # The sum of (grade - mean) squared, for the variance.
+        self.bins = [0] * self.BINS  # How many grades fall into each bin.
+
+    @classmethod
+    def bin_of(cls, grade):
+        # Which bin 'grade' is counted in. The app never stores 'nan' or 'inf' grades, but if one gets in anyway
+        # it is counted in the first (nan, -inf) or last (inf) bin instead of stopping the statistics.
+        if grade >= cls.BINS * cls.BIN_WIDTH:
+            return cls.BINS - 1
+        if not grade > 0:  # Also true for 'nan', which isn't bigger (or smaller) than anything.
+            return 0
+        return int(grade / cls.BIN_WIDTH)
+
+    def add(self, grade):
+        # Include one more grade.
+        self.count += 1
+        delta = grade - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (grade - self.mean)
+        self.bins[self.bin_of(grade)] += 1
+
+    def remove(self, grade):
+        # Take out a grade that was added before (the same steps as 'add', done backwards).
+        self.count -= 1
+        if self.count == 0:
+            # Start again from exactly zero, so tiny rounding errors can't build up over time.
+            self.mean = 0.0
+            self._m2 = 0.0
+        else:
+            delta = grade - self.mean
+            self.mean -= delta / self.count
+            self._m2 -= delta * (grade - self.mean)
+        self.bins[self.bin_of(grade)] -= 1
+
+    def add_all(self, grades):
+        # Include many grades at once (a list). This gives the same result as calling 'add' for each one,
+        # but the mean and spread of the new grades are worked out first and then merged in, which is quicker.
+        if not grades:
+            return
+        part = GradeSummary()
+        part.count = len(grades)
+        part.mean = sum(grades) / part.count
+        part._m2 = sum((grade - part.mean) ** 2 for grade in grades)
+        # Count the grades per bin number first (a Counter is a dictionary of counts), then put them in their bins.
+        width = self.BIN_WIDTH
+        try:
+            numbers = collections.Counter([int(grade / width) for grade in grades])
+        except (ValueError, OverflowError):
+            # A 'nan' or 'inf' grade can't be turned into a whole number: let 'bin_of' place every grade instead.
+            numbers = collections.Counter([self.bin_of(grade) for grade in grades])
+        for number, in_bin in numbers.items():
+            part.bins[min(self.BINS - 1, max(0, number))] += in_bin
+        self.merge(part)
+
+    def merge(self, other):
+        # Include every grade of another GradeSummary (e.g., one made for a different part of the students).
+        # This is 'Chan's formula', the version of Welford's method for combining two groups at once.
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.bins = [mine + theirs for mine, theirs in zip(self.bins, other.bins)]
+
+    def variance(self):
+        # How spread out the grades are (the 'population' variance). 0 when there are no grades.
+        if self.count == 0:
+            return 0.0
+        return max(0.0, self._m2 / self.count)  # 'max' hides tiny negative rounding errors.
+
+    def std_dev(self):
+        # The standard deviation: the square root of the variance, in grade points.
+        return self.variance() ** 0.5
+
+    def percentile(self, percent):
+        # The grade below which 'percent' % of the grades fall (e.g., percentile(50) is the median),
+        # or None when there are no grades. Within a bin, the grades are assumed to be spread out evenly.
+        if self.count == 0:
+            return None
+        wanted = self.count * percent / 100
+        seen = 0
+        for number, in_bin in enumerate(self.bins):
+            if in_bin and seen + in_bin >= wanted:
+                return (number + (wanted - seen) / in_bin) * self.BIN_WIDTH
+            seen += in_bin
+        return self.BINS * self.BIN_WIDTH
+
+    def histogram(self, width=10):
+        # Counts per band of 'width' points (which must be a whole number of bins), as
+        # a list of (lowest grade, highest grade, count), e.g., [(0, 10, 3), (10, 20, 0), ...].
+        per_band = int(round(width / self.BIN_WIDTH))
+        return [(start * self.BIN_WIDTH, (start + per_band) * self.BIN_WIDTH, sum(self.bins[start:start + per_band]))
+                for start in range(0, self.BINS, per_band)]
+
+
+class ClassStatistics:
+    # This defines the running numbers for a whole classroom: one GradeSummary per kind of grade,
+    # plus how many students passed and failed. The classrooms call 'add' and 'remove' for every change.
+
+    # The grades we keep numbers for (the same order as the columns of the table in the app).
+    COMPONENTS = ("midterm", "final", "project", "attendance", "average")
+
+    def __init__(self):
+        self.grades = {name: GradeSummary() for name in self.COMPONENTS}  # name -> its GradeSummary.
+        self.passed = 0  # How many students passed.
+        self.failed = 0  # How many students failed.
+
+    @staticmethod
+    def values_of(student):
+        # A student's values, in COMPONENTS order.
+        return student.midterm, student.final, student.project, student.attendance, student.average()
+
+    def add(self, student):
+        # Include one student (call this AFTER they were added, or after their grades changed).
+        self.add_values(self.values_of(student), student.status == "Passed")
+
+    def add_students(self, students):
+        # Include many students at once (a list), e.g., a batch that was just loaded.
+        # One list per grade, in COMPONENTS order (quicker than a tuple per student with 'values_of').
+        columns = ([student.midterm for student in students], [student.final for student in students],
+                   [student.project for student in students], [student.attendance for student in students],
+                   [student.average() for student in students])
+        for summary, grades in zip(self.grades.values(), columns):
+            summary.add_all(grades)
+        passed = sum(student.status == "Passed" for student in students)
+        self.passed += passed
+        self.failed += len(students) - passed
+
+    def remove(self, student):
+        # Take out one student (call this BEFORE they are deleted, or before their grades change).
+        self.remove_values(self.values_of(student), student.status == "Passed")
+
+    def add_values(self, values, passed):
+        # Same as 'add', for code that has the values but no Student object (e.g., 'ColumnarClassroom').
+        for summary, value in zip(self.grades.values(), values):
+            summary.add(value)
+        if passed:
+            self.passed += 1
+        else:
+            self.failed += 1
+
+    def remove_values(self, values, passed):
+        # Same as 'remove', for code that has the values but no Student object.
+        for summary, value in zip(self.grades.values(), values):
+            summary.remove(value)
+        if passed:
+            self.passed -= 1
+        else:
+            self.failed -= 1
+
+    def merge(self, other):
+        # Include every student counted in another ClassStatistics.
+        for name, summary in self.grades.items():
+            summary.merge(other.grades[name])
+        self.passed += other.passed
+        self.failed += other.failed
+
+    def __len__(self):
+        # How many students are counted.
+        return self.passed + self.failed
+
+    def pass_rate(self):
+        # The share of students who passed, from 0.0 to 1.0 (0.0 when there are no students).
+        return self.passed / len(self) if len(self) else 0.0
+
+    def summary(self):
+        # A few lines of text describing the class, for showing to people (see the summary panel in main.py).
+        if len(self) == 0:
+            return "No students yet."
+        average = self.grades["average"]
+        lines = [
+            f"Students: {len(self)}    Passed: {self.passed} ({self.pass_rate():.1%})    Failed: {self.failed}",
+            f"Average: {average.mean:.2f} (std. dev. {average.std_dev():.2f})    "
+            f"Median: {average.percentile(50):.1f}    "
+            f"25th-75th percentile: {average.percentile(25):.1f}-{average.percentile(75):.1f}    "
+            f"90th percentile: {average.percentile(90):.1f}",
+            "    ".join(f"{name.title()}: {summary.mean:.1f}" for name, summary in self.grades.items()
+                       if name != "average"),
+            "Averages: " + "  ".join(f"{int(low)}-{int(high)}: {count}" for low, high, count
+                                     in average.histogram(width=10)),
+        ]
+        return "\n".join(lines)
@@ -1,36 +1,90 @@
+import math  # 'isfinite' checks that a grade is a real number (not 'nan' or 'inf').
+
+
 class Student:
     # This line defines a new 'blueprint' or 'type' called 'Student'.
     # Everything indented below 'class Student:' belongs to this blueprint.
 
+    # '__slots__' lists every value a Student can hold. Python then keeps these values in fixed places
+    # inside the object instead of in a separate dictionary per student, which makes each Student much smaller
+    # (this matters when there are millions of them). The grades are stored under names starting with '_';
+    # the 'midterm', 'final', 'attendance' and 'project' properties below read and write them.
+    __slots__ = ("first_name", "last_name", "_midterm", "_final", "_attendance", "_project", "_average", "_status")
+
     def __init__(self, first_name, last_name, midterm, final, attendance, project, initial_status=None):
         # This is a special function called the 'constructor'.
         # It's like the instruction manual for building a new 'Student' object.
         # When you create a student (e.g., Student("John", "Doe", ...)), this function runs automatically.
         # 'self' refers to the specific student object being created.
-        # 'initial_status=None' means 'initial_status' is optional. If you don't provide it, it defaults to nothing.
+        # 'initial_status' is the status saved in the file. It is still accepted so old code and files keep working,
+        # but it is not used: the status is always worked out from the grades, so it can never be out of date.
 
         self.first_name = first_name  # Store the student's first name inside this student object.
         self.last_name = last_name  # Store the student's last name.
-        self.midterm = midterm  # Store their midterm grade.
-        self.final = final  # Store their final grade.
-        self.attendance = attendance  # Store their attendance percentage.
-        self.project = project  # Store their project grade.
-
-        # Now, let's figure out if they passed or failed:
-        if initial_status is not None:
-            # If someone gave us an 'initial_status' (like "Passed" or "Failed" from the file)...
-            self.status = initial_status  # ...then we use that status directly.
-        else:
-            # If no 'initial_status' was given (e.g., for a brand new student)...
-            self.status = self.calculate_status()  # ...we'll figure out their status using the grades.
+        self._midterm = midterm  # Store their midterm grade.
+        self._final = final  # Store their final grade.
+        self._attendance = attendance  # Store their attendance percentage.
+        self._project = project  # Store their project grade.
+        self._average = None  # The average, saved the first time it is worked out (None = not worked out yet).
+        self._status = None  # The same for the status ("Passed" or "Failed").
+
+    # The grades are 'properties': reading 'student.midterm' gives back the stored grade, and
+    # writing 'student.midterm = 90' stores it AND forgets the saved average and status,
+    # so they are worked out again (with the new grade) the next time they are needed.
+
+    @property
+    def midterm(self):
+        return self._midterm
+
+    @midterm.setter
+    def midterm(self, value):
+        self._midterm = value
+        self._average = self._status = None
+
+    @property
+    def final(self):
+        return self._final
+
+    @final.setter
+    def final(self, value):
+        self._final = value
+        self._average = self._status = None
+
+    @property
+    def attendance(self):
+        return self._attendance
+
+    @attendance.setter
+    def attendance(self, value):
+        self._attendance = value
+        self._status = None  # Attendance isn't part of the average, but it does decide the status.
+
+    @property
+    def project(self):
+        return self._project
+
+    @project.setter
+    def project(self, value):
+        self._project = value
+        self._average = self._status = None
+
+    @property
+    def status(self):
+        # "Passed" or "Failed", worked out from the grades (see 'calculate_status') and then saved.
+        if self._status is None:
+            self._status = self.calculate_status()
+        return self._status
 
     def average(self):
         # This function calculates the student's overall average grade.
         # It belongs to each student object.
         # 'self' again refers to the specific student whose average we are calculating.
+        # The result is saved, so asking again (e.g., while sorting) doesn't do the math again.
 
-        # It's a weighted average: midterm (40%), final (40%), project (20%).
-        return self.midterm * 0.4 + self.final * 0.4 + self.project * 0.2
+        if self._average is None:
+            # It's a weighted average: midterm (40%), final (40%), project (20%).
+            self._average = self._midterm * 0.4 + self._final * 0.4 + self._project * 0.2
+        return self._average
 
     def calculate_status(self):
         # This function determines if a student "Passed" or "Failed" based on their grades and attendance.
@@ -48,11 +102,24 @@ class Student:
         # It creates a neat string showing their name, average, and status.
         return f"{self.first_name} {self.last_name} - Avg: {self.average():.2f}, Status: {self.status}"
 
+    def to_line(self):
+        # This function does the opposite of 'from_line': it turns the student into one line of text
+        # for the 'students.txt' file, with values separated by commas and the status at the end.
+        return f"{self.first_name},{self.last_name},{self.midterm},{self.final},{self.attendance},{self.project},{self.status}\n"
+
     @staticmethod
     def from_line(line):
         # This is a 'static method'. It's like a helper function that belongs to the 'Student' blueprint,
         # but it doesn't need a specific student object to work.
         # Its job is to take a line of text (like from our 'students.txt' file) and turn it into a Student object.
+        # The '*' hands each value from 'parse_line' to the constructor as a separate argument.
+        return Student(*Student.parse_line(line))
+
+    @staticmethod
+    def parse_line(line):
+        # This helper does the actual reading of a line. It gives back the values for the Student constructor
+        # as a 'tuple' (a fixed list of values) instead of a Student object.
+        # A tuple is cheap to send between processes, which the fast loader in 'StudentFile.py' uses.
 
         parts = line.strip().split(',')
         # 'line.strip()' removes any extra spaces or newlines from the ends of the text line.
@@ -61,27 +128,32 @@ class Student:
 
         # Check if the line has 7 pieces (our new format with status at the end):
         if len(parts) == 7:
-            return Student(
+            values = (
                 parts[0],  # The first piece is the first name.
                 parts[1],  # The second piece is the last name.
                 float(parts[2]),  # Convert the third piece (midterm) to a number (decimal).
                 float(parts[3]),  # Convert the fourth piece (final) to a number.
                 float(parts[4]),  # Convert the fifth piece (attendance) to a number.
                 float(parts[5]),  # Convert the sixth piece (project) to a number.
-                parts[6]  # The seventh piece is the status (keep as text).
+                parts[6]  # The seventh piece is the saved status (the Student works it out again from the grades).
             )
         # For old files that might only have 6 pieces (no status mentioned):
         elif len(parts) == 6:
-            return Student(
+            values = (
                 parts[0],  # First name.
                 parts[1],  # Last name.
                 float(parts[2]),  # Midterm.
                 float(parts[3]),  # Final.
                 float(parts[4]),  # Attendance.
                 float(parts[5])  # Project.
-                # Notice: No status here. The Student's '__init__' function will calculate it.
+                # Notice: No status here. The Student works it out from the grades.
             )
         else:
             # If the line doesn't have 6 or 7 pieces, it's a mistake.
             raise ValueError(f"Invalid line format in student data file: {line}")
-            # This stops the program and shows an error message, telling us the line was badly formatted.
\ No newline at end of file
+            # This stops the program and shows an error message, telling us the line was badly formatted.
+
+        # 'float()' also accepts "nan" (not a number) and "inf" (infinity), which are no real grades.
+        if not all(math.isfinite(grade) for grade in values[2:6]):
+            raise ValueError(f"Grades must be real numbers in student data file: {line}")
+        return values
\ No newline at end of file
@@ -0,0 +1,173 @@
+# This file lets many changes (adds, grade updates and deletes) be made to a classroom as ONE batch.
+#
+# A batch is 'all or nothing': every change is checked first, and if any of them is wrong
+# (e.g., a name that is already taken, or a grade that isn't a number) nothing is changed at all,
+# and the error lists every problem at once. If something unexpected goes wrong halfway,
+# the changes made so far are undone again.
+#
+# Example:
+#   batch = StudentBatch()
+#   batch.update("Ava", "Davis", final=91)        (only the final grade changes)
+#   batch.delete("Henry", "Parker")
+#   batch.add(Student("Mia", "Khan", 80, 75, 90, 85))
+#   changes = classroom.apply_batch(batch)        (or: batch.apply(classroom))
+# The app then writes all changes to the journal together and refreshes the table once.
+
+import math  # 'isfinite' checks that a grade is a real number (not 'nan' or 'inf').
+
+from Student import *  # The Student blueprint.
+
+
+class BatchError(Exception):
+    # Raised when a batch of changes can't be applied. Nothing is changed (or written) in that case.
+    # 'problems' lists every reason, one text per problem.
+
+    def __init__(self, message, problems=()):
+        super().__init__(message)
+        self.problems = list(problems)
+
+
+class StudentBatch:
+    # This defines a list of changes waiting to be applied together (see the top of this file).
+
+    GRADES = ("midterm", "final", "project", "attendance")  # The values 'update' can change.
+
+    def __init__(self):
+        # Each change is ("add", student), ("update", first name, last name, {grade: new value})
+        # or ("delete", first name, last name), in the order they were asked for.
+        self.changes = []
+
+    def __len__(self):
+        return len(self.changes)
+
+    def add(self, student):
+        # Add a new student (their name must not be taken).
+        self.changes.append(("add", student))
+
+    def update(self, first_name, last_name, midterm=None, final=None, project=None, attendance=None):
+        # Change an existing student's grades. Grades left as None keep their current value.
+        grades = {"midterm": midterm, "final": final, "project": project, "attendance": attendance}
+        self.changes.append(("update", first_name, last_name,
+                             {name: value for name, value in grades.items() if value is not None}))
+
+    def delete(self, first_name, last_name):
+        # Remove an existing student.
+        self.changes.append(("delete", first_name, last_name))
+
+    @staticmethod
+    def name_problem(name):
+        # Gives back what is wrong with a first or last name, or None if it is fine.
+        # Commas and line breaks would break the 'students.txt' format (and the journal).
+        if not name.strip() or "," in name or "\n" in name:
+            return f"{name!r} is not a valid name"
+        return None
+
+    @staticmethod
+    def grade_problem(name, value):
+        # Gives back what is wrong with one grade, or None if it is fine.
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            return f"{name} must be a number, not {value!r}"
+        return None
+
+    def check(self, classroom):
+        # This function checks every change against 'classroom' (as it will be by the time the change is made)
+        # WITHOUT changing anything, and gives back a list of problems (empty if the batch is fine).
+        problems = []
+        present = {}  # Name key -> True/False for names that earlier changes in this batch add or delete.
+
+        def exists(first_name, last_name):
+            key = classroom.make_key(first_name, last_name)
+            if key in present:
+                return present[key]
+            return classroom.find_student(first_name, last_name) is not None
+
+        for number, change in enumerate(self.changes, 1):
+            kind = change[0]
+            if kind == "add":
+                student = change[1]
+                first_name, last_name = student.first_name, student.last_name
+                grades = {name: getattr(student, name) for name in self.GRADES}
+            else:
+                first_name, last_name = change[1], change[2]
+                grades = change[3] if kind == "update" else {}
+            where = f"Change {number} ({kind} {first_name} {last_name})"
+            for name in (first_name, last_name):
+                problem = self.name_problem(name)
+                if problem is not None:
+                    problems.append(f"{where}: {problem}")
+            for name, value in grades.items():
+                problem = self.grade_problem(name, value)
+                if problem is not None:
+                    problems.append(f"{where}: {problem}")
+            if kind == "add":
+                if exists(first_name, last_name):
+                    problems.append(f"{where}: {first_name} {last_name} is already in the list")
+                present[classroom.make_key(first_name, last_name)] = True
+            elif not exists(first_name, last_name):
+                problems.append(f"{where}: there is no student called {first_name} {last_name}")
+            elif kind == "delete":
+                present[classroom.make_key(first_name, last_name)] = False
+        return problems
+
+    def apply(self, classroom):
+        # This function makes every change on 'classroom', or none of them (see the top of this file).
+        # It gives back what was changed, in order, as a list of ("saved", student) and ("deleted", student),
+        # which is what the app writes to the journal.
+        problems = self.check(classroom)
+        if problems:
+            raise BatchError(f"{len(problems)} problem(s) found; nothing was changed", problems)
+
+        done = []  # Everything changed so far, with what is needed to undo it.
+        pending_adds = []  # New students are added together (see 'add_pending').
+
+        def add_pending():
+            # Adds the waiting new students with one 'add_students' call (one update of the indexes).
+            if pending_adds:
+                classroom.add_students(pending_adds)
+                done.extend(("added", student) for student in pending_adds)
+                pending_adds.clear()
+
+        try:
+            for change in self.changes:
+                kind = change[0]
+                if kind == "add":
+                    pending_adds.append(change[1])
+                    continue
+                add_pending()  # Earlier adds must happen first (e.g., "add X" then "update X").
+                student = classroom.find_student(change[1], change[2])
+                if kind == "update":
+                    old = tuple(getattr(student, name) for name in self.GRADES)
+                    new = dict(zip(self.GRADES, old))
+                    new.update(change[3])
+                    classroom.update_student(student, new["midterm"], new["final"], new["project"],
+                                             new["attendance"])
+                    done.append(("updated", student, old))
+                else:
+                    # Keep a copy: some classrooms give back views that stop working once the student is gone.
+                    copy = Student(student.first_name, student.last_name, student.midterm, student.final,
+                                   student.attendance, student.project)
+                    classroom.delete_student(student.first_name, student.last_name)
+                    done.append(("deleted", copy))
+            add_pending()
+        except Exception:
+            self._undo(classroom, done)
+            raise
+
+        changes = []
+        for entry in done:
+            changes.append(("deleted" if entry[0] == "deleted" else "saved", entry[1]))
+        return changes
+
+    @staticmethod
+    def _undo(classroom, done):
+        # Undoes the changes in 'done', newest first, so the classroom holds the same students with the same
+        # grades as before the batch (a deleted student comes back at the end of the roster order).
+        for entry in reversed(done):
+            kind, student = entry[0], entry[1]
+            if kind == "added":
+                classroom.delete_student(student.first_name, student.last_name)
+            elif kind == "updated":
+                midterm, final, project, attendance = entry[2]
+                classroom.update_student(student, midterm, final, project, attendance)
+            else:
+                classroom.add_student(student)
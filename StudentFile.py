@@ -0,0 +1,249 @@
+import os  # Used for safely replacing files and forcing data onto the disk.
+from collections import deque  # A list that is quick to add to at one end and take from at the other.
+from concurrent.futures import ProcessPoolExecutor  # Runs work in several Python processes at the same time.
+
+from Student import *  # The Student blueprint (we need 'Student.parse_line', 'from_line' and 'to_line').
+from BinarySnapshot import MappedRoster, is_binary_snapshot, write_snapshot  # The optional binary snapshot format.
+
+
+def parse_chunk(lines, first_line_number):
+    # This function turns a chunk (a list) of lines from 'students.txt' into Student values.
+    # It lives outside the class so that helper processes can run it (see 'StudentFile.load').
+    # It gives back two lists:
+    #   - 'rows': the values for each good line, ready for 'Student(*row)'
+    #   - 'problems': (line number, line, error message) for each line that could not be read
+    rows = []
+    problems = []
+    for number, line in enumerate(lines, first_line_number):
+        try:
+            rows.append(Student.parse_line(line))
+        except ValueError as e:
+            problems.append((number, line.strip(), str(e)))  # Remember the bad line but keep going.
+    return rows, problems
+
+
+class StudentFile:
+    # This defines the blueprint for how student data is stored on disk.
+    #
+    # The data lives in two files:
+    #   - the 'snapshot' (e.g., 'students.txt'): every student, one per line, in the usual 7-field format.
+    #   - the 'journal' (e.g., 'students.txt.journal'): a short list of changes made since the snapshot was written.
+    #
+    # Each add, update or delete only appends ONE small line to the journal, instead of rewriting every student.
+    # When the journal gets too long, 'compact' writes a fresh snapshot and empties the journal.
+    #
+    # Journal lines look like this:
+    #   +,Ava,Davis,82.0,79.0,88.0,85.0,Passed   (a student was added or their grades changed)
+    #   -,Ava,Davis                              (a student was deleted)
+    #
+    # The snapshot can also be a binary snapshot (see 'BinarySnapshot.py'). The journal is always text.
+
+    CHUNK_BYTES = 4 * 1024 * 1024  # Read the snapshot in pieces of about this many bytes (4 MB).
+    PARALLEL_MIN_BYTES = 16 * 1024 * 1024  # Only start helper processes for snapshots bigger than this.
+
+    def __init__(self, path, max_journal_records=1000, max_journal_bytes=1_000_000, binary=None):
+        # 'path' is the snapshot file. The journal sits right next to it with '.journal' added to the name.
+        # 'binary' says whether the snapshot uses the binary format. None means: find out from the file itself
+        # (or, for a file that doesn't exist yet, from whether its name ends in '.bin').
+        self.path = path
+        if binary is None:
+            binary = is_binary_snapshot(path) if os.path.exists(path) else path.endswith(".bin")
+        self.binary = binary
+        self.journal_path = path + ".journal"
+        self.max_journal_records = max_journal_records  # Compact after this many changes...
+        self.max_journal_bytes = max_journal_bytes  # ...or once the journal is this big (in bytes).
+        self.journal_records = 0  # How many changes are in the journal right now.
+        self.journal_bytes = 0  # How big the journal is right now.
+
+    def load(self, classroom, workers=None):
+        # This function fills 'classroom' with the students from the snapshot, then replays the journal on top.
+        # If the snapshot file doesn't exist yet, that's okay: the classroom simply starts empty.
+        #
+        # Bad lines don't stop the loading. Instead, this gives back a list of
+        # (where, line, error message) for every line that could not be read, so they can be reported together.
+        problems = []
+        for students, batch_problems in self.read_batches(workers):
+            classroom.add_students(students)  # Each batch of students is added together.
+            problems.extend(batch_problems)
+        problems.extend(self.replay_journal(classroom))
+        return problems
+
+    def read_batches(self, workers=None):
+        # This function reads the snapshot and 'yields' the students in batches, as (students, problems),
+        # so the caller can use the first students before the whole file is read (see 'BackgroundIO.py').
+        # It doesn't touch any classroom itself.
+        #
+        # A text snapshot is read in big chunks of lines. For big files the chunks are read (turned into numbers)
+        # by several helper processes at once; 'workers' says how many (None means one per CPU core).
+        if self.binary:
+            roster = self.open_mapped()
+            if roster is not None:
+                try:
+                    for block in roster.blocks():
+                        yield block, []
+                finally:
+                    roster.close()  # Also runs if the caller stops early.
+            return
+        try:
+            f = open(self.path, "r", encoding="utf-8", buffering=self.CHUNK_BYTES)
+        except FileNotFoundError:
+            return
+        with f:
+            chunks = self._read_chunks(f)
+            if workers is None:
+                workers = os.cpu_count() or 1
+            if workers > 1 and os.fstat(f.fileno()).st_size >= self.PARALLEL_MIN_BYTES:
+                parsed = self._parse_in_processes(chunks, workers)
+            else:
+                # Small file (or only one worker): starting processes would take longer than the work itself.
+                parsed = (parse_chunk(lines, first_line_number) for lines, first_line_number in chunks)
+            name = os.path.basename(self.path)
+            for rows, chunk_problems in parsed:
+                yield [Student(*row) for row in rows], \
+                    [(f"{name} line {number}", line, error) for number, line, error in chunk_problems]
+
+    def open_mapped(self):
+        # For a binary snapshot, this gives back a MappedRoster: a list-like view of the students in the file
+        # that is ready almost instantly (students are only decoded when they are looked at).
+        # It gives back None for text snapshots or if the file doesn't exist yet.
+        if not self.binary or not os.path.exists(self.path):
+            return None
+        return MappedRoster(self.path)
+
+    def _read_chunks(self, f):
+        # This helper reads the open file 'f' in chunks of whole lines (about CHUNK_BYTES each).
+        # It 'yields' them one by one as (lines, number of the first line), so the whole file is never
+        # held in memory as text at once.
+        first_line_number = 1
+        while True:
+            lines = f.readlines(self.CHUNK_BYTES)
+            if not lines:
+                return
+            yield lines, first_line_number
+            first_line_number += len(lines)
+
+    @staticmethod
+    def _parse_in_processes(chunks, workers):
+        # This helper sends the chunks to 'workers' helper processes and yields their results in file order.
+        # At most two chunks per worker are in flight at once, so memory use stays small for any file size.
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            for lines, first_line_number in chunks:
+                in_flight.append(pool.submit(parse_chunk, lines, first_line_number))
+                if len(in_flight) >= workers * 2:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def replay_journal(self, classroom):
+        # This function applies every change written in the journal to 'classroom', in order.
+        # Replaying is safe to repeat: adding a student that already exists just updates their grades,
+        # and deleting a student that is already gone does nothing.
+        return self.apply_journal(classroom, self.read_journal())
+
+    def read_journal(self):
+        # This function reads the journal and gives back its complete lines as (where, line).
+        records = []
+        self.journal_records = 0
+        self.journal_bytes = 0
+        name = os.path.basename(self.journal_path)
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    if not line.endswith("\n"):
+                        # The last line was only half-written (e.g., the computer crashed while saving).
+                        # The change was never confirmed, so we ignore it.
+                        break
+                    self.journal_records += 1
+                    self.journal_bytes += len(line.encode("utf-8"))
+                    records.append((f"{name} line {number}", line))
+        except FileNotFoundError:
+            pass
+        return records
+
+    def apply_journal(self, classroom, records):
+        # This function applies the journal lines from 'read_journal' to 'classroom' and gives back
+        # (where, line, error message) for every line that could not be applied.
+        problems = []
+        for where, line in records:
+            try:
+                self.apply_record(classroom, line)
+            except ValueError as e:
+                problems.append((where, line.strip(), str(e)))
+        return problems
+
+    @staticmethod
+    def apply_record(classroom, line):
+        # This helper applies one journal line to 'classroom'.
+        operation, _, rest = line.partition(",")
+        if operation == "+":
+            student = Student.from_line(rest)
+            existing = classroom.find_student(student.first_name, student.last_name)
+            if existing is None:
+                classroom.add_student(student)
+            else:
+                # The student is already there, so this change was an update: copy the new grades over.
+                classroom.update_student(existing, student.midterm, student.final, student.project, student.attendance)
+        elif operation == "-":
+            parts = rest.strip().split(',')
+            if len(parts) != 2:
+                raise ValueError(f"Invalid delete record in journal: {line}")
+            classroom.delete_student(parts[0], parts[1])
+        else:
+            raise ValueError(f"Unknown journal record: {line}")
+
+    def record_save(self, student):
+        # Call this after a student was added or their grades were changed.
+        self.append_records([self.save_record(student)])
+
+    def record_delete(self, student):
+        # Call this after a student was deleted.
+        self.append_records([self.delete_record(student)])
+
+    @staticmethod
+    def save_record(student):
+        # The journal line for an added or updated student.
+        return "+," + student.to_line()
+
+    @staticmethod
+    def delete_record(student):
+        # The journal line for a deleted student.
+        return f"-,{student.first_name},{student.last_name}\n"
+
+    def append_records(self, lines):
+        # This function adds journal lines to the end of the journal and makes sure they really reached the disk.
+        # Writing several lines together needs only one (slow) trip to the disk for all of them.
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_records += len(lines)
+        self.journal_bytes += sum(len(line.encode("utf-8")) for line in lines)
+
+    def needs_compaction(self):
+        # True when the journal has grown past one of its limits.
+        return self.journal_records >= self.max_journal_records or \
+            self.journal_bytes >= self.max_journal_bytes
+
+    def compact(self, students):
+        # This function writes every student into a fresh snapshot and then empties the journal.
+        #
+        # The snapshot is first written to a temporary file and then renamed over the old one.
+        # Renaming is all-or-nothing, so a crash leaves either the complete old snapshot or the complete new one.
+        # If we crash after the rename but before the journal is emptied, replaying the old journal
+        # on the new snapshot gives the same result, because replaying is safe to repeat.
+        if self.binary:
+            write_snapshot(self.path, students)  # Uses the same temporary-file-and-rename steps.
+        else:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(student.to_line() for student in students)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        try:
+            os.remove(self.journal_path)  # Every change is in the snapshot now, so the journal can go.
+        except FileNotFoundError:
+            pass
+        self.journal_records = 0
+        self.journal_bytes = 0
@@ -0,0 +1,643 @@
+# This file measures how fast the Student Manager's building blocks are on big rosters.
+# Run it from the command line with:  python benchmark.py
+# It does not open any windows, so it also works on machines without a display.
+#
+# There is also a repeatable 'suite' that saves its results to a JSON file and compares them with a stored
+# 'baseline' (an earlier run), so code changes that make things slower are noticed:
+#   python benchmark.py suite --save-baseline            (once, to store the baseline)
+#   python benchmark.py suite                            (later: exits with code 1 if anything got slower)
+#   python benchmark.py generate 10000000 roster.txt     (just write a made-up roster file)
+# Run 'python benchmark.py suite --help' for every option.
+
+import argparse  # Reads the options typed after 'python benchmark.py'.
+import json  # Saves results and reads the baseline.
+import os  # Used to find out how many CPU cores there are and to clean up files.
+import platform  # Describes the computer, so results from different machines aren't mixed up.
+import random  # Used to make up random names and grades.
+import sys  # Used for the exit code.
+import tempfile  # Used to make a throwaway folder for benchmark files.
+import time  # Used to measure how long things take.
+import tracemalloc  # Used to measure how much memory things take.
+
+from Student import *  # The Student blueprint.
+from Classroom import *  # The Classroom organizer.
+from StudentFile import *  # Saving and loading 'students.txt'.
+
+
+FIRST_NAMES = ["Oliver", "Ava", "Henry", "Charlotte", "Ryan", "Layla", "Grace", "Connor", "Mia", "Liam"]
+LAST_NAMES = ["Brown", "Davis", "Parker", "White", "Brooks", "Carter", "Flores", "Mitchell", "Nguyen", "Khan"]
+
+
+def make_lines(count, seed=42):
+    # This function makes up 'count' lines in the same format as 'students.txt'.
+    # Every name gets a number added to it so that all students are different.
+    # Using a fixed 'seed' means we get the same made-up roster every time we run the benchmark.
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        first = f"{rng.choice(FIRST_NAMES)}{i}"
+        last = rng.choice(LAST_NAMES)
+        midterm, final, attendance, project = (round(rng.uniform(0, 100), 1) for _ in range(4))
+        lines.append(f"{first},{last},{midterm},{final},{attendance},{project},Passed\n")
+    return lines
+
+
+def time_it(function, *args):
+    # This helper runs 'function' once and gives back how many seconds it took.
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def load_lines(lines):
+    # This does the same work as 'StudentManagerApp.load_students', without the window:
+    # turn every line into a Student and add it to a Classroom (which checks for duplicates).
+    classroom = Classroom()
+    for line in lines:
+        classroom.add_student(Student.from_line(line))
+    return classroom
+
+
+def bench_load(sizes=(25_000, 50_000, 100_000, 200_000)):
+    # Loading should grow linearly: twice the students should take about twice as long,
+    # so the time per student (last column) should stay about the same for every size.
+    print("Load roster (Student.from_line + Classroom.add_student)")
+    print(f"{'students':>10} {'seconds':>10} {'us/student':>12}")
+    for size in sizes:
+        lines = make_lines(size)
+        seconds = time_it(load_lines, lines)
+        print(f"{size:>10} {seconds:>10.3f} {seconds / size * 1e6:>12.2f}")
+
+
+def bench_columnar(size=200_000):
+    # Compares the normal Classroom (one Student object per student) with the ColumnarClassroom
+    # (one NumPy column per value) on memory use and on recalculating every average and status.
+    try:
+        from ColumnarClassroom import ColumnarClassroom
+        ColumnarClassroom()
+    except ImportError as e:
+        print(f"Skipping columnar benchmark: {e}")
+        return
+
+    lines = make_lines(size)
+    print(f"Classroom vs ColumnarClassroom ({size} students)")
+    print(f"{'backend':>18} {'memory MB':>10} {'recompute s':>12}")
+    for backend in (Classroom, ColumnarClassroom):
+        tracemalloc.start()
+        classroom = backend()
+        for line in lines:
+            classroom.add_student(Student.from_line(line))
+        memory = tracemalloc.get_traced_memory()[0] / 1e6  # Memory still in use after loading.
+        tracemalloc.stop()
+
+        if backend is ColumnarClassroom:
+            def recompute():
+                classroom._averages = None  # Forget the saved averages so they are really recalculated.
+                classroom.calculate_statuses()
+        else:
+            def recompute():
+                for student in classroom.students:
+                    student.midterm = student.midterm  # Forget the saved average and status...
+                    student.status  # ...so they are really recalculated.
+        print(f"{backend.__name__:>18} {memory:>10.1f} {time_it(recompute):>12.4f}")
+
+
+class PlainStudent:
+    # A Student the way it used to be (no '__slots__', average worked out on every call), for comparison.
+    def __init__(self, first_name, last_name, midterm, final, attendance, project, initial_status=None):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.midterm = midterm
+        self.final = final
+        self.attendance = attendance
+        self.project = project
+        self.status = initial_status
+
+    def average(self):
+        return self.midterm * 0.4 + self.final * 0.4 + self.project * 0.2
+
+
+def bench_students(size=1_000_000):
+    # Compares the memory and speed of Student with the old PlainStudent: how much memory 'size' students take,
+    # how long making them takes, and how long it takes to get every average twice (e.g., sorting, then showing
+    # the table). Student saves its average, so the second time should be much quicker.
+    rows = [Student.parse_line(line) for line in make_lines(size)]
+    print(f"Student objects ({size} students)")
+    print(f"{'class':>14} {'bytes each':>11} {'create s':>10} {'averages s':>11} {'again s':>10}")
+    for blueprint in (PlainStudent, Student):
+        tracemalloc.start()
+        students = [blueprint(*row) for row in rows]
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del students
+        start = time.perf_counter()
+        students = [blueprint(*row) for row in rows]
+        create = time.perf_counter() - start
+
+        def averages():
+            for student in students:
+                student.average()
+        first = time_it(averages)
+        print(f"{blueprint.__name__:>14} {memory / size:>11.0f} {create:>10.3f} {first:>11.3f} {time_it(averages):>10.3f}")
+        del students
+
+
+def bench_search(size=1_000_000, typed="oliver12"):
+    # Times 'search_student_partial' the way the search box uses it: one search per typed letter,
+    # each one extending the previous search text.
+    classroom = load_lines(make_lines(size))
+    classroom.search_student_partial(typed[:3])  # Build the trigram index once, like the first real search does.
+    print(f"Partial search while typing '{typed}' ({size} students)")
+    print(f"{'query':>10} {'matches':>10} {'ms':>10}")
+    for end in range(1, len(typed) + 1):
+        query = typed[:end]
+        start = time.perf_counter()
+        matches = len(classroom.search_student_partial(query))
+        print(f"{query:>10} {matches:>10} {(time.perf_counter() - start) * 1000:>10.2f}")
+
+
+def bench_sorting(size=200_000, changes=1_000):
+    # The first sort builds the sorted order; switching between the sort buttons after that should
+    # take almost no time, and so should keeping the sorted orders up to date while grades change.
+    classroom = load_lines(make_lines(size))
+    rng = random.Random(7)
+    print(f"Sorted views ({size} students)")
+    print(f"{'step':>28} {'ms':>10}")
+    print(f"{'first sort by name':>28} {time_it(classroom.sort_students_by_name) * 1000:>10.2f}")
+    print(f"{'first sort by average':>28} {time_it(classroom.sort_students_by_average) * 1000:>10.2f}")
+    print(f"{'switch to name':>28} {time_it(classroom.sort_students_by_name) * 1000:>10.4f}")
+    print(f"{'switch to average':>28} {time_it(classroom.sort_students_by_average) * 1000:>10.4f}")
+    students = rng.sample(classroom.students, changes)
+
+    def update_all():
+        for student in students:
+            classroom.update_student(student, rng.uniform(0, 100), student.final, student.project, student.attendance)
+    seconds = time_it(update_all)
+    print(f"{'update one student':>28} {seconds / changes * 1000:>10.4f}")
+
+
+def bench_loader(size=500_000):
+    # Compares how many rows per second each way of loading a 'students.txt' file manages:
+    #   - the old way: read line by line and call 'add_student' for every student
+    #   - StudentFile.load with one process
+    #   - StudentFile.load with one helper process per CPU core
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "students.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(make_lines(size))
+
+        def line_by_line():
+            with open(path, "r", encoding="utf-8") as f:
+                load_lines(f)
+
+        def streaming(workers):
+            store = StudentFile(path)
+            store.PARALLEL_MIN_BYTES = 0  # Use the helper processes even if the file is small.
+            store.load(Classroom(), workers=workers)
+
+        cores = os.cpu_count() or 1
+        print(f"Loader throughput ({size} rows, {cores} CPU cores)")
+        print(f"{'loader':>24} {'seconds':>10} {'rows/sec':>12}")
+        for name, function, args in (("line by line", line_by_line, ()),
+                                     ("StudentFile, 1 process", streaming, (1,)),
+                                     (f"StudentFile, {cores} processes", streaming, (cores,))):
+            seconds = time_it(function, *args)
+            print(f"{name:>24} {seconds:>10.3f} {size / seconds:>12,.0f}")
+
+
+def bench_cold_start(size=500_000, screen=30):
+    # Compares starting up from 'students.txt' with starting up from a binary snapshot:
+    #   - 'first screen': how long until the first 'screen' students could be shown in the table
+    #   - 'full load': how long until every student is in the Classroom
+    # A text file has to be read completely before anything can be shown; a binary snapshot doesn't.
+    with tempfile.TemporaryDirectory() as folder:
+        text_path = os.path.join(folder, "students.txt")
+        binary_path = os.path.join(folder, "students.bin")
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.writelines(make_lines(size))
+        StudentFile(binary_path).compact(load_lines(make_lines(size)).students)
+
+        def first_screen(path):
+            store = StudentFile(path)
+            preview = store.open_mapped()
+            if preview is None:
+                classroom = Classroom()  # Text: everything must be loaded first.
+                store.load(classroom, workers=1)
+                preview = classroom.students
+            rows = preview[:screen]
+            if hasattr(preview, "close"):
+                preview.close()
+            return rows
+
+        def full_load(path):
+            StudentFile(path).load(Classroom(), workers=1)
+
+        print(f"Cold start ({size} students)")
+        print(f"{'format':>8} {'first screen s':>15} {'full load s':>12}")
+        for name, path in (("text", text_path), ("binary", binary_path)):
+            print(f"{name:>8} {time_it(first_screen, path):>15.4f} {time_it(full_load, path):>12.3f}")
+
+
+def bench_sqlite(size=1_000_000, screen=30):
+    # Times the SQLite backend on a big roster: importing 'students.txt' in one transaction, then the
+    # questions the app asks (a screen of students from the middle of each order, searches, a status filter)
+    # and one change. Only the students asked for are loaded, so memory use stays small.
+    from SqliteClassroom import SqliteClassroom
+
+    with tempfile.TemporaryDirectory() as folder:
+        text_path = os.path.join(folder, "students.txt")
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.writelines(make_lines(size))
+        classroom = SqliteClassroom(os.path.join(folder, "students.db"))
+        print(f"SQLite backend ({size} students)")
+        print(f"{'step':>28} {'ms':>10}")
+        print(f"{'import students.txt':>28} {time_it(classroom.import_file, text_path) * 1000:>10.0f}")
+
+        tracemalloc.start()
+        middle = size // 2
+        for name, students in (("roster", classroom.students),
+                               ("by name", classroom.sort_students_by_name()),
+                               ("by average", classroom.sort_students_by_average()),
+                               ("passed", classroom.filter_students("passed"))):
+            seconds = time_it(lambda: students[middle:middle + screen])
+            print(f"{'screen from middle, ' + name:>28} {seconds * 1000:>10.2f}")
+        for query in ("oliver12", "ava9999", "br"):
+            seconds = time_it(lambda: len(classroom.search_student_partial(query)))
+            print(f"{'search ' + query:>28} {seconds * 1000:>10.2f}")
+        student = classroom.students[middle]
+        seconds = time_it(classroom.update_student, student, 99.0, 99.0, 99.0, 99.0)
+        print(f"{'update one student':>28} {seconds * 1000:>10.2f}")
+        print(f"{'statistics() after a change':>28} {time_it(classroom.statistics) * 1000:>10.2f}")
+        print(f"{'memory used (MB)':>28} {tracemalloc.get_traced_memory()[1] / 1e6:>10.2f}")
+        tracemalloc.stop()
+        classroom.close()
+
+
+def bench_statistics(size=1_000_000, changes=1_000):
+    # Compares working out the class numbers from scratch (going through every student) with reading the
+    # running numbers that the Classroom keeps up to date, and times how much one change costs with them on.
+    classroom = load_lines(make_lines(size))
+    rng = random.Random(7)
+    print(f"Class statistics ({size} students)")
+    print(f"{'step':>28} {'ms':>10}")
+
+    def from_scratch():
+        averages = [student.average() for student in classroom.students]
+        mean = sum(averages) / len(averages)
+        return mean, sum((average - mean) ** 2 for average in averages) / len(averages), sorted(averages)
+    print(f"{'from scratch (with median)':>28} {time_it(from_scratch) * 1000:>10.2f}")
+    print(f"{'first statistics()':>28} {time_it(classroom.statistics) * 1000:>10.2f}")
+    print(f"{'read summary':>28} {time_it(lambda: classroom.statistics().summary()) * 1000:>10.4f}")
+    students = rng.sample(classroom.students, changes)
+
+    def update_all():
+        for student in students:
+            classroom.update_student(student, rng.uniform(0, 100), student.final, student.project, student.attendance)
+    seconds = time_it(update_all)
+    print(f"{'update one student':>28} {seconds / changes * 1000:>10.4f}")
+
+
+# --- The benchmark suite ---
+
+SUITE_SIZES = (1_000, 10_000, 100_000)  # Roster sizes the suite runs by default.
+SUITE_CHANGES = 1_000  # How many adds, deletes and look-ups are timed together.
+SUITE_QUERIES = ("oliver1", "ava", "khan")  # The partial searches that are timed.
+BASELINE_FILE = "benchmark_baseline.json"
+# A result only counts as slower than the baseline if it is slower by more than the tolerance (as a share)
+# AND by more than this many seconds, so tiny timings that jump around a little don't raise false alarms.
+NOISE_SECONDS = 0.002
+
+
+def roster_name(i):
+    # The name of the i-th made-up student. It is worked out from 'i' alone (no random numbers),
+    # so a duplicate of an earlier student can be made without remembering every name.
+    return f"{FIRST_NAMES[i % len(FIRST_NAMES)]}{i}", LAST_NAMES[i // len(FIRST_NAMES) % len(LAST_NAMES)]
+
+
+def generate_roster(count, seed=42, duplicates=0.01, malformed=0.01):
+    # This function 'yields' 'count' made-up lines in the 'students.txt' format, one at a time,
+    # so even 10 million lines never have to be in memory together.
+    # About 'duplicates' (a share, 0.01 = 1%) of the lines repeat an earlier student's name in capitals
+    # (which the Classroom must skip), and about 'malformed' of them are broken (which loading must report).
+    # The same 'seed' always gives exactly the same lines.
+    rng = random.Random(seed)
+    for i in range(count):
+        chance = rng.random()
+        if chance < malformed:
+            # A few different kinds of broken lines: too few values, or a grade that isn't a number.
+            first, last = roster_name(i)
+            yield rng.choice((f"{first},{last}\n", f"{first},{last},abc,50,50,50,Passed\n", "\n"))
+            continue
+        if chance < malformed + duplicates and i > 0:
+            first, last = roster_name(rng.randrange(i))
+            first = first.upper()  # The same name in other letters (names are compared ignoring upper/lowercase).
+        else:
+            first, last = roster_name(i)
+        midterm, final, attendance, project = (round(rng.uniform(0, 100), 1) for _ in range(4))
+        yield f"{first},{last},{midterm},{final},{attendance},{project},Passed\n"
+
+
+def write_roster(path, count, seed=42, duplicates=0.01, malformed=0.01):
+    # Writes a made-up roster (see 'generate_roster') to the file 'path'.
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(generate_roster(count, seed, duplicates, malformed))
+
+
+def best_of(repeat, function, setup=None):
+    # Runs 'function' 'repeat' times and gives back the QUICKEST time in seconds.
+    # The quickest run is the one least disturbed by other programs, so it changes least from run to run.
+    # 'setup' (if given) runs before each try and isn't timed; whatever it gives back is passed to 'function'.
+    best = None
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        seconds = time_it(function, *args)
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def suite_scenarios(path, size, repeat, folder):
+    # Times every scenario on the roster file 'path' and 'yields' (scenario name, seconds).
+    # Each change scenario is undone afterwards, so every try starts from the same classroom.
+    yield "load", best_of(repeat, lambda: StudentFile(path).load(Classroom(), workers=1))
+
+    def parse_all():
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    Student.from_line(line)
+                except ValueError:
+                    pass
+    yield "parse lines", best_of(repeat, parse_all)
+
+    classroom = Classroom()
+    StudentFile(path).load(classroom, workers=1)
+    yield "save", best_of(repeat, lambda: StudentFile(os.path.join(folder, "saved.txt")).compact(
+        classroom.copy_students()))
+
+    rng = random.Random(7)
+    names = [(student.first_name, student.last_name) for student in
+             rng.choices(classroom.students, k=SUITE_CHANGES)]
+    yield f"find x{len(names)}", best_of(repeat, lambda: [classroom.find_student(*name) for name in names])
+
+    new_students = [Student(f"New{i}", "Student", 70.0, 70.0, 90.0, 70.0) for i in range(SUITE_CHANGES)]
+    add_seconds = []
+    delete_seconds = []
+    for _ in range(repeat):
+        add_seconds.append(time_it(lambda: [classroom.add_student(student) for student in new_students]))
+        delete_seconds.append(time_it(lambda: [classroom.delete_student(student.first_name, student.last_name)
+                                               for student in new_students]))
+    yield f"add x{SUITE_CHANGES}", min(add_seconds)
+    yield f"delete x{SUITE_CHANGES}", min(delete_seconds)
+
+    yield "partial search", best_of(repeat, lambda: [classroom.search_student_partial(query)
+                                                     for query in SUITE_QUERIES])
+    yield "filter passed", best_of(repeat, lambda: classroom.filter_students("passed"))
+
+    # The Classroom keeps its sorted orders once they are made, so each try sorts a fresh copy.
+    def fresh_copy():
+        copy = Classroom()
+        copy.add_students(classroom.copy_students())
+        return copy
+    yield "sort by name", best_of(repeat, lambda copy: copy.sort_students_by_name()[:30], fresh_copy)
+    yield "sort by average", best_of(repeat, lambda copy: copy.sort_students_by_average()[:30], fresh_copy)
+
+    for name, seconds in bench_treeview(classroom, repeat, folder):
+        yield name, seconds
+
+
+class StubTable:
+    # A stand-in for the Tkinter table (a Treeview), used when there is no display.
+    # It keeps the rows in order like the real one, so the app's own table code ('sync_rows') can be timed.
+
+    def __init__(self):
+        self.rows = []  # Row IDs, in the order they are shown.
+        self.values = {}  # Row ID -> the values shown in that row.
+        self.selected = ()
+
+    def get_children(self):
+        return tuple(self.rows)
+
+    def index(self, iid):
+        return self.rows.index(iid)
+
+    def insert(self, _parent, index, iid, values):
+        self.rows.insert(index, iid)
+        self.values[iid] = values
+
+    def move(self, iid, _parent, index):
+        self.rows.remove(iid)
+        self.rows.insert(index, iid)
+
+    def item(self, iid, values):
+        self.values[iid] = values
+
+    def delete(self, *iids):
+        gone = set(iids)
+        self.rows = [iid for iid in self.rows if iid not in gone]
+        for iid in iids:
+            del self.values[iid]
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, iids):
+        self.selected = (iids,) if isinstance(iids, str) else tuple(iids)
+
+
+class StubWidget:
+    # A stand-in for the scrollbar and the summary label: it accepts the calls and does nothing.
+
+    def set(self, *_args):
+        pass
+
+    def config(self, **_options):
+        pass
+
+
+def headless_app(classroom):
+    # Makes a StudentManagerApp without a window: only the parts the table code uses are set up,
+    # and the Tkinter widgets are replaced by the stand-ins above.
+    from main import StudentManagerApp
+
+    app = StudentManagerApp.__new__(StudentManagerApp)  # Skips '__init__', which would open a window.
+    app.classroom = classroom
+    app.tree = StubTable()
+    app.vsb = StubWidget()
+    app.summary_label = StubWidget()
+    app.current_students = []
+    app.row_students = {}
+    app.row_values = {}
+    app.selected_student = None
+    app.virtual = False
+    app.offset = 0
+    app.page_size = 20
+    app.sort_mode = None
+    return app
+
+
+def bench_treeview(classroom, repeat, folder):
+    # Times filling the real table (a Tkinter Treeview) with the students of 'classroom', in a hidden window.
+    # Tkinter needs a display (a screen). On machines without one (like a CI server) the same table code
+    # is timed against a stand-in table instead, and the scenarios get " (stub)" added to their names,
+    # because those numbers leave out Tkinter's own work and can't be compared with the real ones.
+    try:
+        import tkinter as tk
+    except ImportError:
+        return bench_stub_table(classroom, repeat)  # Python was built without Tkinter.
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print("No display: timing the table scenarios against a stand-in table.")
+        return bench_stub_table(classroom, repeat)
+    from main import StudentManagerApp  # Imported here, so the rest of the suite doesn't need Tkinter.
+    root.withdraw()  # Keep the window hidden.
+    app = StudentManagerApp(root, Classroom(), os.path.join(folder, "treeview.txt"))
+    while app.loading or app.io.busy():  # Wait until the (empty) file is loaded.
+        root.update()
+        time.sleep(0.01)
+    app.classroom.add_students(classroom.copy_students())
+
+    def fill(sort):
+        # Show the students (sorted or not) and let Tkinter finish drawing the table.
+        app.sort_mode = sort
+        app.refresh_student_list()
+        root.update_idletasks()
+
+    def clear():
+        # Show no students, so the next try fills the table from empty.
+        app.refresh_student_list([])
+        root.update_idletasks()
+
+    def clear_then(sort):
+        return lambda: (clear(), sort)[1]
+
+    results = [("table fill", best_of(repeat, fill, clear_then(None))),
+               ("table fill by name", best_of(repeat, fill, clear_then("name"))),
+               ("table fill by average", best_of(repeat, fill, clear_then("average")))]
+    app.on_close()
+    return results
+
+
+def bench_stub_table(classroom, repeat):
+    # The table scenarios without a display: the same 'refresh_student_list' calls, against a stand-in table.
+    app = headless_app(Classroom())
+    app.classroom.add_students(classroom.copy_students())
+
+    def fill(sort):
+        app.sort_mode = sort
+        app.refresh_student_list()
+
+    def clear_then(sort):
+        return lambda: (app.refresh_student_list([]), sort)[1]
+
+    return [("table fill (stub)", best_of(repeat, fill, clear_then(None))),
+            ("table fill by name (stub)", best_of(repeat, fill, clear_then("name"))),
+            ("table fill by average (stub)", best_of(repeat, fill, clear_then("average")))]
+
+
+def run_suite(sizes=SUITE_SIZES, repeat=3, seed=42):
+    # Runs every scenario for every roster size and gives back {"size/scenario": seconds}.
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            path = os.path.join(folder, "students.txt")
+            write_roster(path, size, seed)
+            for name, seconds in suite_scenarios(path, size, repeat, folder):
+                results[f"{size}/{name}"] = seconds
+                print(f"{size:>10} {name:>28} {seconds * 1000:>12.3f} ms")
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    # Prints each result next to the baseline's, and gives back the names of the scenarios that got slower
+    # by more than 'tolerance' (a share: 0.25 means 25% slower) and by more than NOISE_SECONDS.
+    slower = []
+    print(f"{'scenario':>36} {'baseline ms':>12} {'now ms':>12} {'change':>8}")
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue  # A new scenario (or size) that the baseline doesn't have yet.
+        change = seconds / before - 1 if before > 0 else 0.0
+        flag = ""
+        if change > tolerance and seconds - before > NOISE_SECONDS:
+            slower.append(name)
+            flag = "  SLOWER"
+        print(f"{name:>36} {before * 1000:>12.3f} {seconds * 1000:>12.3f} {change:>+8.0%}{flag}")
+    return slower
+
+
+def suite_main(args):
+    # Runs the suite with the options from the command line (see the bottom of this file).
+    results = run_suite(args.sizes, args.repeat, args.seed)
+    report = {
+        "machine": {"python": platform.python_version(), "system": platform.platform(),
+                    "processor": platform.processor(), "cpu_count": os.cpu_count()},
+        "settings": {"sizes": args.sizes, "repeat": args.repeat, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline} yet; save one with --save-baseline.")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["machine"] != report["machine"]:
+        print("Warning: the baseline was made on a different machine or Python, so the numbers may not compare.")
+    slower = compare_to_baseline(results, baseline["results"], args.tolerance)
+    if slower:
+        print(f"{len(slower)} scenario(s) got slower than the baseline: {', '.join(slower)}")
+        return 1
+    print("No scenario got slower than the baseline.")
+    return 0
+
+
+def make_parser():
+    # The command-line options of this file.
+    parser = argparse.ArgumentParser(description="Student Manager benchmarks")
+    commands = parser.add_subparsers(dest="command")  # No command runs the printed benchmarks above.
+
+    suite = commands.add_parser("suite", help="run the benchmark suite and compare it with a baseline")
+    suite.add_argument("--sizes", type=int, nargs="+", default=list(SUITE_SIZES),
+                       help="roster sizes to run (default: %(default)s)")
+    suite.add_argument("--repeat", type=int, default=3, help="tries per scenario; the quickest counts (default: 3)")
+    suite.add_argument("--seed", type=int, default=42, help="seed for the made-up rosters (default: 42)")
+    suite.add_argument("--output", default="benchmark_results.json", help="where to write the results")
+    suite.add_argument("--baseline", default=BASELINE_FILE, help="the stored results to compare with")
+    suite.add_argument("--tolerance", type=float, default=0.25,
+                       help="how much slower (as a share) still counts as the same (default: 0.25)")
+    suite.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+
+    generate = commands.add_parser("generate", help="write a made-up roster file")
+    generate.add_argument("count", type=int, help="how many lines to write")
+    generate.add_argument("path", help="the file to write")
+    generate.add_argument("--seed", type=int, default=42)
+    generate.add_argument("--duplicates", type=float, default=0.01, help="share of duplicate names (default: 0.01)")
+    generate.add_argument("--malformed", type=float, default=0.01, help="share of broken lines (default: 0.01)")
+    return parser
+
+
+if __name__ == "__main__":
+    # Only run the benchmarks when this file is started directly.
+    args = make_parser().parse_args()
+    if args.command == "suite":
+        sys.exit(suite_main(args))
+    if args.command == "generate":
+        write_roster(args.path, args.count, args.seed, args.duplicates, args.malformed)
+        sys.exit(0)
+    bench_load()
+    bench_columnar()
+    bench_students()
+    bench_search()
+    bench_sorting()
+    bench_loader()
+    bench_cold_start()
+    bench_sqlite()
+    bench_statistics()
@@ -0,0 +1,353 @@
+# This file is the command-line version of the Student Manager: it works on student files without opening a window,
+# so it can be used on servers and in scheduled (e.g., nightly) jobs.
+#
+# Every command 'streams': it goes through the students a batch at a time instead of loading them all,
+# so even huge files need only a small, fixed amount of memory. Big text files are read by several
+# helper processes at once (see 'StudentFile.read_batches'). Sorting and removing duplicates use an
+# 'external merge sort': sorted pieces are written to temporary files and then merged.
+#
+# Examples:
+#   python cli.py import students.txt new_students.txt other_class.txt   (merge files, skipping duplicate names)
+#   python cli.py recompute-status students.txt                            (work out every status again)
+#   python cli.py apply-grades students.txt regrades.txt                   (change many students' grades at once)
+#   python cli.py export students.txt passed.txt --status passed --sort name
+#
+# Files can be text files or binary snapshots (see 'BinarySnapshot.py'); any journal next to a file is included.
+# Don't run a command on a file while the app has it open.
+
+import argparse  # Reads the command and options typed after 'python cli.py'.
+import heapq  # 'heapq.merge' merges already-sorted sequences into one sorted sequence.
+import itertools  # Tools for going through sequences ('islice', 'groupby').
+import os  # Used to build temporary file names.
+import pickle  # Writes Python values to the temporary sort files and reads them back.
+import sys  # Used for the exit code and for writing to the screen.
+import tempfile  # Makes a throwaway folder for the temporary sort files.
+
+from Student import *  # The Student blueprint.
+from Classroom import Classroom  # For 'Classroom.make_key'.
+from StudentFile import StudentFile  # Reads and writes student files.
+from StudentBatch import BatchError, StudentBatch  # All-or-nothing changes; BatchError means nothing was written.
+
+RUN_SIZE = 100_000  # How many students are sorted in memory at once before being written to a temporary file.
+
+
+def report(problems):
+    # Shows the lines that could not be read (on 'stderr', so they don't mix with exported students).
+    for where, line, error in problems:
+        print(f"Skipped {where}: {line} - {error}", file=sys.stderr)
+
+
+def check_exists(*paths):
+    # Stops the command if a file to read doesn't exist: a mistyped name must not be read as an empty roster
+    # (and then be written as one). A file whose changes are all still in its journal counts as existing.
+    for path in paths:
+        if not os.path.exists(path) and not os.path.exists(StudentFile(path).journal_path):
+            raise FileNotFoundError(f"No such student file: {path}")
+
+
+class Reporter:
+    # Looks like a list of problems to 'read_students', but shows each problem straight away instead of keeping it.
+    def append(self, problem):
+        report([problem])
+
+    def extend(self, problems):
+        report(problems)
+
+
+def read_students(path, workers=None, problems=None):
+    # This function goes through every student in 'path' (text or binary), one by one,
+    # with the changes from the file's journal already applied, in the order the app would show them.
+    # Only the journal (which is always small) is kept in memory. A file can hold the same name twice
+    # (e.g., after editing it by hand); both are given back here, see 'read_roster' for what the app keeps.
+    # Lines that can't be read are skipped and reported, or added to the list 'problems' if one is given.
+    if problems is None:
+        problems = Reporter()
+    store = StudentFile(path)
+    latest = {}  # key -> the student as the journal last saved them, or None if the journal deleted them.
+    deleted = set()  # Keys the journal deleted at some point (if added again, they go to the end).
+    appended = {}  # key -> when the journal (last) added them; used to put added students in order at the end.
+    for number, (where, line) in enumerate(store.read_journal()):
+        operation, _, rest = line.partition(",")
+        try:
+            if operation == "+":
+                student = Student.from_line(rest)
+                key = Classroom.make_key(student.first_name, student.last_name)
+                latest[key] = student
+                appended.setdefault(key, number)
+            elif operation == "-":
+                parts = rest.strip().split(",")
+                if len(parts) != 2:
+                    raise ValueError(f"Invalid delete record in journal: {line}")
+                key = Classroom.make_key(*parts)
+                latest[key] = None
+                deleted.add(key)
+                appended.pop(key, None)
+            else:
+                raise ValueError(f"Unknown journal record: {line}")
+        except ValueError as e:
+            problems.append((where, line.strip(), str(e)))
+
+    seen = set()  # Journal keys that were found in the file.
+    for students, batch_problems in store.read_batches(workers):
+        problems.extend(batch_problems)
+        for student in students:
+            key = (student.first_name.casefold(), student.last_name.casefold())
+            if key in latest:
+                seen.add(key)
+                if latest[key] is None or key in deleted:
+                    continue  # Deleted (and maybe added again at the end, below).
+                # Changed by the journal: it keeps its place, and (like in the app) the name as written in the file.
+                changed = latest[key]
+                student = Student(student.first_name, student.last_name, changed.midterm, changed.final,
+                                  changed.attendance, changed.project)
+            yield student
+    for key in sorted(appended, key=appended.get):
+        if key in deleted or key not in seen:
+            yield latest[key]
+
+
+def external_sort(records, folder, run_size=RUN_SIZE):
+    # This function sorts 'records' (tuples that can be compared) without holding them all in memory.
+    # It sorts them 'run_size' at a time and writes each sorted run to a file in 'folder',
+    # then gives back an iterator that merges the runs. All records are read before this returns.
+    paths = []
+    while True:
+        run = list(itertools.islice(records, run_size))
+        if not run:
+            break
+        run.sort()
+        with tempfile.NamedTemporaryFile(dir=folder, delete=False) as f:
+            for record in run:
+                # Each record is written on its own (not with one shared 'Pickler'), because a shared
+                # Pickler/Unpickler remembers every value it has seen, which would keep the whole run in memory.
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+        paths.append(f.name)
+    return heapq.merge(*(read_run(path) for path in paths))
+
+
+def read_run(path):
+    # Reads back one sorted run written by 'external_sort'.
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def values(student):
+    # A Student as a plain tuple (cheap to write to a temporary file); 'Student(*values)' makes it again.
+    return student.first_name, student.last_name, student.midterm, student.final, student.attendance, student.project
+
+
+def sort_key(student, order, position):
+    # What to sort by for each '--sort' choice. 'position' (the roster order) breaks ties.
+    if order == "name":
+        return student.last_name.casefold(), student.first_name.casefold()
+    if order == "average":
+        return -student.average(), position
+    return position
+
+
+def in_order(students, order, folder):
+    # Gives back 'students' sorted in 'order' ("roster" keeps them as they are).
+    if order == "roster":
+        return students
+    records = ((sort_key(student, order, position), position, values(student))
+               for position, student in enumerate(students))
+    return (Student(*record[2]) for record in external_sort(records, folder))
+
+
+def without_duplicates(students, keep, folder):
+    # Gives back 'students' in the same order, but with each name (ignoring upper/lowercase) only once.
+    # keep="first" keeps the first student with a name (like the app does when loading);
+    # keep="last" keeps the first one's place but the grades of the last one (like later files updating earlier ones).
+    records = (((student.first_name.casefold(), student.last_name.casefold()), position, values(student))
+               for position, student in enumerate(students))
+
+    def unique():
+        for _, group in itertools.groupby(external_sort(records, folder), key=lambda record: record[0]):
+            group = list(group) if keep == "last" else [next(group)]
+            # The name is written the way it was first seen; only the grades come from the chosen student.
+            yield group[0][1], group[0][2][:2] + group[-1][2][2:]  # (first position, chosen values)
+
+    # Sort again by position to get the original order back.
+    return (Student(*record[1]) for record in external_sort(unique(), folder))
+
+
+def read_roster(path, workers, folder):
+    # Same as 'read_students', but with the duplicate names removed like the app does when loading:
+    # the first student with a name is kept (with the journal's changes) and later ones are skipped.
+    return without_duplicates(read_students(path, workers), "first", folder)
+
+
+def write_students(students, destination):
+    # Writes 'students' to 'destination' (a text file, a binary snapshot if it ends in '.bin',
+    # or the screen for "-"). Files are replaced in one step, so a failed command leaves them untouched.
+    # Gives back how many students were written.
+    count = 0
+
+    def counted():
+        nonlocal count
+        for student in students:
+            count += 1
+            yield student
+
+    if destination == "-":
+        sys.stdout.writelines(student.to_line() for student in counted())
+    else:
+        StudentFile(destination).compact(counted())
+    return count
+
+
+def command_import(args):
+    # Merges every source file (in order) into the destination, skipping duplicate names.
+    check_exists(*args.sources)
+    sources = ([args.destination] if os.path.exists(args.destination) else []) + args.sources
+    students = itertools.chain.from_iterable(read_students(path, args.workers) for path in sources)
+    with tempfile.TemporaryDirectory() as folder:
+        count = write_students(in_order(without_duplicates(students, args.keep, folder), args.sort, folder),
+                               args.destination)
+    print(f"Wrote {count} students to {args.destination}", file=sys.stderr)
+
+
+def command_recompute_status(args):
+    # Every Student works out its status from its grades, so reading and writing them again
+    # recomputes every status (including any that were edited by hand in the file).
+    check_exists(args.roster)
+    destination = args.output or args.roster
+    with tempfile.TemporaryDirectory() as folder:
+        count = write_students(read_roster(args.roster, args.workers, folder), destination)
+    print(f"Recomputed the status of {count} students in {destination}", file=sys.stderr)
+
+
+def read_updates(path, workers, folder):
+    # Reads a grade-update file (same format as 'students.txt'; the status is ignored) completely,
+    # and gives back the updates sorted by name key. Any bad line stops the whole batch.
+    # The grades are checked the same way as in the app's "Apply Grades from File" (see 'StudentBatch.check').
+    problems = []
+
+    def checked(students):
+        for student in students:
+            for name in StudentBatch.GRADES:
+                problem = StudentBatch.grade_problem(name, getattr(student, name))
+                if problem is not None:
+                    problems.append((path, student.to_line().strip(), problem))
+            yield student
+
+    updates = external_sort(((Classroom.make_key(student.first_name, student.last_name), position, values(student))
+                             for position, student in enumerate(checked(read_students(path, workers, problems)))),
+                            folder)
+    if problems:
+        report(problems)
+        raise BatchError(f"{len(problems)} invalid line(s) in {path}; no grades were changed")
+    return updates
+
+
+def command_apply_grades(args):
+    # Applies every grade change in the update file as ONE batch: if any line is bad or names a student
+    # who isn't in the roster, nothing is written at all.
+    check_exists(args.roster, args.updates)
+    destination = args.output or args.roster
+    with tempfile.TemporaryDirectory() as folder:
+        updates = read_updates(args.updates, args.workers, folder)
+        roster = ((Classroom.make_key(student.first_name, student.last_name), position, values(student))
+                  for position, student in enumerate(read_roster(args.roster, args.workers, folder)))
+        unknown = []
+        changed = 0
+
+        def joined():
+            # Both lists are sorted by key, so they can be walked side by side ('merge join').
+            nonlocal changed
+            update = next(updates, None)
+            for key, position, student_values in external_sort(roster, folder):
+                while update is not None and update[0] < key:
+                    unknown.append(update)
+                    update = next(updates, None)
+                if update is not None and update[0] == key:
+                    changed += 1
+                while update is not None and update[0] == key:
+                    # The last update for a student wins. The name is kept as written in the roster.
+                    student_values = student_values[:2] + update[2][2:]
+                    update = next(updates, None)
+                yield position, student_values
+            while update is not None:
+                unknown.append(update)
+                update = next(updates, None)
+
+        in_roster_order = external_sort(joined(), folder)  # Reads everything, so 'unknown' is complete now.
+        if unknown:
+            for _, _, student_values in unknown[:20]:
+                print(f"Not in the roster: {student_values[0]} {student_values[1]}", file=sys.stderr)
+            raise BatchError(f"{len(unknown)} student(s) in {args.updates} are not in {args.roster}; "
+                             "no grades were changed")
+        count = write_students((Student(*record[1]) for record in in_roster_order), destination)
+    print(f"Updated the grades of {changed} student(s); wrote {count} students to {destination}", file=sys.stderr)
+
+
+def command_export(args):
+    # Writes the students that match the filters, in the chosen order.
+    check_exists(args.roster)
+    with tempfile.TemporaryDirectory() as folder:
+        students = read_roster(args.roster, args.workers, folder)
+        if args.status:
+            students = (student for student in students if student.status.lower() == args.status)
+        if args.search:
+            query = args.search.casefold()
+            students = (student for student in students
+                        if query in student.first_name.casefold() or query in student.last_name.casefold())
+        students = in_order(students, args.sort, folder)
+        if args.limit is not None:
+            students = itertools.islice(students, args.limit)
+        count = write_students(students, args.destination)
+    print(f"Exported {count} students", file=sys.stderr)
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="Student Manager without a window: bulk changes to student files.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="helper processes for reading big text files (default: one per CPU core)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("import", help="merge student files into one, skipping duplicate names")
+    command.add_argument("destination", help="the file to write (students already in it are kept)")
+    command.add_argument("sources", nargs="+", help="the files to add, in order")
+    command.add_argument("--keep", choices=("first", "last"), default="first",
+                         help="for duplicate names, keep the first student (default) or the last one's grades")
+    command.add_argument("--sort", choices=("roster", "name", "average"), default="roster")
+    command.set_defaults(run=command_import)
+
+    command = commands.add_parser("recompute-status", help="work out every student's status from their grades")
+    command.add_argument("roster")
+    command.add_argument("-o", "--output", help="write here instead of replacing the roster")
+    command.set_defaults(run=command_recompute_status)
+
+    command = commands.add_parser("apply-grades", help="change many students' grades at once, all or nothing")
+    command.add_argument("roster")
+    command.add_argument("updates", help="a file in the same format as students.txt with the new grades")
+    command.add_argument("-o", "--output", help="write here instead of replacing the roster")
+    command.set_defaults(run=command_apply_grades)
+
+    command = commands.add_parser("export", help="write a filtered and/or sorted copy of a roster")
+    command.add_argument("roster")
+    command.add_argument("destination", help='the file to write ("-" for the screen)')
+    command.add_argument("--status", choices=("passed", "failed"), type=str.lower)
+    command.add_argument("--search", help="only students whose first or last name contains this text")
+    command.add_argument("--sort", choices=("roster", "name", "average"), default="roster")
+    command.add_argument("--limit", type=int, help="write at most this many students")
+    command.set_defaults(run=command_export)
+    return parser
+
+
+def main(arguments):
+    args = make_parser().parse_args(arguments)
+    try:
+        args.run(args)
+    except (BatchError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
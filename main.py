@@ -1,32 +1,220 @@
 # Import necessary tools (libraries) for creating the graphical window.
+import argparse  # Reads options typed after 'python main.py' on the command line.
+import bisect  # Binary search helpers, used to work out which table rows need to move.
+import math  # 'isfinite' checks that a grade is a real number (not 'nan' or 'inf').
+import queue  # Used to notice when the background thread has no more results for us.
+import time  # Used to time a whole load when profiling is on (see 'Profiler.py').
 import tkinter as tk  # 'tkinter' is the main library for creating windows. 'tk' is a shorter nickname.
 from tkinter import ttk, messagebox, \
-    simpledialog  # Other useful parts of tkinter for tables, pop-up messages, and input boxes.
+    simpledialog, filedialog  # Other useful parts of tkinter for tables, pop-up messages, input boxes and file pickers.
 from Student import *  # Import everything from our 'Student.py' file (the Student blueprint).
 from Classroom import *  # Import everything from our 'Classroom.py' file (the Classroom organizer).
+from StudentFile import *  # Import the StudentFile helper that saves changes to disk (snapshot + journal).
+from StudentBatch import *  # Many changes applied together, all or nothing (bulk edit, grades from a file).
+from BackgroundIO import *  # Loads and saves on a background thread, so the window never freezes.
+from SqliteClassroom import SqliteClassroom, StudentQuery  # The optional SQLite database backend.
+from Profiler import *  # Optional timing of the app's important functions (only used when asked for).
+from Dataset import Dataset  # A folder of class sections ('shards'), each with its own student file.
 
 
 class StudentManagerApp:
     # This defines the blueprint for our main application window.
 
-    def __init__(self, root):
+    # When more students than this are shown, the table switches to 'virtual' mode:
+    # instead of one table row per student, it only keeps the rows that fit on screen (plus a few extra)
+    # and fills them with whichever students are scrolled into view.
+    VIRTUAL_THRESHOLD = 2000
+    VIRTUAL_BUFFER = 2  # Extra rows kept below the visible ones, so a half-visible last row is still filled.
+    MAX_PROBLEMS_SHOWN = 20  # The load warning lists at most this many bad lines.
+    SEARCH_DELAY_MS = 150  # Wait this long after the last key press before searching (see 'on_search_change').
+    IO_POLL_MS = 50  # While the background thread is working, check for its results this often (see 'poll_io').
+    DIAGNOSTICS_REFRESH_MS = 1000  # How often the diagnostics window shows the latest numbers.
+    MAX_RESULTS_SHOWN = 1000  # The "Search All Sections" window lists at most this many students.
+    FIRST_SECTION = "section-1"  # The section made when a dataset folder is still empty.
+
+    def __init__(self, root, classroom=None, data_file="students.txt", profiler=None, dataset=None):
         # This is the constructor for the application window itself.
         # 'root' is the main window that Tkinter creates.
+        # 'classroom' is optional: you can pass in a different kind of classroom (e.g., a ColumnarClassroom).
+        # 'data_file' is the file to load and save; it can be a text file, a binary snapshot,
+        # or a SQLite database (a name ending in '.db'), which saves every change by itself.
+        # 'profiler' is a Profiler (see 'Profiler.py') when profiling is on; it adds a "Diagnostics" button.
+        # 'dataset' is a Dataset (see 'Dataset.py') for working with many class sections; 'data_file' is then
+        # ignored and a section picker is shown at the top instead.
 
         self.root = root  # Store the main window so we can control it.
         self.root.title("Student Manager")  # Set the text that appears at the top of the window.
         self.root.geometry("900x600")  # Set the initial size of the window (width x height in pixels).
 
-        self.classroom = Classroom()  # Create a new 'Classroom' object to manage our students.
-        self.data_file = "students.txt"  # Define the name of the file where we'll save and load student data.
+        self.dataset = dataset
+        self.shard = None  # The name of the section that is shown (when there is a dataset).
+        if self.dataset is not None:
+            if not self.dataset.shard_names():
+                self.dataset.create_shard(self.FIRST_SECTION)
+            self.shard = self.dataset.shard_names()[0]  # Start with the first section.
+            data_file = self.dataset.shard_path(self.shard)
+
+        # Create a new 'Classroom' object to manage our students (unless one was given to us).
+        if classroom is None:
+            classroom = SqliteClassroom(data_file) if data_file.endswith(".db") else Classroom()
+        self.classroom = classroom
+        if self.dataset is not None:
+            self.dataset.keep(self.shard, self.classroom)  # The dataset remembers it as a loaded section.
+        self.data_file = data_file  # The name of the file where we'll save and load student data.
+        # A database classroom saves every change itself, so it needs no StudentFile or background thread.
+        self.database = isinstance(self.classroom, SqliteClassroom)
+        self.store = None
+        self.io = None
+        if not self.database:
+            self.store = StudentFile(self.data_file)  # This helper writes each change to a small journal next to the file.
+            self.io = BackgroundIO(self.store)  # Does the actual reading and writing, on a background thread.
+        self.polling = False  # True while we regularly check for results from the background thread.
+        self.loading = False  # True until every student has been loaded.
+        self.compacting = False  # True while the background thread writes a fresh 'students.txt'.
+        self.load_problems = []  # Lines that could not be loaded, shown together when loading is done.
+        self.preview = None  # For binary snapshots: the file's students, shown while loading (see 'load_students').
 
         self.current_students = []  # This list will hold the students currently shown in the table.
         # (It might be all students, or just search results, or sorted results).
-        self.load_students()  # Call a function to load any existing student data from the file.
+        self.row_students = {}  # Table row ID -> the Student shown in that row.
+        self.row_values = {}  # Table row ID -> the values currently shown in that row (to skip rows that didn't change).
+        self.selected_student = None  # The student the user last clicked on in the table.
+        self.virtual = False  # True while the table is in 'virtual' mode (see VIRTUAL_THRESHOLD).
+        self.offset = 0  # In virtual mode: the position in 'current_students' of the top row on screen.
+        self.page_size = 20  # In virtual mode: how many rows fit on screen (updated when the window is resized).
+        self.pending_search = None  # The ID of a search that is waiting to run (see 'on_search_change').
+        self.sort_mode = None  # How the table is sorted: None (roster order), "name" or "average".
+        self.profiler = profiler
+        self.load_started = None  # When the current load started (only used when profiling).
+        self.dataset_buttons = []  # The section buttons (only made when a dataset is used, see 'create_dataset_widgets').
 
+        if self.dataset is not None:
+            self.create_dataset_widgets()  # The section picker, above everything else.
         self.create_search_widgets()  # Call a function to set up the search bar area at the top.
         self.create_widgets()  # Call a function to set up all the buttons and the main student table.
-        self.refresh_student_list()  # Call a function to fill the table with all students when the app starts.
+        self.create_summary_widgets()  # Call a function to set up the class summary panel at the bottom.
+
+        # Make sure every change is written before the window closes (see 'on_close').
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        if self.database:
+            self.refresh_student_list()  # The database is ready straight away: just show the students.
+        else:
+            self.load_students()  # Start loading any existing student data from the file.
+
+    def create_dataset_widgets(self):
+        # This function sets up the section picker and the buttons that work on every section at once.
+        dataset_frame = tk.Frame(self.root)
+        dataset_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+
+        tk.Label(dataset_frame, text="Section:").pack(side=tk.LEFT, padx=(0, 5))
+        self.shard_var = tk.StringVar(value=self.shard)
+        # A 'Combobox' is a drop-down list. 'readonly' means sections can only be picked, not typed.
+        self.shard_picker = ttk.Combobox(dataset_frame, textvariable=self.shard_var, state="readonly",
+                                         values=self.dataset.shard_names())
+        self.shard_picker.pack(side=tk.LEFT)
+        self.shard_picker.bind("<<ComboboxSelected>>", lambda event: self.switch_shard(self.shard_var.get()))
+
+        btn_new = tk.Button(dataset_frame, text="New Section", command=self.new_shard)
+        btn_new.pack(side=tk.LEFT, padx=2)
+        btn_search_all = tk.Button(dataset_frame, text="Search All Sections", command=self.search_all_shards)
+        btn_search_all.pack(side=tk.LEFT, padx=2)
+        btn_summary = tk.Button(dataset_frame, text="All Sections Summary", command=self.show_dataset_summary)
+        btn_summary.pack(side=tk.LEFT, padx=2)
+        # These buttons read (or switch) the shown section, so they are turned off while it is loading
+        # (see 'set_editing_enabled'); otherwise they would answer from a half-loaded section.
+        self.dataset_buttons = [btn_new, btn_search_all, btn_summary]
+
+    def switch_shard(self, name):
+        # This function shows another section. A section that is still loaded (see 'Dataset.resident')
+        # is shown straight away; otherwise it is loaded in the background like at start-up.
+        if name == self.shard:
+            return
+        if self.loading:
+            messagebox.showwarning("Warning", "Please wait until this section has finished loading.")
+            self.shard_var.set(self.shard)
+            return
+        # Write every change of the current section before leaving it.
+        self.io.close()
+        while not self.io.results.empty():
+            kind, value = self.io.results.get_nowait()
+            if kind == "error":
+                messagebox.showerror("Error", f"Failed to save students: {value[1]}")
+        self.compacting = False
+
+        self.shard = name
+        self.shard_var.set(name)
+        self.data_file = self.dataset.shard_path(name)
+        self.store = StudentFile(self.data_file)
+        self.io = BackgroundIO(self.store)
+        self.selected_student = None
+        self.offset = 0
+        classroom = self.dataset.resident(name)
+        if classroom is not None:
+            self.classroom = classroom
+            self.store.read_journal()  # Only to count the journal's lines, so it is compacted at the right time.
+            if self.search_var.get():
+                self.clear_search()  # Clearing the search shows all students again.
+            else:
+                self.refresh_student_list()
+        else:
+            self.classroom = Classroom()
+            self.dataset.keep(name, self.classroom)
+            self.clear_search()
+            self.load_students()
+
+    def new_shard(self):
+        # This function is called when the "New Section" button is clicked: it makes an empty section and shows it.
+        name = simpledialog.askstring("New Section", "Section name:")
+        if not name:
+            return
+        try:
+            self.dataset.create_shard(name.strip())
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.shard_picker.config(values=self.dataset.shard_names())
+        self.switch_shard(name.strip())
+
+    def search_all_shards(self):
+        # This function is called when the "Search All Sections" button is clicked.
+        # Every section is searched at the same time (see 'Dataset.search'); the results open in a new window.
+        if self.loading:
+            messagebox.showwarning("Warning", "Please wait until this section has finished loading.")
+            return
+        query = simpledialog.askstring("Search All Sections", "Name contains:")
+        if not query or not query.strip():
+            return
+        results = self.dataset.search(query.strip())
+
+        window = tk.Toplevel(self.root)
+        window.title(f"'{query.strip()}' in all sections")
+        window.geometry("700x400")
+        shown = results[:self.MAX_RESULTS_SHOWN]
+        text = f"Found {len(results)} student(s)"
+        if len(results) > len(shown):
+            text += f" (showing the first {len(shown)})"
+        tk.Label(window, text=text, anchor=tk.W).pack(fill=tk.X, padx=5, pady=(5, 0))
+        columns = ("section", "first_name", "last_name", "average", "status")
+        table = ttk.Treeview(window, columns=columns, show="headings")
+        for col in columns:
+            table.heading(col, text=col.replace("_", " ").title())
+            table.column(col, anchor=tk.CENTER, width=120)
+        for name, student in shown:
+            table.insert("", "end", values=(name, student.first_name, student.last_name,
+                                            f"{student.average():.2f}", student.status))
+        table.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def show_dataset_summary(self):
+        # This function is called when the "All Sections Summary" button is clicked. It shows the class numbers
+        # of every section together, and one line per section (worked out at the same time, see 'Dataset.statistics').
+        if self.loading:
+            messagebox.showwarning("Warning", "Please wait until this section has finished loading.")
+            return
+        total, per_shard = self.dataset.statistics()
+        lines = [f"{name}: {len(statistics)} students, {statistics.pass_rate():.1%} passed, "
+                 f"average {statistics.grades['average'].mean:.2f}" for name, statistics in per_shard.items()]
+        messagebox.showinfo("All Sections Summary", total.summary() + "\n\n" + "\n".join(lines))
 
     def create_search_widgets(self):
         # This function sets up the search bar part of the window.
@@ -52,13 +240,27 @@ class StudentManagerApp:
     def on_search_change(self, *_):
         # This function runs automatically every time the user types something in the search box.
         # '*_' is a placeholder for extra information Tkinter sends, which we don't need right now.
+        # Instead of searching on every key press, we wait a moment: if another key is pressed before then,
+        # the waiting search is cancelled and a new wait starts. Typing fast therefore causes just one search.
 
+        if self.pending_search is not None:
+            self.root.after_cancel(self.pending_search)  # Cancel the search that was still waiting.
+            self.pending_search = None
+        if self.search_var.get().strip() == "":
+            self.run_search()  # An empty box shows all students again right away.
+        else:
+            self.pending_search = self.root.after(self.SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        # This function does the actual search, using whatever is in the search box now.
+        self.pending_search = None
         search_text = self.search_var.get().strip()  # Get the text from the search box and remove extra spaces.
         if search_text == "":
             self.show_all_students()  # If the search box is empty, show all students again.
         else:
-            filtered = self.classroom.search_student_partial(
-                search_text)  # Use the Classroom to find students matching the search.
+            filtered = self.in_sort_order(self.classroom.search_student_partial(
+                search_text))  # Use the Classroom to find students matching the search.
+            self.offset = 0  # Show the results from the top.
             self.refresh_student_list(filtered)  # Update the table to show only the found students.
 
     def create_widgets(self):
@@ -78,6 +280,13 @@ class StudentManagerApp:
         btn_delete = tk.Button(button_frame, text="Delete Student", command=self.delete_student)
         btn_delete.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
 
+        # Change the grades of every selected student at once (select several with Ctrl- or Shift-click).
+        btn_bulk_edit = tk.Button(button_frame, text="Bulk Edit", command=self.bulk_edit_students)
+        btn_bulk_edit.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
+
+        btn_grades_file = tk.Button(button_frame, text="Apply Grades from File", command=self.apply_grades_from_file)
+        btn_grades_file.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
+
         btn_show_all = tk.Button(button_frame, text="Show All", command=self.show_all_students)
         btn_show_all.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
 
@@ -90,6 +299,14 @@ class StudentManagerApp:
         btn_sort_average.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
         # --- END NEW BUTTONS ---
 
+        if self.profiler is not None:
+            # Only there when profiling is on: shows how long the app's important functions take.
+            btn_diagnostics = tk.Button(button_frame, text="Diagnostics", command=self.show_diagnostics)
+            btn_diagnostics.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
+
+        # The buttons that change students. They are turned off while the students are still loading.
+        self.edit_buttons = [btn_add, btn_update, btn_delete, btn_bulk_edit, btn_grades_file]
+
         # Frame to hold the student table (Treeview) with scrollbars.
         table_frame = tk.Frame(self.root)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)  # This frame will fill all remaining space.
@@ -107,17 +324,134 @@ class StudentManagerApp:
                              stretch=True)  # Center text, set min width, and let it stretch.
 
         # Create a vertical scrollbar for the table.
-        vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)  # Place it on the RIGHT and make it fill vertically.
+        # Its 'command' is our own function, so it can also scroll the table in virtual mode.
+        self.vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self.on_scrollbar)
+        self.vsb.pack(side=tk.RIGHT, fill=tk.Y)  # Place it on the RIGHT and make it fill vertically.
 
         # Create a horizontal scrollbar for the table.
         hsb = ttk.Scrollbar(table_frame, orient="horizontal", command=self.tree.xview)
         hsb.pack(side=tk.BOTTOM, fill=tk.X)  # Place it at the BOTTOM and make it fill horizontally.
 
         # Connect the scrollbars to the table so they work together.
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.tree.configure(yscrollcommand=self.on_tree_scrolled, xscrollcommand=hsb.set)
         self.tree.pack(fill=tk.BOTH, expand=True)  # Place the table itself, filling all remaining space.
 
+        # Remember which student is clicked, and keep virtual mode working when scrolling or resizing.
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<Configure>", self.on_tree_resized)
+        for wheel_event in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(wheel_event, self.on_mouse_wheel)
+        self.tree.bind("<Up>", lambda event: self.on_arrow_key(-1))
+        self.tree.bind("<Down>", lambda event: self.on_arrow_key(1))
+        self.tree.bind("<Prior>", lambda event: self.on_arrow_key(-self.page_size))  # Page Up key.
+        self.tree.bind("<Next>", lambda event: self.on_arrow_key(self.page_size))  # Page Down key.
+
+        # Find out how tall one table row is, so we can work out how many rows fit on screen.
+        self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+
+    def create_summary_widgets(self):
+        # This function sets up the summary panel below the table: class averages, pass rate, percentiles
+        # and a histogram of the averages (see 'Statistics.py'). It is updated after every change.
+        summary_frame = tk.LabelFrame(self.root, text="Class Summary")  # A frame with a title and a border.
+        summary_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=5)
+        self.summary_label = tk.Label(summary_frame, justify=tk.LEFT, anchor=tk.W)  # Left-aligned lines of text.
+        self.summary_label.pack(fill=tk.X, padx=5)
+
+    def refresh_summary(self):
+        # This function shows the latest class numbers in the summary panel.
+        # The classroom keeps them up to date itself, so this is quick however many students there are.
+        self.summary_label.config(text=self.classroom.statistics().summary())
+
+    def on_select(self, _event):
+        # Runs when the user clicks a row. We remember the Student (not the row),
+        # because in virtual mode the same row is reused for other students while scrolling.
+        selected = self.tree.selection()
+        if selected and selected[0] in self.row_students:
+            self.selected_student = self.row_students[selected[0]]
+
+    def get_selected_student(self):
+        # Gives back the student the user selected, or None if nothing (still shown) is selected.
+        if self.virtual:
+            # The selected student may be scrolled off screen, so check the list instead of the table.
+            if self.selected_student is not None and self.selected_student in self.current_students:
+                return self.selected_student
+            return None
+        selected = self.tree.selection()
+        return self.row_students.get(selected[0]) if selected else None
+
+    def get_selected_students(self):
+        # Gives back every selected student that is shown in the table (the table lets the user select
+        # several rows with Ctrl- or Shift-click), or the one selected student if they are scrolled off screen.
+        students = [self.row_students[iid] for iid in self.tree.selection() if iid in self.row_students]
+        if not students:
+            student = self.get_selected_student()
+            if student is not None:
+                students = [student]
+        return students
+
+    def on_tree_scrolled(self, first, last):
+        # The table tells us how far it is scrolled, so we can move the scrollbar to match.
+        # In virtual mode the table only holds one screen of rows, so we set the scrollbar ourselves.
+        if not self.virtual:
+            self.vsb.set(first, last)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        # Runs when the user drags or clicks the scrollbar.
+        if not self.virtual:
+            if unit:
+                self.tree.yview(action, amount, unit)
+            else:
+                self.tree.yview(action, amount)
+        elif action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.current_students)))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(amount) * self.page_size)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def on_mouse_wheel(self, event):
+        # Runs when the mouse wheel turns over the table.
+        if not self.virtual:
+            return None  # Let the table scroll itself as usual.
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.offset - 3)  # Wheel up (Linux sends 'Button-4', Windows/macOS a positive 'delta').
+        else:
+            self.scroll_to(self.offset + 3)
+        return "break"  # Stop the table from also trying to scroll by itself.
+
+    def on_arrow_key(self, step):
+        # Runs when the Up/Down/Page Up/Page Down keys are pressed in the table.
+        # In virtual mode, moving past the first or last visible row scrolls to the next students.
+        if not self.virtual:
+            return None
+        focus = self.tree.focus()
+        rows = self.tree.get_children()
+        position = rows.index(focus) if focus in rows else 0
+        target = self.offset + position + step
+        target = max(0, min(target, len(self.current_students) - 1))
+        if target < self.offset:
+            self.scroll_to(target)
+        elif target >= self.offset + self.page_size:
+            self.scroll_to(target - self.page_size + 1)
+        rows = self.tree.get_children()
+        if 0 <= target - self.offset < len(rows):
+            self.tree.focus(rows[target - self.offset])
+            self.tree.selection_set(rows[target - self.offset])
+        return "break"
+
+    def on_tree_resized(self, event):
+        # Runs when the table changes size. In virtual mode, more (or fewer) rows may now fit on screen.
+        page_size = max(1, event.height // self.row_height)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            if self.virtual:
+                self.refresh_student_list(self.current_students)
+
+    def scroll_to(self, offset):
+        # Virtual mode: show the students starting at position 'offset'.
+        self.offset = offset
+        self.render_virtual_rows()
+
     def add_student(self):
         # This function is called when the "Add Student" button is clicked.
 
@@ -126,12 +460,21 @@ class StudentManagerApp:
         if not first: return  # If the user cancels or types nothing, stop here.
         last = simpledialog.askstring("Add Student", "Last Name:")
         if not last: return  # Stop if canceled/empty.
+        for name in (first, last):
+            # Names can't contain commas (see the students.txt format), or the student couldn't be loaded again.
+            problem = StudentBatch.name_problem(name)
+            if problem is not None:
+                messagebox.showerror("Error", f"{problem}: names can't be blank or contain commas.")
+                return
         try:
             # Ask for grades and attendance, converting them to numbers.
             midterm = float(simpledialog.askstring("Add Student", "Midterm Grade:"))
             final = float(simpledialog.askstring("Add Student", "Final Grade:"))
             project = float(simpledialog.askstring("Add Student", "Project Grade:"))
             attendance = float(simpledialog.askstring("Add Student", "Attendance %:"))
+            # 'float()' also accepts "nan" and "inf", which are no real grades (same check as 'StudentBatch').
+            if not all(math.isfinite(grade) for grade in (midterm, final, project, attendance)):
+                raise ValueError("grades must be real numbers")
         except (TypeError, ValueError):
             # If the user types something that's not a valid number, show an error message.
             messagebox.showerror("Error", "Please enter valid numeric values.")
@@ -140,24 +483,23 @@ class StudentManagerApp:
         # Create a new Student object using the collected information.
         # For new students, the status is automatically calculated by the Student class.
         student = Student(first, last, midterm, final, attendance, project)
-        self.classroom.add_student(student)  # Add this new student to our Classroom's list.
+        if not self.classroom.add_student(student):  # Add this new student to our Classroom's list.
+            messagebox.showerror("Error", f"{first} {last} is already in the list.")
+            return  # Stop here; a student with this name already exists.
 
-        self.save_students()  # Save all students (including the new one) to the file.
+        self.save_change(student)  # Save just the new student to the journal.
         self.refresh_student_list()  # Update the table to show the new student.
-        self.search_var.set("")  # Clear the search box.
+        self.clear_search()  # Clear the search box.
 
     def update_student(self):
         # This function is called when the "Update Student" button is clicked.
 
-        selected = self.tree.selection()  # Get which row (student) is currently selected in the table.
-        if not selected:
+        student = self.get_selected_student()  # Get the actual Student object shown in the selected row.
+        if student is None:  # Is a student selected in the table?
             messagebox.showwarning("Warning",
                                    "Please select a student to update.")  # If no student is selected, warn the user.
             return  # Stop here.
 
-        idx = int(selected[0])  # Get the unique ID of the selected row and convert it to a number (our index).
-        student = self.current_students[idx]  # Use that index to get the actual Student object from our list.
-
         try:
             # Pop up dialogs to ask for new grades/attendance, showing the current values as a starting point.
             midterm = float(simpledialog.askstring("Update Student", "Midterm Grade:", initialvalue=student.midterm))
@@ -165,53 +507,171 @@ class StudentManagerApp:
             project = float(simpledialog.askstring("Update Student", "Project Grade:", initialvalue=student.project))
             attendance = float(
                 simpledialog.askstring("Update Student", "Attendance %:", initialvalue=student.attendance))
+            if not all(math.isfinite(grade) for grade in (midterm, final, project, attendance)):
+                raise ValueError("grades must be real numbers")  # Same check as in 'add_student'.
         except (TypeError, ValueError):
             messagebox.showerror("Error", "Please enter valid numeric values.")  # Error if input is not a number.
             return  # Stop here.
 
-        # Update the student object's properties with the new values.
-        student.midterm = midterm
-        student.final = final
-        student.project = project
-        student.attendance = attendance
-        student.status = student.calculate_status()  # **IMPORTANT:** Recalculate the student's status based on their new grades.
+        # Update the student's grades; the Classroom also recalculates their status.
+        self.classroom.update_student(student, midterm, final, project, attendance)
 
-        self.save_students()  # Save all changes to the file.
-        self.refresh_student_list()  # Update the table to show the updated student.
-        self.search_var.set("")  # Clear search.
+        self.save_change(student)  # Save just this student's new grades to the journal.
+        if self.search_var.get():
+            self.clear_search()  # Clear search, which shows all students again (only changed rows are touched).
+        elif self.sort_mode == "average":
+            self.refresh_student_list()  # The new average may move the student to another place in the table.
+        else:
+            self.refresh_student_row(student)  # Only this student's row needs to change.
 
     def delete_student(self):
         # This function is called when the "Delete Student" button is clicked.
 
-        selected = self.tree.selection()  # Get the selected student row.
-        if not selected:
+        students = self.get_selected_students()
+        if not students:  # Is a student selected in the table?
             messagebox.showwarning("Warning", "Please select a student to delete.")  # Warn if none selected.
             return  # Stop here.
 
-        idx = int(selected[0])  # Get the index of the selected student.
-        student = self.current_students[idx]  # Get the actual Student object.
+        if len(students) > 1:
+            # Several rows are selected: ask once, then delete them all as one batch.
+            if messagebox.askyesno("Confirm Delete", f"Delete {len(students)} students?"):
+                batch = StudentBatch()
+                for student in students:
+                    batch.delete(student.first_name, student.last_name)
+                self.apply_batch(batch)
+            return
+
+        student = students[0]  # The actual Student object.
 
         # Ask the user to confirm they want to delete this student.
         confirm = messagebox.askyesno("Confirm Delete", f"Delete {student.first_name} {student.last_name}?")
         if confirm:  # If they confirm:
             self.classroom.delete_student(student.first_name,
                                           student.last_name)  # Tell the Classroom to delete the student.
-            self.save_students()  # Save the updated list (with the student removed) to the file.
+            self.save_change(student, deleted=True)  # Write the deletion to the journal.
             self.refresh_student_list()  # Update the table.
-            self.search_var.set("")  # Clear search.
+            self.clear_search()  # Clear search.
+
+    def bulk_edit_students(self):
+        # This function is called when the "Bulk Edit" button is clicked.
+        # It asks for each grade ONCE and gives it to every selected student. Leaving a box empty keeps
+        # each student's own value for that grade.
+        students = self.get_selected_students()
+        if not students:
+            messagebox.showwarning("Warning", "Please select the students to change.")
+            return
+
+        grades = {}
+        for name, label in (("midterm", "Midterm Grade"), ("final", "Final Grade"), ("project", "Project Grade"),
+                            ("attendance", "Attendance %")):
+            # If every selected student has the same value, show it as the starting point.
+            values = {getattr(student, name) for student in students}
+            answer = simpledialog.askstring("Bulk Edit", f"{label} for {len(students)} student(s)\n"
+                                                         "(leave empty to keep each student's own):",
+                                            initialvalue=values.pop() if len(values) == 1 else "")
+            if answer is None:
+                return  # The user pressed Cancel: change nothing.
+            if answer.strip():
+                try:
+                    grades[name] = float(answer)
+                except ValueError:
+                    messagebox.showerror("Error", "Please enter valid numeric values.")
+                    return
+        if not grades:
+            return  # Every box was left empty, so there is nothing to change.
+
+        batch = StudentBatch()
+        for student in students:
+            batch.update(student.first_name, student.last_name, **grades)
+        self.apply_batch(batch)
+
+    def apply_grades_from_file(self):
+        # This function is called when the "Apply Grades from File" button is clicked.
+        # The file has one student per line, in the same format as 'students.txt' (the status is ignored).
+        # Every student in it must already be in the list; if anything is wrong, no grades are changed.
+        path = filedialog.askopenfilename(title="Apply Grades from File",
+                                          filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+        if not path:
+            return  # The user pressed Cancel.
+        batch = StudentBatch()
+        problems = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue  # Skip empty lines.
+                    try:
+                        first, last, midterm, final, attendance, project = Student.parse_line(line)[:6]
+                    except ValueError as e:
+                        problems.append(f"line {number}: {e}")
+                        continue
+                    batch.update(first, last, midterm, final, project, attendance)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to read {path}: {e}")
+            return
+        if problems:
+            self.show_batch_problems(BatchError(f"{len(problems)} invalid line(s); no grades were changed",
+                                                problems))
+            return
+        if self.apply_batch(batch):
+            messagebox.showinfo("Grades Applied", f"Updated the grades of {len(batch)} student(s).")
+
+    def apply_batch(self, batch):
+        # This function makes every change in 'batch' (all of them or none), then writes them to the journal
+        # together and refreshes the table once. It gives back True if the changes were made.
+        try:
+            changes = self.classroom.apply_batch(batch)
+        except BatchError as e:
+            self.show_batch_problems(e)
+            return False
+        self.save_changes(changes)
+        if self.search_var.get():
+            self.clear_search()  # Clearing the search shows all students again.
+        else:
+            self.refresh_student_list()
+        return True
+
+    def show_batch_problems(self, error):
+        # This function shows one error listing why a batch of changes was refused.
+        shown = error.problems[:self.MAX_PROBLEMS_SHOWN]
+        if len(error.problems) > self.MAX_PROBLEMS_SHOWN:
+            shown.append(f"...and {len(error.problems) - self.MAX_PROBLEMS_SHOWN} more.")
+        messagebox.showerror("Error", f"{error}:\n\n" + "\n".join(shown))
 
     # --- NEW SORTING METHODS ---
     def sort_by_name(self):
         # This function is called when the "Sort by Name" button is clicked.
-        self.classroom.sort_students_by_name()  # Tell the Classroom to sort its internal list of students by name.
-        self.refresh_student_list()  # Update the table to show the newly sorted list.
-        self.search_var.set("")  # Clear the search box so the full, sorted list is visible.
+        self.sort_mode = "name"  # From now on, show students sorted by name.
+        self.offset = 0  # Jump back to the top of the table.
+        self.refresh_student_list()  # Update the table to show the sorted list.
+        self.clear_search()  # Clear the search box so the full, sorted list is visible.
 
     def sort_by_average(self):
         # This function is called when the "Sort by Average" button is clicked.
-        self.classroom.sort_students_by_average()  # Tell the Classroom to sort students by their average grade.
-        self.refresh_student_list()  # Update the table to show the newly sorted list.
-        self.search_var.set("")  # Clear the search box.
+        self.sort_mode = "average"  # From now on, show students sorted by their average grade.
+        self.offset = 0  # Jump back to the top of the table.
+        self.refresh_student_list()  # Update the table to show the sorted list.
+        self.clear_search()  # Clear the search box.
+
+    def all_students_in_order(self):
+        # Gives back every student in the order chosen with the sort buttons.
+        # The Classroom keeps its sorted orders up to date, so this is quick even for huge rosters.
+        if self.sort_mode == "name":
+            return self.classroom.sort_students_by_name()
+        if self.sort_mode == "average":
+            return self.classroom.sort_students_by_average()
+        return self.classroom.students
+
+    def in_sort_order(self, students):
+        # Search results come back in roster order; this puts them in the order chosen with the sort buttons.
+        if isinstance(students, (StudentQuery, SearchResults)):
+            # Let the database (or the Classroom's sorted orders) give them in order, one screen at a time.
+            return students.ordered(self.sort_mode or "roster")
+        if self.sort_mode == "name":
+            return sorted(students, key=lambda s: (s.last_name.casefold(), s.first_name.casefold()))
+        if self.sort_mode == "average":
+            return sorted(students, key=lambda s: s.average(), reverse=True)
+        return students
 
     # --- END NEW METHODS ---
 
@@ -219,84 +679,372 @@ class StudentManagerApp:
     # but it still exists in `Classroom.py` and `StudentManagerApp.py`.
     # You can remove it if you are sure you won't need it.
     def filter_students(self, status):  # This function is still here but not used by a button.
-        filtered = self.classroom.filter_students(status)
+        filtered = self.in_sort_order(self.classroom.filter_students(status))
         self.refresh_student_list(filtered)
-        self.search_var.set("")
+        self.clear_search()
+
+    def clear_search(self):
+        # This function empties the search box. Emptying it shows all students again (see 'on_search_change'),
+        # so we skip it when the box is already empty, to avoid refreshing the table twice.
+        if self.search_var.get():
+            self.search_var.set("")
 
     def show_all_students(self):
         # This function is called when the "Show All" button is clicked (or search is cleared).
 
-        # It refreshes the list to show all students currently in the classroom's main list.
-        # This list might be the original order, or it might be sorted if a sort button was clicked.
-        self.refresh_student_list(self.classroom.students)
-        self.search_var.set("")  # Clear the search box.
+        # It refreshes the list to show all students currently in the classroom.
+        # They are shown in the original order, or sorted if a sort button was clicked.
+        self.refresh_student_list(self.all_students_in_order())
+        self.clear_search()  # Clear the search box.
 
     def refresh_student_list(self, students=None):
-        # This is a very important function. It clears the table and then fills it with student data.
+        # This is a very important function. It makes the table show the given students.
         # 'students=None' means it can either be given a specific list of students (like search results)
         # or it will use all students from the classroom.
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)  # Loop through all existing rows in the table and delete them.
+        # Only rows that really changed are added, removed, moved or rewritten (see 'sync_rows'),
+        # so the row the user is looking at keeps its place and stays selected.
 
         if students is None:
-            students = self.classroom.students  # If no specific list was given, use all students from the classroom.
+            students = self.all_students_in_order()  # If no specific list was given, use all students from the classroom.
 
         self.current_students = students  # Remember which students are currently displayed in the table.
 
-        for idx, student in enumerate(students):
-            avg = f"{student.average():.2f}"  # Calculate the average and format it to two decimal places.
-            self.tree.insert("", "end", iid=str(idx), values=(
-                student.first_name,  # Insert each piece of student data into a new row in the table.
-                student.last_name,
-                student.midterm,
-                student.final,
-                student.project,
-                student.attendance,
-                avg,  # The formatted average.
-                student.status  # The student's status (Passed/Failed).
-            ))
+        if len(students) > self.VIRTUAL_THRESHOLD:
+            # Too many students for one table row each: only show the rows that are on screen.
+            self.virtual = True
+            self.render_virtual_rows()
+        else:
+            self.virtual = False
+            self.sync_rows(students)
+        self.refresh_summary()  # Students may have been added, changed or deleted.
 
-    def save_students(self):
-        # This function saves all student data from the classroom's list to the 'students.txt' file.
+    def render_virtual_rows(self):
+        # Virtual mode: show the students starting at 'self.offset', one screen's worth (plus a few extra).
 
-        try:
-            with open(self.data_file, "w", encoding="utf-8") as f:
-                # Open the file in 'write' mode ("w"), which means it will erase any old content and start fresh.
-                # 'encoding="utf-8"' helps handle different characters correctly.
-                for student in self.classroom.students:  # Go through each student in our classroom.
-                    # Create a line of text for each student, separating values with commas.
-                    # This now includes the 'student.status' at the end.
-                    line = f"{student.first_name},{student.last_name},{student.midterm},{student.final},{student.attendance},{student.project},{student.status}\n"
-                    f.write(line)  # Write this line to the file.
-        except Exception as e:
-            # If anything goes wrong during saving (like file problems), show an error message.
-            messagebox.showerror("Error", f"Failed to save students: {e}")
+        total = len(self.current_students)
+        self.offset = max(0, min(self.offset, total - self.page_size))  # Don't scroll past either end.
+        self.sync_rows(self.current_students[self.offset:self.offset + self.page_size + self.VIRTUAL_BUFFER])
+        # Move the scrollbar to show which part of the list is on screen.
+        self.vsb.set(self.offset / total, min(1.0, (self.offset + self.page_size) / total))
+
+    def row_id(self, student):
+        # Every student gets a table row ID made from their name (the same key the Classroom uses),
+        # so a student keeps the same row ID no matter where in the list they are shown.
+        # Names can't contain commas (see the students.txt format), so a comma safely separates the two parts.
+        return ",".join(self.classroom.make_key(student.first_name, student.last_name))
+
+    def sync_rows(self, students):
+        # This function changes the table so it shows exactly 'students', in order,
+        # using as few table operations as possible.
+
+        wanted = [(self.row_id(student), student) for student in students]
+        wanted_ids = {iid for iid, _ in wanted}
+
+        # 1. Remove the rows of students that should no longer be shown (all in one go).
+        gone = [iid for iid in self.tree.get_children() if iid not in wanted_ids]
+        if gone:
+            self.tree.delete(*gone)
+            for iid in gone:
+                del self.row_students[iid]
+                del self.row_values[iid]
+
+        # 2. Work out which of the remaining rows can stay where they are.
+        #    Those are the longest run of rows that are already in the right order (see 'rows_in_order');
+        #    every other row is moved (or added) right after the row that should come before it.
+        position = {iid: index for index, iid in enumerate(self.tree.get_children())}
+        keep = self.rows_in_order([iid for iid, _ in wanted if iid in position], position)
+
+        previous = None
+        for iid, student in wanted:
+            values = self.student_values(student)
+            if iid not in position:
+                index = 0 if previous is None else self.tree.index(previous) + 1
+                self.tree.insert("", index, iid=iid, values=values)  # A new row.
+            else:
+                if iid not in keep:
+                    # The row exists but is in the wrong place. 'move' counts positions as if the row
+                    # were already taken out, so a row sitting before 'previous' lands at previous's position.
+                    index = 0
+                    if previous is not None:
+                        index = self.tree.index(previous)
+                        if self.tree.index(iid) > index:
+                            index += 1
+                    self.tree.move(iid, "", index)
+                if self.row_values[iid] != values:
+                    self.tree.item(iid, values=values)  # The row exists but shows old values.
+            self.row_students[iid] = student
+            self.row_values[iid] = values
+            previous = iid
+
+        # 3. Keep the selected student highlighted if they are on screen.
+        if self.selected_student is not None:
+            iid = self.row_id(self.selected_student)
+            if self.row_students.get(iid) is self.selected_student:
+                if self.tree.selection() != (iid,):
+                    self.tree.selection_set(iid)
+            elif self.tree.selection():
+                self.tree.selection_set(())
+
+    @staticmethod
+    def rows_in_order(row_ids, position):
+        # Given the row IDs in their NEW order and each row's CURRENT position,
+        # this finds the biggest set of rows whose current positions already go up in the new order
+        # (the 'longest increasing subsequence'). Those rows never need to be moved.
+        # It uses the classic method with 'bisect' (binary search), which is fast even for long lists.
+        tails = []  # tails[k] = smallest ending position of an increasing run of length k + 1.
+        tail_index = []  # Which entry of 'row_ids' that smallest ending belongs to.
+        parent = [-1] * len(row_ids)  # For each entry, the entry before it in its best run.
+        for i, iid in enumerate(row_ids):
+            k = bisect.bisect_left(tails, position[iid])
+            if k == len(tails):
+                tails.append(position[iid])
+                tail_index.append(i)
+            else:
+                tails[k] = position[iid]
+                tail_index[k] = i
+            parent[i] = tail_index[k - 1] if k > 0 else -1
+        keep = set()
+        i = tail_index[-1] if tail_index else -1
+        while i != -1:  # Walk back through the best run to collect its rows.
+            keep.add(row_ids[i])
+            i = parent[i]
+        return keep
+
+    def refresh_student_row(self, student):
+        # This function rewrites just ONE student's row (e.g., after their grades changed).
+        # It doesn't look at any other row, so it takes the same time however many students there are.
+        iid = self.row_id(student)
+        if self.row_students.get(iid) is student:
+            values = self.student_values(student)
+            if self.row_values[iid] != values:
+                self.tree.item(iid, values=values)
+                self.row_values[iid] = values
+        self.refresh_summary()  # The student's grades changed, so the class numbers did too.
+
+    @staticmethod
+    def student_values(student):
+        # The values shown in one table row, in the same order as the table's columns.
+        return (
+            student.first_name,
+            student.last_name,
+            student.midterm,
+            student.final,
+            student.project,
+            student.attendance,
+            f"{student.average():.2f}",  # The average, formatted to two decimal places.
+            student.status  # The student's status (Passed/Failed).
+        )
+
+    def save_change(self, student, deleted=False):
+        # This function saves ONE change (an added, updated or deleted student) to the journal file.
+        # This is much faster than rewriting every student after each click.
+        # The journal line is made right now (so it holds the student as they are now), but it is written
+        # by the background thread; changes made quickly one after another are written together.
+        if self.database:
+            return  # The database already saved the change.
+        if deleted:
+            self.io.save(self.store.delete_record(student))
+        else:
+            self.io.save(self.store.save_record(student))
+        self.start_polling()
+
+    def save_changes(self, changes):
+        # Like 'save_change', for a whole batch: 'changes' is what 'apply_batch' gave back.
+        # All the journal lines are written together, with one trip to the disk.
+        if self.database:
+            return  # The database saved the whole batch in one transaction.
+        self.io.save_all(self.store.delete_record(student) if kind == "deleted" else self.store.save_record(student)
+                         for kind, student in changes)
+        self.start_polling()
+
+    def save_students(self):
+        # This function saves all student data from the classroom to the 'students.txt' file
+        # and empties the journal, because every change is now part of the file.
+        # The file is written to a temporary copy first and then swapped in,
+        # so a crash while saving can never leave a half-written 'students.txt'.
+        if self.database:
+            return  # The database is always up to date.
+        self.compacting = True
+        self.io.compact(self.classroom.copy_students())  # A copy, so later changes can't mix into the file.
+        self.start_polling()
 
     def load_students(self):
-        # This function loads student data from the 'students.txt' file into our classroom.
+        # This function starts loading student data from the 'students.txt' file into our classroom.
+        # The background thread reads the file; the students are added (and shown) batch by batch
+        # as they arrive (see 'poll_io'), so the window can be used while a big file is still loading.
+        # Then any changes from the journal that were not folded into the file yet are replayed.
+        self.preview = self.store.open_mapped()  # Only available for binary snapshots (None otherwise).
+        if self.preview is not None:
+            # A binary snapshot can show all of its rows straight away, without decoding every student,
+            # so we show it until loading is done.
+            self.refresh_student_list(self.preview)
+        self.loading = True
+        self.load_started = time.perf_counter()
+        self.load_problems = []
+        self.set_editing_enabled(False)  # Changes have to wait until every student is loaded.
+        self.root.title("Student Manager (loading...)")
+        self.io.load()
+        self.start_polling()
 
-        try:
-            with open(self.data_file, "r", encoding="utf-8") as f:
-                # Open the file in 'read' mode ("r").
-                for line in f:  # Go through each line of text in the file.
-                    try:
-                        student = Student.from_line(
-                            line)  # Use our Student blueprint's helper function to turn the line into a Student object.
-                        self.classroom.add_student(student)  # Add this newly created student object to our classroom.
-                    except ValueError as e:
-                        # If a line in the file is badly formatted (e.g., missing commas), show a warning but keep going.
-                        messagebox.showwarning("Data Load Warning", f"Skipping invalid line: {line.strip()} - {e}")
-        except FileNotFoundError:
-            # If the 'students.txt' file doesn't exist yet, that's okay, just do nothing.
-            pass
-        except Exception as e:
-            # For any other loading error, show an error message.
-            messagebox.showerror("Error", f"Failed to load students: {e}")
+    def start_polling(self):
+        # Start checking for results from the background thread (unless we already are).
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.IO_POLL_MS, self.poll_io)
+
+    def poll_io(self):
+        # This function runs on the main thread every IO_POLL_MS while the background thread is busy.
+        # It handles every result the background thread has sent since last time.
+        while True:
+            try:
+                kind, value = self.io.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "batch":
+                self.on_batch_loaded(*value)
+            elif kind == "journal":
+                self.load_problems.extend(self.store.apply_journal(self.classroom, value))
+            elif kind == "loaded":
+                self.on_loading_done()
+            elif kind == "saved":
+                if not self.compacting and self.store.needs_compaction():
+                    # The journal has grown long, so fold it back into 'students.txt'.
+                    self.save_students()
+            elif kind == "compacted":
+                self.compacting = False
+            elif kind == "error":
+                job, error = value
+                if job == "load":
+                    messagebox.showerror("Error", f"Failed to load students: {error}")
+                    self.on_loading_done()
+                else:
+                    # If anything goes wrong during saving (like file problems), show an error message.
+                    self.compacting = False
+                    messagebox.showerror("Error", f"Failed to save students: {error}")
+        if self.io.busy():
+            self.root.after(self.IO_POLL_MS, self.poll_io)  # Check again soon.
+        else:
+            self.polling = False
+
+    def on_batch_loaded(self, students, problems):
+        # A batch of students was read from the file: add them and show them.
+        self.classroom.add_students(students)
+        self.load_problems.extend(problems)
+        self.root.title(f"Student Manager (loading... {len(self.classroom)} students)")
+        if self.preview is None or self.search_var.get().strip():
+            self.run_search()  # Show the students loaded so far (or the search results among them).
+
+    def on_loading_done(self):
+        # Every student is loaded: show them all and allow changes again.
+        self.loading = False
+        if self.profiler is not None:
+            self.profiler.record("StudentManagerApp.whole load", time.perf_counter() - self.load_started)
+        self.root.title("Student Manager")
+        self.set_editing_enabled(True)
+        self.run_search()  # Show the classroom (including any changes from the journal).
+        if self.preview is not None:
+            self.preview.close()  # The preview is no longer shown, so let go of the file.
+            self.preview = None
+        if self.load_problems:
+            # Some lines were badly formatted (e.g., missing commas). They were skipped,
+            # and we show ONE warning listing them instead of one pop-up per line.
+            self.show_load_problems(self.load_problems)
+
+    def set_editing_enabled(self, enabled):
+        # Turns the Add/Update/Delete buttons (and the section buttons, if there are any) on or off.
+        for button in self.edit_buttons + self.dataset_buttons:
+            button.config(state=tk.NORMAL if enabled else tk.DISABLED)
+
+    def on_close(self):
+        # This function runs when the window is closed. It waits until the background thread has written
+        # every change (this is quick: at most a few journal lines, or a snapshot that is already being written).
+        if self.database:
+            self.classroom.close()
+        else:
+            self.io.close()
+        if self.dataset is not None:
+            self.dataset.close()  # Stop the helper processes used by 'Search All Sections'.
+        if self.preview is not None:
+            self.preview.close()
+        self.root.destroy()
+
+    def show_diagnostics(self):
+        # This function opens a window with the profiler's numbers: for every timed function, how often it ran
+        # and how long it took (p50 = the median, p95/p99 = only 5%/1% of the calls were slower), in milliseconds.
+        window = tk.Toplevel(self.root)
+        window.title("Diagnostics")
+        window.geometry("900x400")
+        columns = ("function", "calls", "total_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+        table = ttk.Treeview(window, columns=columns, show="headings")
+        for col in columns:
+            table.heading(col, text=col.replace("_ms", " (ms)").replace("_", " ").title())
+            table.column(col, anchor=tk.W if col == "function" else tk.E, width=260 if col == "function" else 80)
+        table.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        def refresh():
+            # Show the latest numbers, then do it again in a moment (until the window is closed).
+            if not window.winfo_exists():
+                return
+            table.delete(*table.get_children())
+            for name, numbers in self.profiler.summary():
+                table.insert("", "end", values=(name, numbers["calls"], *(f"{numbers[col]:.3f}" for col in columns[2:])))
+            self.root.after(self.DIAGNOSTICS_REFRESH_MS, refresh)
+        refresh()
+
+    def show_load_problems(self, problems):
+        # This function shows one warning that lists the lines that could not be loaded.
+        shown = [f"{where}: {line} - {error}" for where, line, error in problems[:self.MAX_PROBLEMS_SHOWN]]
+        if len(problems) > self.MAX_PROBLEMS_SHOWN:
+            shown.append(f"...and {len(problems) - self.MAX_PROBLEMS_SHOWN} more.")
+        messagebox.showwarning("Data Load Warning",
+                               f"Skipped {len(problems)} invalid line(s):\n\n" + "\n".join(shown))
 
 
 if __name__ == "__main__":
     # This special 'if' statement means the code inside it only runs when you start this file directly (not when imported).
+    parser = argparse.ArgumentParser(description="Student Manager")
+    parser.add_argument("--columnar", action="store_true",
+                        help="keep students in NumPy columns (uses much less memory for very large rosters)")
+    parser.add_argument("--data", default="students.txt",
+                        help="the student data file: a text file, a binary snapshot or a SQLite database ending in "
+                             "'.db' (default: students.txt)")
+    parser.add_argument("--dataset", metavar="FOLDER",
+                        help="work with a folder of class sections, one student file each (see Dataset.py); "
+                             "replaces --data")
+    parser.add_argument("--max-open", type=int, default=Dataset.MAX_OPEN,
+                        help="with --dataset: how many sections stay loaded at most (default: %(default)s)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time the app's important functions (also turned on by setting STUDENT_MANAGER_PROFILE=1); "
+                             "the numbers are shown by the Diagnostics button and written to a JSON file on exit")
+    parser.add_argument("--profile-json", metavar="FILE",
+                        help="where to write the profiling numbers (default: profile.json); turns on --profile")
+    args = parser.parse_args()
+    if args.columnar and args.data.endswith(".db"):
+        parser.error("--columnar can't be used with a SQLite database")
+    if args.dataset and args.columnar:
+        parser.error("--columnar can't be used with --dataset")
+    if args.max_open < 1:
+        parser.error("--max-open must be at least 1")
+    dataset = Dataset(args.dataset, args.max_open) if args.dataset else None
+
+    classroom = None  # None means "pick the classroom that fits the data file".
+    classroom_types = [Classroom, SqliteClassroom]
+    if args.columnar:
+        from ColumnarClassroom import *  # Only imported when asked for, because it needs NumPy.
+        classroom = ColumnarClassroom()
+        classroom_types.append(ColumnarClassroom)
+
+    profiler = None
+    if args.profile or args.profile_json or wanted_by_environment():
+        # The functions are only swapped for timed versions now, so without profiling they run untouched.
+        profiler = Profiler()
+        for classroom_type in classroom_types:
+            profiler.instrument(classroom_type, CLASSROOM_FUNCTIONS)
+        profiler.instrument(StudentFile, STUDENT_FILE_FUNCTIONS)
+        profiler.instrument(StudentManagerApp, APP_FUNCTIONS)
+        profiler.instrument(Dataset, DATASET_FUNCTIONS)
+        profiler.dump_at_exit(args.profile_json or DEFAULT_JSON_FILE)
+
     root = tk.Tk()  # Create the main window of our application.
-    app = StudentManagerApp(root)  # Create an instance of our StudentManagerApp, passing it the main window.
+    app = StudentManagerApp(root, classroom, args.data, profiler, dataset)  # Create an instance of our StudentManagerApp, passing it the main window.
     root.mainloop()  # Start the Tkinter event loop. This keeps the window open and responsive to clicks and typing.
\ No newline at end of file
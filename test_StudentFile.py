@@ -0,0 +1,99 @@
+# This file checks that 'StudentFile.py' never loses or mixes up student data, even after a crash.
+# Run it from the command line with:  python -m unittest test_StudentFile   (or: python -m pytest)
+#
+# It covers the three cases the journal was built for:
+#   - a half-written last journal line (a crash while saving) is ignored, and the lines before it still count
+#   - a crash after 'compact' renamed the new snapshot but before it removed the journal loses nothing
+#   - a student who is deleted and then added again (or the other way around) ends up as the last change says
+
+import os  # Used to build file paths in the throwaway folder.
+import shutil  # Used to copy the journal (to pretend it was never removed).
+import tempfile  # Used to make a throwaway folder for the test files.
+import unittest  # Python's built-in testing tools.
+
+from Student import *  # The Student blueprint.
+from Classroom import *  # The Classroom organizer.
+from StudentFile import *  # The code being tested.
+
+
+class StudentFileTest(unittest.TestCase):
+
+    def setUp(self):
+        # Runs before every test: a fresh folder with a snapshot of two students and an empty journal.
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "students.txt")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("Ava,Davis,80.0,90.0,100.0,70.0,Passed\n")
+            f.write("Ben,Brooks,40.0,30.0,50.0,20.0,Failed\n")
+
+    def tearDown(self):
+        # Runs after every test: remove the throwaway folder again.
+        shutil.rmtree(self.folder)
+
+    def load(self):
+        # Loads the files into a new Classroom the way the app does, and gives back (classroom, problems).
+        classroom = Classroom()
+        problems = StudentFile(self.path).load(classroom, workers=1)
+        return classroom, problems
+
+    def grades_by_name(self, classroom):
+        # Every student as {(first name, last name): (midterm, final, attendance, project)}.
+        return {(s.first_name, s.last_name): (s.midterm, s.final, s.attendance, s.project)
+                for s in classroom.students}
+
+    def test_torn_last_line_is_ignored(self):
+        store = StudentFile(self.path)
+        store.record_save(Student("Mia", "Khan", 70.0, 70.0, 90.0, 70.0))
+        # Pretend the computer crashed while writing the next line: it has no line break at the end.
+        with open(store.journal_path, "a", encoding="utf-8") as f:
+            f.write("-,Ava,Da")
+
+        classroom, problems = self.load()
+        self.assertEqual(problems, [])
+        self.assertEqual(set(self.grades_by_name(classroom)), {("Ava", "Davis"), ("Ben", "Brooks"), ("Mia", "Khan")})
+        store = StudentFile(self.path)
+        store.read_journal()
+        self.assertEqual(store.journal_records, 1)  # Only the complete line is counted.
+
+    def test_replaying_after_compact_rename_is_safe(self):
+        store = StudentFile(self.path)
+        classroom, _ = self.load()
+        ben = classroom.find_student("Ben", "Brooks")
+        classroom.update_student(ben, 60.0, 65.0, 70.0, 80.0)
+        store.record_save(ben)
+        classroom.delete_student("Ava", "Davis")
+        store.record_delete(Student("Ava", "Davis", 0, 0, 0, 0))
+        mia = Student("Mia", "Khan", 70.0, 70.0, 90.0, 70.0)
+        classroom.add_student(mia)
+        store.record_save(mia)
+        expected = self.grades_by_name(classroom)
+
+        # Pretend we crashed right after the new snapshot was renamed into place:
+        # keep a copy of the journal and put it back after 'compact' removed it.
+        shutil.copy(store.journal_path, store.journal_path + ".copy")
+        store.compact(classroom.students)
+        self.assertFalse(os.path.exists(store.journal_path))
+        os.replace(store.journal_path + ".copy", store.journal_path)
+
+        classroom, problems = self.load()
+        self.assertEqual(problems, [])
+        self.assertEqual(self.grades_by_name(classroom), expected)
+
+    def test_delete_then_add_again_follows_the_journal_order(self):
+        store = StudentFile(self.path)
+        # Ava is deleted and then added again with new grades: she must be there, with the new grades.
+        store.record_delete(Student("Ava", "Davis", 0, 0, 0, 0))
+        store.record_save(Student("Ava", "Davis", 50.0, 55.0, 60.0, 65.0))
+        # Mia is added and then deleted again: she must not be there.
+        mia = Student("Mia", "Khan", 70.0, 70.0, 90.0, 70.0)
+        store.record_save(mia)
+        store.record_delete(mia)
+
+        classroom, problems = self.load()
+        self.assertEqual(problems, [])
+        self.assertEqual(self.grades_by_name(classroom), {("Ava", "Davis"): (50.0, 55.0, 60.0, 65.0),
+                                                          ("Ben", "Brooks"): (40.0, 30.0, 50.0, 20.0)})
+
+
+if __name__ == "__main__":
+    unittest.main()
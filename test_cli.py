@@ -0,0 +1,44 @@
+# This file checks the duplicate handling of the command-line tool ('cli.py').
+# Run it from the command line with:  python -m unittest test_cli   (or: python -m pytest)
+
+import shutil  # Used to remove the throwaway folder again.
+import tempfile  # Used to make a throwaway folder for the sort files.
+import unittest  # Python's built-in testing tools.
+
+from Student import *  # The Student blueprint.
+from cli import without_duplicates  # The code being tested.
+
+
+class WithoutDuplicatesTest(unittest.TestCase):
+
+    def setUp(self):
+        # Runs before every test: a fresh folder for the temporary sort files, and three students
+        # where the second and third have the same name as the first (in other upper/lowercase).
+        self.folder = tempfile.mkdtemp()
+        self.students = [Student("Ava", "Davis", 80.0, 90.0, 100.0, 70.0),
+                         Student("Ben", "Brooks", 40.0, 30.0, 50.0, 20.0),
+                         Student("AVA", "davis", 10.0, 20.0, 30.0, 40.0),
+                         Student("ava", "DAVIS", 60.0, 60.0, 60.0, 60.0)]
+
+    def tearDown(self):
+        # Runs after every test: remove the throwaway folder again.
+        shutil.rmtree(self.folder)
+
+    def rows(self, keep):
+        # Every student left after removing duplicates, as (first name, last name, midterm, final, attendance, project).
+        return [(s.first_name, s.last_name, s.midterm, s.final, s.attendance, s.project)
+                for s in without_duplicates(self.students, keep, self.folder)]
+
+    def test_keep_first(self):
+        # The first student with a name is kept as it is.
+        self.assertEqual(self.rows("first"), [("Ava", "Davis", 80.0, 90.0, 100.0, 70.0),
+                                              ("Ben", "Brooks", 40.0, 30.0, 50.0, 20.0)])
+
+    def test_keep_last_keeps_the_first_name(self):
+        # The grades come from the last duplicate, but the name (and place) stay those of the first one.
+        self.assertEqual(self.rows("last"), [("Ava", "Davis", 60.0, 60.0, 60.0, 60.0),
+                                             ("Ben", "Brooks", 40.0, 30.0, 50.0, 20.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()